@@ -1,15 +1,139 @@
-from fastapi import Request, HTTPException, Depends
-from fastapi.security import HTTPAuthorizationCredentials
-from utils.jwt_handler import decode_access_token, security
+# auth_dependencies.py
+#
+# The one authorization dependency of the admin API:
+#
+#     @router.get("/", dependencies=[Depends(require_permission("Read Welcome"))])
+#     async def get_all(user=Depends(require_permission("Read Welcome"))): ...
+#
+# The bearer token is resolved once per request (get_current_user keeps it on
+# request.state) however many dependencies ask for it, and the check is a
+# precomputed bit flag ANDed with the token's permission mask. At startup
+# compile_route_permissions(app) records which permission every route needs;
+# auth_overhead_stats() reports the time spent in this dependency per route.
 
-def require_permission(permission: str):
-    def permission_dependency(credentials: HTTPAuthorizationCredentials = Depends(security)):
-        token = credentials.credentials
-        payload = decode_access_token(token)
+import os
+import time
 
-        user_permissions = payload.get("permissions", [])
-        if permission not in user_permissions:
-            raise HTTPException(status_code=403, detail=f"Permission '{permission}' required")
+from fastapi import Depends, HTTPException, Request, status
 
-        return payload  # Optional: return the whole user data
-    return permission_dependency
+from utils import permissions as permission_registry
+from utils.jwt_handler import get_current_user, oauth2_scheme
+
+# Internal stats endpoints (route table, caches, throttles) need this permission
+MONITORING_PERMISSION = os.getenv("MONITORING_PERMISSION", "Read Permissions")
+
+ROUTE_PERMISSIONS = {}  # "GET /api/welcome/" -> "Read Welcome"
+_overhead = {}          # "GET /api/welcome/" -> [count, total_s, max_s, denied]
+
+
+class PermissionDependency:
+    """Depends() target for one permission name; instances are shared per name."""
+
+    def __init__(self, permission: str):
+        self.permission = permission
+        self._flag = 0
+        self._version = -1
+
+    def flag(self) -> int:
+        # Recomputed only after the permission registry was reloaded
+        if self._version != permission_registry.registry_version():
+            self._flag = permission_registry.permission_flag(self.permission)
+            self._version = permission_registry.registry_version()
+        return self._flag
+
+    async def __call__(self, request: Request, token: str = Depends(oauth2_scheme)):
+        started = time.perf_counter()
+        user = await get_current_user(request, token)
+        flag = self.flag()
+        if flag == 0 and await permission_registry.ensure_registered([self.permission]):
+            # Permission row added outside the app since this worker loaded the registry
+            flag = self.flag()
+        allowed = flag != 0 and user["permissions"].mask & flag != 0
+        _record(request, time.perf_counter() - started, allowed)
+
+        if not allowed:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+        return user
+
+    def __repr__(self):
+        return f"require_permission({self.permission!r})"
+
+
+_dependencies = {}
+
+
+def require_permission(permission: str) -> PermissionDependency:
+    """The dependency for `permission`; one instance per name, so FastAPI caches it per request."""
+    dependency = _dependencies.get(permission)
+    if dependency is None:
+        dependency = _dependencies[permission] = PermissionDependency(permission)
+    return dependency
+
+
+# ===============================
+# Route table / timings
+# ===============================
+def _route_key(request: Request) -> str:
+    route = request.scope.get("route")
+    return f"{request.method} {getattr(route, 'path', request.url.path)}"
+
+
+def _record(request: Request, elapsed: float, allowed: bool):
+    key = _route_key(request)
+    entry = _overhead.get(key)
+    if entry is None:
+        entry = _overhead[key] = [0, 0.0, 0.0, 0]
+    entry[0] += 1
+    entry[1] += elapsed
+    entry[2] = max(entry[2], elapsed)
+    if not allowed:
+        entry[3] += 1
+
+
+def _find_permission(dependant):
+    for sub in dependant.dependencies:
+        if isinstance(sub.call, PermissionDependency):
+            return sub.call.permission
+        found = _find_permission(sub)
+        if found:
+            return found
+    return None
+
+
+def _walk_routes(routes, prefix: str = ""):
+    for route in routes:
+        included = getattr(route, "original_router", None)
+        if included is not None:
+            # Newer FastAPI keeps include_router() lazy: one entry per included router
+            yield from _walk_routes(included.routes, prefix + route.include_context.prefix)
+            continue
+        yield prefix + getattr(route, "path", ""), route
+
+
+def compile_route_permissions(app) -> dict:
+    """Walk the app's routes once and record the permission each one requires."""
+    ROUTE_PERMISSIONS.clear()
+    for path, route in _walk_routes(app.routes):
+        dependant = getattr(route, "dependant", None)
+        if dependant is None:
+            continue
+        permission = _find_permission(dependant)
+        if permission is None:
+            continue
+        for method in sorted(route.methods or ()):
+            ROUTE_PERMISSIONS[f"{method} {path}"] = permission
+    return ROUTE_PERMISSIONS
+
+
+def auth_overhead_stats() -> dict:
+    """{route: {permission, requests, denied, avg_us, max_us}} for this worker."""
+    return {
+        key: {
+            "permission": ROUTE_PERMISSIONS.get(key),
+            "requests": count,
+            "denied": denied,
+            "avg_us": round(1e6 * total / count, 1) if count else 0.0,
+            "max_us": round(1e6 * worst, 1),
+        }
+        for key, (count, total, worst, denied) in sorted(_overhead.items())
+    }
@@ -0,0 +1,121 @@
+"""
+Cost of authorization dependency resolution per request, in-process.
+
+Builds three tiny FastAPI apps around the same handler and calls them through
+httpx's ASGI transport (no network, no database):
+
+    none     no auth at all                                         – baseline
+    legacy   per-router closure over a sync get_current_user that
+             decodes the JWT every time and scans a list of names   – before
+    central  auth_dependencies.require_permission (token resolved
+             once per request, cached claims, bitmask check)        – now
+
+Each protected route declares the permission dependency --nested times (as a
+route dependency plus a parameter, like most admin routes), so the legacy app
+also shows the repeated resolution. The difference to `none` is the auth cost.
+
+    python benchmarks/auth_dependency.py --requests 5000 --permissions 200 --nested 2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+import jwt  # noqa: E402
+from fastapi import Depends, FastAPI, HTTPException  # noqa: E402
+
+from auth_dependencies import require_permission, auth_overhead_stats  # noqa: E402
+from config import SECRET_KEY, ALGORITHM  # noqa: E402
+from utils import permissions  # noqa: E402
+from utils.jwt_handler import create_access_token, oauth2_scheme  # noqa: E402
+
+NEEDED = "Read Products"
+
+
+def legacy_app(nested: int) -> FastAPI:
+    def get_current_user(token: str = Depends(oauth2_scheme)):
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+    def make_checker(permission):
+        def permission_checker(user=Depends(get_current_user)):
+            if permission not in user["permissions"]:
+                raise HTTPException(status_code=403, detail="Forbidden")
+            return user
+        return permission_checker
+
+    app = FastAPI()
+    # A fresh closure per declaration, as the routers did: FastAPI cannot share them
+    extra = [Depends(make_checker(NEEDED)) for _ in range(nested - 1)]
+
+    @app.get("/item", dependencies=extra)
+    async def item(user=Depends(make_checker(NEEDED))):
+        return {"ok": True}
+
+    return app
+
+
+def central_app(nested: int) -> FastAPI:
+    app = FastAPI()
+    extra = [Depends(require_permission(NEEDED)) for _ in range(nested - 1)]
+
+    @app.get("/item", dependencies=extra)
+    async def item(user=Depends(require_permission(NEEDED))):
+        return {"ok": True}
+
+    return app
+
+
+def open_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/item")
+    async def item():
+        return {"ok": True}
+
+    return app
+
+
+async def measure(app, headers, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(200):  # warm-up (and token cache fill)
+            resp = await client.get("/item", headers=headers)
+            resp.raise_for_status()
+        started = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/item", headers=headers)
+        return (time.perf_counter() - started) / requests
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--permissions", type=int, default=200, help="permissions granted to the user")
+    parser.add_argument("--nested", type=int, default=2, help="permission dependencies per route")
+    args = parser.parse_args()
+
+    names = [f"Permission {i}" for i in range(args.permissions - 1)] + [NEEDED]
+    permissions._apply([{"id": i + 1, "name": name} for i, name in enumerate(names)])
+
+    legacy_token = create_access_token({"sub": "bench", "user_id": 1, "permissions": names})
+    central_token = create_access_token({"sub": "bench", "user_id": 1, "perms": permissions.encode_permissions(names)})
+    print(f"token size: legacy {len(legacy_token)} B, bitmask {len(central_token)} B")
+
+    baseline = await measure(open_app(), {}, args.requests)
+    legacy = await measure(legacy_app(args.nested), {"Authorization": f"Bearer {legacy_token}"}, args.requests)
+    central = await measure(central_app(args.nested), {"Authorization": f"Bearer {central_token}"}, args.requests)
+
+    for label, per_request in (("none", baseline), ("legacy", legacy), ("central", central)):
+        print(
+            f"{label:<8} {per_request * 1e6:>8.1f} µs/request   "
+            f"auth overhead {max(per_request - baseline, 0) * 1e6:>7.1f} µs"
+        )
+    print(f"inside require_permission: {auth_overhead_stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
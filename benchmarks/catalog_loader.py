@@ -0,0 +1,164 @@
+"""
+Product catalog aggregation: cartesian LEFT JOIN vs. batched set-based loader.
+
+Seeds a throwaway schema (BENCH_DB_NAME, default "fujiaire_bench") with
+N products × 10 specs × 10 images, then times both strategies end to end
+(MySQL round trips + Python stitching):
+
+    python benchmarks/catalog_loader.py --products 10000 --specs 10 --images 10
+
+Uses the normal DB_HOST / DB_USER / DB_PASSWORD / DB_PORT settings. The
+benchmark schema is dropped and recreated on every --seed run; never point
+BENCH_DB_NAME at the real database.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCH_DB_NAME = os.getenv("BENCH_DB_NAME", "fujiaire_bench")
+
+import aiomysql  # noqa: E402
+import db  # noqa: E402
+from utils.query_executor import fetch_all  # noqa: E402
+from controllers import controllerProduct  # noqa: E402
+
+SCHEMA = [
+    """CREATE TABLE product (
+        id INT PRIMARY KEY AUTO_INCREMENT, name VARCHAR(255), slug VARCHAR(255),
+        detail TEXT, status TINYINT DEFAULT 1, created_at DATETIME, updated_at DATETIME,
+        category_id INT, type_id INT, image_id INT, is_active TINYINT DEFAULT 1,
+        about_product TEXT, image_id_about_product INT, path_about_product VARCHAR(255),
+        path VARCHAR(255), user_id INT, new TINYINT DEFAULT 0, product_category VARCHAR(255)
+    )""",
+    """CREATE TABLE spicification (
+        id INT PRIMARY KEY AUTO_INCREMENT, title VARCHAR(255), descriptions TEXT
+    )""",
+    """CREATE TABLE product_spicification (
+        id INT PRIMARY KEY AUTO_INCREMENT, product_id INT, spicification_id INT,
+        KEY idx_product (product_id)
+    )""",
+    """CREATE TABLE product_images (
+        id INT PRIMARY KEY AUTO_INCREMENT, product_id INT, image_path VARCHAR(255),
+        created_at DATETIME, updated_at DATETIME, KEY idx_product (product_id)
+    )""",
+]
+
+LEGACY_QUERY = """
+    SELECT
+        p.id AS product_id, p.name AS product_name, p.slug, p.detail, p.status,
+        p.created_at, p.updated_at, p.category_id, p.image_id, p.path AS primary_path,
+        p.image_id_about_product, p.path_about_product, p.type_id, p.user_id,
+        ps.spicification_id, s.title AS spec_title, s.descriptions AS spec_description,
+        pi.id AS product_image_id, pi.image_path
+    FROM product p
+    LEFT JOIN product_spicification ps ON ps.product_id=p.id
+    LEFT JOIN spicification s ON s.id=ps.spicification_id
+    LEFT JOIN product_images pi ON pi.product_id=p.id
+    WHERE p.status=1
+    ORDER BY p.id DESC
+"""
+
+
+async def seed(n_products, n_specs, n_images):
+    conn = await aiomysql.connect(
+        host=os.getenv("DB_HOST"), user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"), port=int(os.getenv("DB_PORT", 3306)),
+        autocommit=True, charset="utf8mb4",
+    )
+    try:
+        async with conn.cursor() as cur:
+            await cur.execute(f"DROP DATABASE IF EXISTS `{BENCH_DB_NAME}`")
+            await cur.execute(f"CREATE DATABASE `{BENCH_DB_NAME}`")
+            await cur.execute(f"USE `{BENCH_DB_NAME}`")
+            for ddl in SCHEMA:
+                await cur.execute(ddl)
+
+            await cur.executemany(
+                "INSERT INTO spicification (title, descriptions) VALUES (%s, %s)",
+                [(f"Spec {i}", f"Specification text {i} " * 4) for i in range(n_specs)],
+            )
+            batch = 2000
+            for start in range(0, n_products, batch):
+                ids = range(start + 1, min(start + batch, n_products) + 1)
+                await cur.executemany(
+                    "INSERT INTO product (id, name, slug, detail, status, created_at, updated_at, "
+                    "category_id, type_id, path, user_id) VALUES (%s,%s,%s,%s,1,NOW(),NOW(),1,1,%s,1)",
+                    [(i, f"Product {i}", f"product-{i}.php", "detail " * 20, f"p{i}.jpg") for i in ids],
+                )
+                await cur.executemany(
+                    "INSERT INTO product_spicification (product_id, spicification_id) VALUES (%s, %s)",
+                    [(i, s + 1) for i in ids for s in range(n_specs)],
+                )
+                await cur.executemany(
+                    "INSERT INTO product_images (product_id, image_path, created_at, updated_at) "
+                    "VALUES (%s, %s, NOW(), NOW())",
+                    [(i, f"gallery/{i}_{k}.jpg") for i in ids for k in range(n_images)],
+                )
+    finally:
+        conn.close()
+
+
+def legacy_stitch(rows):
+    # The pre-loader aggregation, kept verbatim for comparison
+    products = {}
+    for row in rows:
+        pid = row["product_id"]
+        if pid not in products:
+            products[pid] = {"id": pid, "name": row["product_name"], "spicifications": [], "images": []}
+        if row["spicification_id"]:
+            spec_obj = {"id": row["spicification_id"], "title": row["spec_title"], "description": row["spec_description"]}
+            if spec_obj not in products[pid]["spicifications"]:
+                products[pid]["spicifications"].append(spec_obj)
+        if row["product_image_id"]:
+            img_obj = {"id": row["product_image_id"], "path": row["image_path"]}
+            if img_obj not in products[pid]["images"]:
+                products[pid]["images"].append(img_obj)
+    return list(products.values())
+
+
+async def timed(label, coro_fn):
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    products, rows = await coro_fn()
+    print(f"{label:<10} rows={rows:>10,}  products={len(products):>7,}  "
+          f"wall={time.perf_counter() - wall:8.2f}s  cpu={time.process_time() - cpu:8.2f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--specs", type=int, default=10)
+    parser.add_argument("--images", type=int, default=10)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the existing benchmark schema")
+    parser.add_argument("--skip-legacy", action="store_true", help="the legacy path is O(n²) per product")
+    args = parser.parse_args()
+
+    if not args.no_seed:
+        print(f"Seeding {BENCH_DB_NAME}: {args.products} products × {args.specs} specs × {args.images} images")
+        await seed(args.products, args.specs, args.images)
+
+    os.environ["DB_NAME"] = BENCH_DB_NAME
+    await db.init_db_pool()
+    try:
+        async def legacy():
+            rows = await fetch_all(LEGACY_QUERY, timeout=600)
+            return legacy_stitch(rows), len(rows)
+
+        async def loader():
+            products = await controllerProduct.get_all_products_public()
+            rows = len(products) + sum(len(p["spicifications"]) + len(p["images"]) for p in products)
+            return products, rows
+
+        if not args.skip_legacy:
+            await timed("legacy", legacy)
+        await timed("loader", loader)
+    finally:
+        await db.close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+"""
+Per-upload FTP latency: new session per file vs. the pooled client.
+
+Starts a throwaway pyftpdlib server on 127.0.0.1 (pip install pyftpdlib),
+then uploads --files files of --size-kb each, first the old way
+(connect + login + MKD + upload + QUIT every time, like cpanel_ftp_uploader
+used to) and then through utils.ftp_pool.FTPPool:
+
+    python benchmarks/ftp_pool.py --files 200 --size-kb 256 --concurrency 4
+
+Pass --latency-ms to delay every FTP reply and get closer to a remote cPanel host.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aioftp  # noqa: E402
+from pyftpdlib.authorizers import DummyAuthorizer  # noqa: E402
+from pyftpdlib.handlers import FTPHandler  # noqa: E402
+from pyftpdlib.servers import FTPServer  # noqa: E402
+
+from utils.ftp_pool import FTPPool  # noqa: E402
+
+USER, PASSWORD, UPLOAD_DIR = "bench", "bench", "/public_html/uploads"
+
+
+def start_server(root: str, latency: float):
+    authorizer = DummyAuthorizer()
+    authorizer.add_user(USER, PASSWORD, root, perm="elradfmw")
+
+    class SlowHandler(FTPHandler):
+        def respond(self, resp, *args, **kwargs):
+            if latency:
+                # Blocks the server's single IO thread: a rough per-reply RTT, serialized
+                time.sleep(latency)
+            return super().respond(resp, *args, **kwargs)
+
+    SlowHandler.authorizer = authorizer
+    server = FTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, kwargs={"handle_exit": False}, daemon=True).start()
+    return server, server.socket.getsockname()[1]
+
+
+async def upload_fresh(port, name, payload):
+    async with aioftp.Client.context("127.0.0.1", port, USER, PASSWORD, socket_timeout=30) as client:
+        try:
+            await client.make_directory(UPLOAD_DIR)
+        except aioftp.StatusCodeError as e:
+            if "550" not in e.received_codes:
+                raise
+        async with client.upload_stream(f"{UPLOAD_DIR}/{name}") as stream:
+            await stream.write(payload)
+
+
+async def upload_pooled(pool, name, payload):
+    async with pool.session() as client:
+        await pool.ensure_directory(client, UPLOAD_DIR)
+        async with client.upload_stream(f"{UPLOAD_DIR}/{name}") as stream:
+            await stream.write(payload)
+
+
+async def run(label, upload, files, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await upload(f"{label}-{i}.bin")
+            latencies.append(time.perf_counter() - start)
+
+    wall = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(files)))
+    wall = time.perf_counter() - wall
+    print(f"{label:<8} files={files:>5}  wall={wall:7.2f}s  "
+          f"p50={statistics.median(latencies) * 1000:7.1f}ms  "
+          f"max={max(latencies) * 1000:7.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    payload = os.urandom(args.size_kb * 1024)
+
+    with tempfile.TemporaryDirectory() as root:
+        server, port = start_server(root, args.latency_ms / 1000)
+        try:
+            # Same upload twice per file: only session handling differs
+            await run("fresh", lambda name: upload_fresh(port, name, payload), args.files, args.concurrency)
+
+            pool = FTPPool("127.0.0.1", USER, PASSWORD, port=port, size=args.concurrency)
+            await run("pooled", lambda name: upload_pooled(pool, name, payload), args.files, args.concurrency)
+            await pool.close()
+        finally:
+            server.close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
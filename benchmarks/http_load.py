@@ -0,0 +1,83 @@
+"""
+Small closed-loop HTTP load generator used by the benchmarks in this folder.
+
+Run it against a live server (e.g. the Procfile command) before and after a
+change and compare the numbers:
+
+    python benchmarks/http_load.py --base-url http://127.0.0.1:8080 \
+        --concurrency 50 --duration 20 \
+        /api/products/all/public /api/products/new/all/public
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+async def run_load(client, path, concurrency=20, duration=10.0, method="GET", **request_kwargs):
+    """Hammer one path with `concurrency` workers for `duration` seconds."""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                resp = await client.request(method, path, **request_kwargs)
+                if resp.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": (statistics.mean(latencies) * 1000) if latencies else 0.0,
+    }
+
+
+def print_result(result):
+    print(
+        f"{result['path']:<45} {result['rps']:>9.1f} req/s  "
+        f"p50 {result['p50_ms']:>7.1f} ms  p99 {result['p99_ms']:>7.1f} ms  "
+        f"({result['requests']} requests, {result['errors']} errors)"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", default=["/api/products/all/public", "/api/products/new/all/public"])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        for path in args.paths:
+            print_result(await run_load(client, path, args.concurrency, args.duration))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
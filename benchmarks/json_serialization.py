@@ -0,0 +1,123 @@
+"""
+JSON serialization of the admin product list, measured through the real route.
+
+Builds N products shaped like get_all_products() (datetimes, specs, images) in
+memory, serves them from GET /api/products/ with the controller patched to
+return that payload (no database, auth dependency overridden) and calls it over
+httpx's ASGI transport, so FastAPI's own encoding path is what gets timed:
+
+    stdlib   plain `return data`, JSONResponse            – every route before
+    default  plain `return data`, FastJSONResponse        – jsonable_encoder + orjson
+    route    routers/routerProduct.get_all (fast_json)    – orjson only, no encoder pass
+
+    python benchmarks/json_serialization.py --products 2000 --specs 10 --images 10
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from auth_dependencies import require_permission  # noqa: E402
+from controllers import controllerProduct  # noqa: E402
+from routers import routerProduct  # noqa: E402
+from utils import json_response  # noqa: E402
+from utils.json_response import FastJSONResponse  # noqa: E402
+
+
+def build_payload(products: int, specs: int, images: int) -> list:
+    now = datetime.datetime(2025, 1, 1, 8, 30, 15)
+    payload = []
+    for i in range(1, products + 1):
+        payload.append({
+            "id": i,
+            "name": f"Air conditioner model {i}",
+            "slug": f"air-conditioner-model-{i}.php",
+            "detail": "Inverter split type, low noise, R32 refrigerant. " * 8,
+            "status": 1,
+            "created_at": now - datetime.timedelta(days=i, microseconds=i),
+            "updated_at": now,
+            "category_id": i % 12,
+            "image_id": i,
+            "primary_path": f"uploads/products/{i}/main.webp",
+            "image_id_about_product": i,
+            "path_about_product": f"uploads/products/{i}/about.webp",
+            "type_id": i % 3,
+            "user_id": 1,
+            "spicifications": [
+                {"id": s, "title": f"Spec {s}", "description": f"Cooling capacity {s * 1000} BTU/h"}
+                for s in range(1, specs + 1)
+            ],
+            "images": [
+                {"id": i * images + n, "path": f"uploads/products/{i}/{n}.webp"}
+                for n in range(images)
+            ],
+        })
+    return payload
+
+
+def plain_app(payload, response_class) -> FastAPI:
+    app = FastAPI(default_response_class=response_class)
+
+    @app.get("/api/products/")
+    async def get_all():
+        return payload
+
+    return app
+
+
+def route_app(payload) -> FastAPI:
+    async def get_all_products(*args, **kwargs):
+        return payload
+
+    controllerProduct.get_all_products = get_all_products
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.include_router(routerProduct.router)
+    app.dependency_overrides[require_permission("Read Products")] = lambda: {"sub": "bench"}
+    return app
+
+
+async def timed(label, app, repeat):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        resp = await client.get("/api/products/")  # warm-up, and the size we report
+        resp.raise_for_status()
+        wall = time.perf_counter()
+        for _ in range(repeat):
+            await client.get("/api/products/")
+        per_call = (time.perf_counter() - wall) / repeat
+    print(f"{label:<8} {len(resp.content) / 1024:>9,.0f} KiB  {per_call * 1000:>9.2f} ms/response")
+    return resp.content, per_call
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--specs", type=int, default=10)
+    parser.add_argument("--images", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if json_response.orjson is None:
+        sys.exit("orjson is not installed (pip install orjson)")
+
+    payload = build_payload(args.products, args.specs, args.images)
+
+    stdlib, base = await timed("stdlib", plain_app(payload, JSONResponse), args.repeat)
+    default, t_default = await timed("default", plain_app(payload, FastJSONResponse), args.repeat)
+    route, t_route = await timed("route", route_app(payload), args.repeat)
+
+    assert json.loads(stdlib) == json.loads(default) == json.loads(route), "outputs differ"
+    print(f"speed-up: default ×{base / t_default:.1f}, route ×{base / t_route:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""
+Public-endpoint latency during a login storm.
+
+Measures a public path alone, then again while --logins clients hammer
+POST /api/auth/login. With bcrypt on the password executor (security.py) the
+public p99 should stay close to the baseline; with bcrypt on the event loop
+every login stalls the worker for the whole hash.
+
+    python benchmarks/login_storm.py --base-url http://127.0.0.1:8080 \
+        --email admin@example.com --password secret --logins 50 --duration 15
+
+Run against a single worker (uvicorn main:app) to see the effect most clearly.
+Logins answered with 503 (executor queue full) or 429 (login throttle, all
+clients share one IP and email here) are counted separately; start the server
+with LOGIN_THROTTLE_ENABLED=0 to measure bcrypt alone.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+
+from http_load import run_load, print_result, percentile  # noqa: E402
+
+
+async def login_storm(client, email, password, concurrency, stop: asyncio.Event):
+    latencies = []
+    statuses = {}
+
+    async def worker():
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                resp = await client.post("/api/auth/login", json={"email": email, "password": password})
+                statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+            except httpx.HTTPError:
+                statuses["error"] = statuses.get("error", 0) + 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {
+        "logins": len(latencies),
+        "statuses": statuses,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--path", default="/api/products/all/public", help="public endpoint to watch")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=50, help="concurrent login clients")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent public-endpoint clients")
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+
+    connections = args.logins + args.concurrency
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        print("baseline (no logins)")
+        baseline = await run_load(client, args.path, args.concurrency, args.duration)
+        print_result(baseline)
+
+        print(f"\nduring {args.logins} concurrent logins")
+        stop = asyncio.Event()
+        storm = asyncio.create_task(login_storm(client, args.email, args.password, args.logins, stop))
+        under_storm = await run_load(client, args.path, args.concurrency, args.duration)
+        stop.set()
+        logins = await storm
+        print_result(under_storm)
+        print(
+            f"{'POST /api/auth/login':<45} {logins['logins']:>9} logins  "
+            f"p50 {logins['p50_ms']:>7.1f} ms  p99 {logins['p99_ms']:>7.1f} ms  {logins['statuses']}"
+        )
+
+        ratio = under_storm["p99_ms"] / baseline["p99_ms"] if baseline["p99_ms"] else float("inf")
+        print(f"\npublic p99: {baseline['p99_ms']:.1f} ms → {under_storm['p99_ms']:.1f} ms ({ratio:.2f}×)")
+
+        resp = await client.post("/api/auth/login", json={"email": args.email, "password": args.password})
+        if resp.status_code == 200:
+            token = resp.json()["token"]
+            stats = await client.get("/api/auth/password-hasher/stats", headers={"Authorization": f"Bearer {token}"})
+            if stats.status_code == 200:
+                print(f"password executor (one worker): {stats.json()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,153 @@
+"""
+Product relation writes on edit: delete-all + re-insert vs. diff-based sync.
+
+Seeds a throwaway schema (BENCH_DB_NAME, default "fujiaire_bench") with one
+product holding --images gallery images and --specs specifications, then
+applies --edits edits, each replacing --changed images and one spec, with both
+strategies inside a transaction:
+
+    legacy   DELETE every relation row, INSERT the whole list again
+    diff     controllerProduct.sync_product_specs / sync_product_images
+
+Reports wall time per edit, statements sent, rows written and how far the
+product_images auto-increment moved.
+
+    python benchmarks/product_relations.py --images 40 --specs 10 --changed 2 --edits 200
+
+Uses the normal DB_HOST / DB_USER / DB_PASSWORD / DB_PORT settings. The
+benchmark schema is dropped and recreated on every run; never point
+BENCH_DB_NAME at the real database.
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCH_DB_NAME = os.getenv("BENCH_DB_NAME", "fujiaire_bench")
+
+import aiomysql  # noqa: E402
+import db  # noqa: E402
+from db import transaction  # noqa: E402
+from utils.query_executor import fetch_scalar, execute, execute_many, add_query_hook, remove_query_hook  # noqa: E402
+from controllers import controllerProduct  # noqa: E402
+
+PRODUCT_ID = 1
+
+SCHEMA = [
+    """CREATE TABLE product_spicification (
+        id INT PRIMARY KEY AUTO_INCREMENT, product_id INT, spicification_id INT,
+        KEY idx_product (product_id)
+    )""",
+    """CREATE TABLE product_images (
+        id INT PRIMARY KEY AUTO_INCREMENT, product_id INT, image_path VARCHAR(255),
+        created_at DATETIME, updated_at DATETIME, KEY idx_product (product_id)
+    )""",
+]
+
+
+async def seed():
+    conn = await aiomysql.connect(
+        host=os.getenv("DB_HOST"), user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"), port=int(os.getenv("DB_PORT", 3306)),
+        autocommit=True, charset="utf8mb4",
+    )
+    try:
+        async with conn.cursor() as cur:
+            await cur.execute(f"DROP DATABASE IF EXISTS `{BENCH_DB_NAME}`")
+            await cur.execute(f"CREATE DATABASE `{BENCH_DB_NAME}`")
+            await cur.execute(f"USE `{BENCH_DB_NAME}`")
+            for ddl in SCHEMA:
+                await cur.execute(ddl)
+    finally:
+        conn.close()
+
+
+async def legacy_write(spec_ids, paths, now):
+    async with transaction() as conn:
+        await execute("DELETE FROM product_spicification WHERE product_id=%s", (PRODUCT_ID,), conn=conn)
+        await execute_many(
+            "INSERT INTO product_spicification (product_id, spicification_id) VALUES (%s, %s)",
+            [(PRODUCT_ID, s) for s in spec_ids], conn=conn
+        )
+        await execute("DELETE FROM product_images WHERE product_id=%s", (PRODUCT_ID,), conn=conn)
+        await execute_many(
+            "INSERT INTO product_images (product_id, image_path, created_at, updated_at) VALUES (%s, %s, %s, %s)",
+            [(PRODUCT_ID, path, now, now) for path in paths], conn=conn
+        )
+
+
+async def diff_write(spec_ids, paths, now):
+    async with transaction() as conn:
+        await controllerProduct.sync_product_specs(PRODUCT_ID, spec_ids, conn)
+        await controllerProduct.sync_product_images(PRODUCT_ID, paths, now, conn)
+
+
+def edits(args):
+    """Edit i keeps every image but `changed` of them and swaps one spec."""
+    base_specs = list(range(1, args.specs + 1))
+    base_paths = [f"gallery/{k}.jpg" for k in range(args.images)]
+    for i in range(args.edits):
+        paths = list(base_paths)
+        for j in range(args.changed):
+            paths[(i + j) % len(paths)] = f"gallery/edit{i}_{j}.jpg"
+        specs = base_specs[:-1] + [args.specs + 1 + i % 2]
+        yield specs, paths
+
+
+async def run(label, write, args):
+    # Start every strategy from the same product
+    await legacy_write(list(range(1, args.specs + 1)), [f"gallery/{k}.jpg" for k in range(args.images)],
+                       datetime.datetime.utcnow())
+    auto_inc_before = await fetch_scalar("SELECT MAX(id) FROM product_images")
+
+    writes = {"statements": 0, "rows": 0}
+
+    def count(event):
+        if event["mode"] in ("execute", "execute_many"):
+            writes["statements"] += 1
+            writes["rows"] += max(event["rowcount"], 0)
+
+    add_query_hook(count)
+    started = time.perf_counter()
+    try:
+        for specs, paths in edits(args):
+            await write(specs, paths, datetime.datetime.utcnow())
+    finally:
+        remove_query_hook(count)
+    elapsed = time.perf_counter() - started
+
+    auto_inc_after = await fetch_scalar("SELECT MAX(id) FROM product_images")
+    print(
+        f"{label:<7} {elapsed / args.edits * 1000:8.2f} ms/edit  "
+        f"statements/edit {writes['statements'] / args.edits:5.1f}  "
+        f"rows written/edit {writes['rows'] / args.edits:6.1f}  "
+        f"image ids used {auto_inc_after - auto_inc_before:>7,}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--images", type=int, default=40)
+    parser.add_argument("--specs", type=int, default=10)
+    parser.add_argument("--changed", type=int, default=2, help="images replaced per edit")
+    parser.add_argument("--edits", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"Seeding {BENCH_DB_NAME}: 1 product × {args.images} images × {args.specs} specs")
+    await seed()
+
+    os.environ["DB_NAME"] = BENCH_DB_NAME
+    await db.init_db_pool()
+    try:
+        await run("legacy", legacy_write, args)
+        await run("diff", diff_write, args)
+    finally:
+        await db.close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Peak server RSS while many large gallery uploads run at once.
+
+Sends --concurrency simultaneous POST /api/gallery/create requests with a
+--size-mb file each, while sampling the resident memory of the server
+processes (the given pids and all their children, e.g. the gunicorn master):
+
+    python benchmarks/upload_memory.py --base-url http://127.0.0.1:8080 \
+        --pid $(pgrep -o gunicorn) --concurrency 20 --size-mb 50
+
+Run it before and after a change and compare "peak Δ". Linux only (/proc).
+The uploads really go to the configured FTP server; point CPANEL_FTP_* at a
+scratch account.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+
+def _children(pid: int) -> list:
+    pids = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                pids.extend(int(p) for p in f.read().split())
+    except OSError:
+        pass
+    return pids
+
+
+def rss_bytes(root_pids: list) -> int:
+    """Summed VmRSS of root_pids and all their descendants."""
+    total = 0
+    stack = list(root_pids)
+    while stack:
+        pid = stack.pop()
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+        stack.extend(_children(pid))
+    return total
+
+
+async def sample_rss(pids, stop: asyncio.Event, interval: float = 0.05) -> int:
+    peak = 0
+    while not stop.is_set():
+        peak = max(peak, rss_bytes(pids))
+        await asyncio.sleep(interval)
+    return peak
+
+
+async def upload(client, path, user_id):
+    start = time.perf_counter()
+    with open(path, "rb") as f:  # streamed from disk, not held in this process either
+        resp = await client.post(
+            "/api/gallery/create",
+            files={"file": ("bench.bin", f, "application/octet-stream")},
+            data={"user_id": str(user_id)},
+        )
+    return resp.status_code, time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--pid", type=int, action="append", required=True,
+                        help="server pid to measure (children included); repeatable")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--user-id", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile(suffix=".bin") as tmp:
+        block = os.urandom(1024 * 1024)
+        for _ in range(args.size_mb):
+            tmp.write(block)
+        tmp.flush()
+
+        baseline = rss_bytes(args.pid)
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_rss(args.pid, stop))
+
+        timeout = httpx.Timeout(600.0)
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout) as client:
+            wall = time.perf_counter()
+            results = await asyncio.gather(*(
+                upload(client, tmp.name, args.user_id) for _ in range(args.concurrency)
+            ))
+            wall = time.perf_counter() - wall
+
+        stop.set()
+        peak = await sampler
+
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    slowest = max(elapsed for _, elapsed in results)
+
+    mib = 1024 * 1024
+    print(f"{args.concurrency} × {args.size_mb} MB uploads in {wall:.1f}s (slowest {slowest:.1f}s), statuses {statuses}")
+    print(f"server RSS  baseline={baseline / mib:,.0f} MiB  peak={peak / mib:,.0f} MiB  "
+          f"peak Δ={(peak - baseline) / mib:,.0f} MiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,7 +1,8 @@
 import os
 import datetime
-import aiomysql
-from db import get_db_connection
+from utils.query_executor import fetch_one, fetch_all, execute
+from utils.response_cache import invalidate
+from utils.gallery_variants import attach_srcsets
 
 # -----------------------------------------------------------
 # 🔹 Fix duplicate URL — correct URL builder
@@ -18,38 +19,23 @@ def build_url(path: str):
     return f"{base}/{path.lstrip('/')}"
 
 
-# -----------------------------------------------------------
-# 🔹 Helper: run query with auto connection management
-# -----------------------------------------------------------
-async def execute_query(query: str, params=None, fetchone=False, fetchall=False, commit=False):
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute(query, params or ())
-            if commit:
-                await conn.commit()
-            if fetchone:
-                return await cursor.fetchone()
-            if fetchall:
-                return await cursor.fetchall()
-    finally:
-        conn.close()
-
-
 # -----------------------------------------------------------
 # 🔹 Get ALL banners (admin)
 # -----------------------------------------------------------
 async def get_all_banners():
-    rows = await execute_query("""
+    rows = await fetch_all("""
         SELECT b.*, g.path AS gallery_path
         FROM banner b
         LEFT JOIN gallery g ON b.image_id = g.id
-    """, fetchall=True)
+    """)
 
     for row in rows:
         row["path"] = build_url(row.get("path"))
         row["gallery_path"] = build_url(row.get("gallery_path"))
 
+    # srcset map of the gallery image (image_id), if it has variants
+    await attach_srcsets(rows)
+
     return rows
 
 
@@ -57,9 +43,9 @@ async def get_all_banners():
 # 🔹 Get banner by ID
 # -----------------------------------------------------------
 async def get_banner_by_id(banner_id: int):
-    row = await execute_query(
+    row = await fetch_one(
         "SELECT * FROM banner WHERE id = %s",
-        (banner_id,), fetchone=True
+        (banner_id,)
     )
 
     if row:
@@ -72,18 +58,19 @@ async def get_banner_by_id(banner_id: int):
 # 🔹 Get banner by type (public home sliders)
 # -----------------------------------------------------------
 async def get_banner_by_type(banner_type: int):
-    row = await execute_query("""
+    row = await fetch_one("""
         SELECT b.*, g.path AS gallery_path
         FROM banner b
         LEFT JOIN gallery g ON b.image_id = g.id
         WHERE b.status = 1 AND b.type = %s
         ORDER BY b.updated_at DESC
         LIMIT 1
-    """, (banner_type,), fetchone=True)
+    """, (banner_type,))
 
     if row:
         row["path"] = build_url(row.get("path"))
         row["gallery_path"] = build_url(row.get("gallery_path"))
+        await attach_srcsets([row])
 
     return row
 
@@ -95,34 +82,29 @@ async def create_banner(data: dict):
     now = datetime.datetime.utcnow()
 
     # Validate user
-    user_check = await execute_query(
+    user_check = await fetch_one(
         "SELECT id FROM users WHERE id = %s",
-        (data.get("user_id"),), fetchone=True
+        (data.get("user_id"),)
     )
     if not user_check:
         raise ValueError("user_id not found")
 
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute("""
-                INSERT INTO banner (image_id, title, path, user_id, status, type, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                data.get("image_id"),
-                data.get("title"),
-                data.get("path"),
-                data.get("user_id"),
-                data.get("status", 1),
-                data.get("type"),
-                now,
-                now,
-            ))
-
-            await conn.commit()
-            banner_id = cursor.lastrowid
-    finally:
-        conn.close()
+    result = await execute("""
+        INSERT INTO banner (image_id, title, path, user_id, status, type, created_at, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, (
+        data.get("image_id"),
+        data.get("title"),
+        data.get("path"),
+        data.get("user_id"),
+        data.get("status", 1),
+        data.get("type"),
+        now,
+        now,
+    ))
+    banner_id = result.lastrowid
+
+    invalidate("banner")
 
     # Return clean JSON
     return {
@@ -138,9 +120,9 @@ async def create_banner(data: dict):
 # 🔹 Update banner
 # -----------------------------------------------------------
 async def update_banner(banner_id: int, data: dict):
-    existing = await execute_query(
+    existing = await fetch_one(
         "SELECT created_at FROM banner WHERE id = %s",
-        (banner_id,), fetchone=True
+        (banner_id,)
     )
 
     if not existing:
@@ -148,7 +130,7 @@ async def update_banner(banner_id: int, data: dict):
 
     updated_at = datetime.datetime.utcnow()
 
-    await execute_query("""
+    await execute("""
         UPDATE banner
         SET image_id=%s, title=%s, path=%s, user_id=%s,
             status=%s, type=%s, created_at=%s, updated_at=%s
@@ -163,8 +145,9 @@ async def update_banner(banner_id: int, data: dict):
         existing["created_at"],
         updated_at,
         banner_id,
-    ), commit=True)
+    ))
 
+    invalidate("banner")
     return {
         "id": banner_id,
         **data,
@@ -178,10 +161,11 @@ async def update_banner(banner_id: int, data: dict):
 # 🔹 Soft delete
 # -----------------------------------------------------------
 async def delete_banner(banner_id: int):
-    await execute_query(
+    await execute(
         "UPDATE banner SET status = 0 WHERE id = %s",
-        (banner_id,), commit=True
+        (banner_id,)
     )
+    invalidate("banner")
     return {"message": f"Banner {banner_id} soft-deleted"}
 
 
@@ -189,15 +173,18 @@ async def delete_banner(banner_id: int):
 # 🔹 For PUBLIC API (frontend)
 # -----------------------------------------------------------
 async def get_all_banners_public():
-    rows = await execute_query("""
+    rows = await fetch_all("""
         SELECT b.*, g.path AS gallery_path
         FROM banner b
         LEFT JOIN gallery g ON b.image_id = g.id
         WHERE b.status = 1
-    """, fetchall=True)
+    """)
 
     for row in rows:
         row["path"] = build_url(row.get("path"))
         row["gallery_path"] = build_url(row.get("gallery_path"))
 
+    # srcset map of the gallery image (image_id), if it has variants
+    await attach_srcsets(rows)
+
     return rows
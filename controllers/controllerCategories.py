@@ -1,58 +1,52 @@
 import datetime
-import aiomysql
-from db import get_db_connection
+from db import db_connection, transaction
+from utils.query_executor import fetch_one, fetch_all, execute, execute_many
+from utils.response_cache import invalidate
 
 
 # ✅ Get all categories (admin)
 async def get_all_categories():
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM category")
-        categories = await cursor.fetchall()
+    async with db_connection() as conn:
+        categories = await fetch_all("SELECT * FROM category", conn=conn)
 
         # Fetch related images for each category
         for category in categories:
-            await cursor.execute(
+            category["images"] = await fetch_all(
                 "SELECT id, image_id, path FROM category_images WHERE category_id = %s",
-                (category["id"],)
+                (category["id"],),
+                conn=conn
             )
-            category["images"] = await cursor.fetchall()
 
-    conn.close()
     return categories
 
 
 # ✅ Get category by ID
 async def get_category_by_id(category_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM category WHERE id = %s", (category_id,))
-        category = await cursor.fetchone()
+    async with db_connection() as conn:
+        category = await fetch_one("SELECT * FROM category WHERE id = %s", (category_id,), conn=conn)
 
         if category:
-            await cursor.execute(
+            category["images"] = await fetch_all(
                 "SELECT id, image_id, path FROM category_images WHERE category_id = %s",
-                (category_id,)
+                (category_id,),
+                conn=conn
             )
-            category["images"] = await cursor.fetchall()
         else:
             category = None
 
-    conn.close()
     return category
 
 
 # ✅ Create a new category
 async def create_category(data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        now = datetime.datetime.now()
+    now = datetime.datetime.now()
 
-        images = data.get("images", [])
-        first_image = images[0] if images else None
+    images = data.get("images", [])
+    first_image = images[0] if images else None
 
+    async with transaction() as conn:
         # Insert into main category table
-        await cursor.execute("""
+        result = await execute("""
             INSERT INTO category
                 (name, image_id, path, discriptions, user_id, status, created_at, updated_at)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
@@ -65,24 +59,16 @@ async def create_category(data: dict):
             data.get("status", 1),
             now,
             now
-        ))
-        category_id = cursor.lastrowid
+        ), conn=conn)
+        category_id = result.lastrowid
 
         # Insert multiple images
-        for img in images:
-            await cursor.execute("""
-                INSERT INTO category_images (category_id, image_id, path, created_at)
-                VALUES (%s, %s, %s, %s)
-            """, (
-                category_id,
-                img.get("id"),
-                img.get("path"),
-                now
-            ))
-
-        await conn.commit()
+        await execute_many("""
+            INSERT INTO category_images (category_id, image_id, path, created_at)
+            VALUES (%s, %s, %s, %s)
+        """, [(category_id, img.get("id"), img.get("path"), now) for img in images], conn=conn)
 
-    conn.close()
+    invalidate("category")
     return {
         "id": category_id,
         "name": data.get("name"),
@@ -97,20 +83,17 @@ async def create_category(data: dict):
 
 # ✅ Update category
 async def update_category(category_id: int, data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
+    async with transaction() as conn:
         # Preserve created_at
-        await cursor.execute("SELECT created_at FROM category WHERE id = %s", (category_id,))
-        row = await cursor.fetchone()
+        row = await fetch_one("SELECT created_at FROM category WHERE id = %s", (category_id,), conn=conn)
         if not row:
-            conn.close()
             return {"error": "Category not found"}
 
         created_at = row["created_at"]
         updated_at = datetime.datetime.now()
 
         # Update main category
-        await cursor.execute("""
+        await execute("""
             UPDATE category
             SET name = %s, image_id = %s, path = %s, user_id = %s,
                 discriptions = %s, status = %s, created_at = %s, updated_at = %s
@@ -125,25 +108,17 @@ async def update_category(category_id: int, data: dict):
             created_at,
             updated_at,
             category_id
-        ))
+        ), conn=conn)
 
         # Manage multi-images
         if "images" in data:
-            await cursor.execute("DELETE FROM category_images WHERE category_id = %s", (category_id,))
-            for img in data["images"]:
-                await cursor.execute("""
-                    INSERT INTO category_images (category_id, image_id, path, created_at)
-                    VALUES (%s, %s, %s, %s)
-                """, (
-                    category_id,
-                    img.get("id"),
-                    img.get("path"),
-                    created_at
-                ))
-
-        await conn.commit()
-
-    conn.close()
+            await execute("DELETE FROM category_images WHERE category_id = %s", (category_id,), conn=conn)
+            await execute_many("""
+                INSERT INTO category_images (category_id, image_id, path, created_at)
+                VALUES (%s, %s, %s, %s)
+            """, [(category_id, img.get("id"), img.get("path"), created_at) for img in data["images"]], conn=conn)
+
+    invalidate("category")
     return {
         "id": category_id,
         **data,
@@ -154,28 +129,22 @@ async def update_category(category_id: int, data: dict):
 
 # ✅ Soft delete category
 async def delete_category(category_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        await cursor.execute("UPDATE category SET status = 0 WHERE id = %s", (category_id,))
-        await conn.commit()
-    conn.close()
+    await execute("UPDATE category SET status = 0 WHERE id = %s", (category_id,))
+    invalidate("category")
     return {"message": f"Category {category_id} soft-deleted (status = 0)"}
 
 
 # ✅ Get all categories (public)
 async def get_all_categories_public():
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM category WHERE status = 1")
-        categories = await cursor.fetchall()
+    async with db_connection() as conn:
+        categories = await fetch_all("SELECT * FROM category WHERE status = 1", conn=conn)
 
         # Fetch related images
         for category in categories:
-            await cursor.execute(
+            category["images"] = await fetch_all(
                 "SELECT id, image_id, path FROM category_images WHERE category_id = %s",
-                (category["id"],)
+                (category["id"],),
+                conn=conn
             )
-            category["images"] = await cursor.fetchall()
 
-    conn.close()
     return categories
@@ -1,189 +1,139 @@
 import datetime
-from db import get_db_connection
 from fastapi import HTTPException
-import aiomysql
+from utils.query_executor import fetch_one, fetch_all, execute
+from utils.response_cache import invalidate
 
 # ------------------------------
 # Get all (Admin)
 # ------------------------------
 async def get_all_choose_us():
-    conn = await get_db_connection()
     try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute("SELECT * FROM choose_us ORDER BY id DESC")
-            rows = await cursor.fetchall()
-        return rows
+        return await fetch_all("SELECT * FROM choose_us ORDER BY id DESC")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching choose_us: {e}")
-    finally:
-        conn.close()
 
 # ------------------------------
 # Get by ID
 # ------------------------------
 async def get_choose_us_by_id(choose_id: int):
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute("SELECT * FROM choose_us WHERE id = %s", (choose_id,))
-            row = await cursor.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="Choose Us not found")
-        return row
-    finally:
-        conn.close()
+    row = await fetch_one("SELECT * FROM choose_us WHERE id = %s", (choose_id,))
+    if not row:
+        raise HTTPException(status_code=404, detail="Choose Us not found")
+    return row
 
 # ------------------------------
 # Create
 # ------------------------------
 async def create_choose_us(data: dict):
-    conn = await get_db_connection()
     try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            now = datetime.datetime.now()
-
-            # Validate user_id
-            await cursor.execute("SELECT id FROM users WHERE id = %s", (data.get("user_id"),))
-            if not await cursor.fetchone():
-                raise HTTPException(status_code=400, detail="user_id not found")
-
-            await cursor.execute("""
-                INSERT INTO choose_us (image_id, title, category, category_sub, descriptions, path, user_id, status, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                data.get("image_id"),
-                data.get("title"),
-                data.get("category"),
-                data.get("category_sub"),
-                data.get("descriptions"),
-                data.get("path"),
-                data.get("user_id"),
-                data.get("status", 1),
-                now,
-                now
-            ))
-
-            await conn.commit()
-            choose_id = cursor.lastrowid
-            return {"id": choose_id, **data, "created_at": now, "updated_at": now}
+        now = datetime.datetime.now()
+
+        # Validate user_id
+        if not await fetch_one("SELECT id FROM users WHERE id = %s", (data.get("user_id"),)):
+            raise HTTPException(status_code=400, detail="user_id not found")
+
+        result = await execute("""
+            INSERT INTO choose_us (image_id, title, category, category_sub, descriptions, path, user_id, status, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            data.get("image_id"),
+            data.get("title"),
+            data.get("category"),
+            data.get("category_sub"),
+            data.get("descriptions"),
+            data.get("path"),
+            data.get("user_id"),
+            data.get("status", 1),
+            now,
+            now
+        ))
+
+        choose_id = result.lastrowid
+        invalidate("choose_us")
+        return {"id": choose_id, **data, "created_at": now, "updated_at": now}
     except Exception as e:
-        await conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 # ------------------------------
 # Update
 # ------------------------------
 async def update_choose_us(choose_id: int, data: dict):
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute("SELECT created_at FROM choose_us WHERE id = %s", (choose_id,))
-            row = await cursor.fetchone()
-            if not row:
-                raise HTTPException(status_code=404, detail="Choose Us item not found")
-
-            created_at = row["created_at"]
-            updated_at = datetime.datetime.now()
-
-            await cursor.execute("""
-                UPDATE choose_us SET image_id=%s, title=%s, category=%s, category_sub=%s, descriptions=%s, path=%s,
-                    user_id=%s, status=%s, created_at=%s, updated_at=%s WHERE id=%s
-            """, (
-                data.get("image_id"),
-                data.get("title"),
-                data.get("category"),
-                data.get("category_sub"),
-                data.get("descriptions"),
-                data.get("path"),
-                data.get("user_id"),
-                data.get("status", 1),
-                created_at,
-                updated_at,
-                choose_id
-            ))
-
-            await conn.commit()
-            return {"id": choose_id, **data, "created_at": created_at, "updated_at": updated_at}
-    finally:
-        conn.close()
+    row = await fetch_one("SELECT created_at FROM choose_us WHERE id = %s", (choose_id,))
+    if not row:
+        raise HTTPException(status_code=404, detail="Choose Us item not found")
+
+    created_at = row["created_at"]
+    updated_at = datetime.datetime.now()
+
+    await execute("""
+        UPDATE choose_us SET image_id=%s, title=%s, category=%s, category_sub=%s, descriptions=%s, path=%s,
+            user_id=%s, status=%s, created_at=%s, updated_at=%s WHERE id=%s
+    """, (
+        data.get("image_id"),
+        data.get("title"),
+        data.get("category"),
+        data.get("category_sub"),
+        data.get("descriptions"),
+        data.get("path"),
+        data.get("user_id"),
+        data.get("status", 1),
+        created_at,
+        updated_at,
+        choose_id
+    ))
+
+    invalidate("choose_us")
+    return {"id": choose_id, **data, "created_at": created_at, "updated_at": updated_at}
 
 # ------------------------------
 # Delete (Soft)
 # ------------------------------
 async def delete_choose_us(choose_id: int):
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor() as cursor:
-            await cursor.execute("UPDATE choose_us SET status = 0 WHERE id = %s", (choose_id,))
-            await conn.commit()
-        return {"message": f"Choose Us {choose_id} soft-deleted"}
-    finally:
-        conn.close()
+    await execute("UPDATE choose_us SET status = 0 WHERE id = %s", (choose_id,))
+    invalidate("choose_us")
+    return {"message": f"Choose Us {choose_id} soft-deleted"}
 
 # ------------------------------
 # Get all (Public)
 # ------------------------------
 async def get_all_choose_us_public():
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute("SELECT * FROM choose_us WHERE status = 1 ORDER BY id DESC")
-            rows = await cursor.fetchall()
-        return rows
-    finally:
-        conn.close()
+    return await fetch_all("SELECT * FROM choose_us WHERE status = 1 ORDER BY id DESC")
 
 # ------------------------------
 # Get by ID (Public)
 # ------------------------------
 async def get_choose_us_by_id_public(choose_id: int):
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute("SELECT * FROM choose_us WHERE id = %s", (choose_id,))
-            row = await cursor.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="Choose Us not found")
-        return row
-    finally:
-        conn.close()
+    row = await fetch_one("SELECT * FROM choose_us WHERE id = %s", (choose_id,))
+    if not row:
+        raise HTTPException(status_code=404, detail="Choose Us not found")
+    return row
 
 
 async def get_process_public(choose_id: int, data: dict):
-    conn = await get_db_connection()
     try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            # ✅ Check if record exists
-            await cursor.execute("SELECT id FROM choose_us WHERE id = %s", (choose_id,))
-            row = await cursor.fetchone()
-            if not row:
-                return {"success": False, "error": "choose us not found"}
-
-            # ✅ Update only 'our_process' field
-            await cursor.execute("""
-                UPDATE choose_us 
-                SET our_process = %s,
-                    updated_at = %s
-                WHERE id = %s
-            """, (
-                data.get("our_process"),
-                datetime.datetime.utcnow(),
-                choose_id
-            ))
-
-            await conn.commit()
-
-            return {
-                "success": True,
-                "id": choose_id,
-                "our_process": data.get("our_process")
-            }
+        # ✅ Check if record exists
+        row = await fetch_one("SELECT id FROM choose_us WHERE id = %s", (choose_id,))
+        if not row:
+            return {"success": False, "error": "choose us not found"}
+
+        # ✅ Update only 'our_process' field
+        await execute("""
+            UPDATE choose_us
+            SET our_process = %s,
+                updated_at = %s
+            WHERE id = %s
+        """, (
+            data.get("our_process"),
+            datetime.datetime.utcnow(),
+            choose_id
+        ))
+
+        invalidate("choose_us")
+        return {
+            "success": True,
+            "id": choose_id,
+            "our_process": data.get("our_process")
+        }
 
     except Exception as e:
-        await conn.rollback()
         return {"success": False, "error": str(e)}
-
-    finally:
-        conn.close()
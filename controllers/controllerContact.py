@@ -1,85 +1,77 @@
-import aiomysql
-from db import get_db_connection
+from utils.query_executor import fetch_one, fetch_all, fetch_scalar, execute
+from utils.response_cache import invalidate
+from utils.pagination import is_paged, page_args, keyset_filter, build_page
 
 # ----------------------------------------
 # Get all contact records
 # ----------------------------------------
-async def get_all_contacts():
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM contact_us")
-        rows = await cursor.fetchall()
-    conn.close()
-    return rows
+async def get_all_contacts(cursor: str = None, limit: int = None, with_total: bool = False):
+    if not is_paged(cursor, limit):
+        return await fetch_all("SELECT * FROM contact_us")
+
+    after_id, limit = page_args(cursor, limit)
+    keyset, params = keyset_filter("id", after_id)
+    rows = await fetch_all(
+        f"SELECT * FROM contact_us WHERE {keyset} ORDER BY id LIMIT %s",
+        (*params, limit + 1)
+    )
+    total = await fetch_scalar("SELECT COUNT(*) FROM contact_us") if with_total else None
+    return build_page(rows, limit, total=total)
 
 # ----------------------------------------
 # Get contact by ID
 # ----------------------------------------
 async def get_contact_by_id(contact_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM contact_us WHERE id = %s", (contact_id,))
-        row = await cursor.fetchone()
-    conn.close()
-    return row
+    return await fetch_one("SELECT * FROM contact_us WHERE id = %s", (contact_id,))
 
 # ----------------------------------------
 # Create a new contact record
 # ----------------------------------------
 async def create_contact(data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        await cursor.execute("""
-            INSERT INTO contact_us (title, email, telegram, facebook, instagram, tiktok, youtube, address)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            data.get("title"),
-            data.get("email"),
-            data.get("telegram"),
-            data.get("facebook"),
-            data.get("instagram"),
-            data.get("tiktok"),
-            data.get("youtube"),
-            data.get("address"),
-        ))
-        await conn.commit()
-        contact_id = cursor.lastrowid
-    conn.close()
+    result = await execute("""
+        INSERT INTO contact_us (title, email, telegram, facebook, instagram, tiktok, youtube, address)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, (
+        data.get("title"),
+        data.get("email"),
+        data.get("telegram"),
+        data.get("facebook"),
+        data.get("instagram"),
+        data.get("tiktok"),
+        data.get("youtube"),
+        data.get("address"),
+    ))
+    contact_id = result.lastrowid
+    invalidate("contact_us")
     return {"id": contact_id, **data}
 
 # ----------------------------------------
 # Update contact by ID
 # ----------------------------------------
 async def update_contact(contact_id: int, data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        await cursor.execute("""
-            UPDATE contact_us SET
-            title = %s, email = %s, telegram = %s, facebook = %s,
-            instagram = %s, tiktok = %s, youtube = %s, address = %s
-            WHERE id = %s
-        """, (
-            data.get("title"),
-            data.get("email"),
-            data.get("telegram"),
-            data.get("facebook"),
-            data.get("instagram"),
-            data.get("tiktok"),
-            data.get("youtube"),
-            data.get("address"),
-            contact_id
-        ))
-        await conn.commit()
-    conn.close()
+    await execute("""
+        UPDATE contact_us SET
+        title = %s, email = %s, telegram = %s, facebook = %s,
+        instagram = %s, tiktok = %s, youtube = %s, address = %s
+        WHERE id = %s
+    """, (
+        data.get("title"),
+        data.get("email"),
+        data.get("telegram"),
+        data.get("facebook"),
+        data.get("instagram"),
+        data.get("tiktok"),
+        data.get("youtube"),
+        data.get("address"),
+        contact_id
+    ))
+    invalidate("contact_us")
     return {"id": contact_id, **data}
 
 # ----------------------------------------
 # Delete contact by ID
 # ----------------------------------------
 async def delete_contact(contact_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        await cursor.execute("DELETE FROM contact_us WHERE id = %s", (contact_id,))
-        await conn.commit()
-    conn.close()
+    await execute("DELETE FROM contact_us WHERE id = %s", (contact_id,))
+    invalidate("contact_us")
     return {"message": f"Contact {contact_id} deleted"}
@@ -3,7 +3,8 @@ import datetime
 import httpx
 import aiosmtplib
 from email.message import EmailMessage
-from db import get_db_connection
+from utils.query_executor import execute
+from utils.response_cache import invalidate
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -23,18 +24,15 @@ TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
 
 async def save_to_database(name: str, email: str, subject: str, message: str):
-    conn = await get_db_connection()
-    async with conn.cursor() as cur:
-        created_at = updated_at = datetime.datetime.utcnow()
-        await cur.execute(
-            """
-            INSERT INTO contact_us (name, email, subject, message, created_at, updated_at)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """,
-            (name, email, subject, message, created_at, updated_at),
-        )
-    await conn.commit()
-    conn.close()  # no await here
+    created_at = updated_at = datetime.datetime.utcnow()
+    await execute(
+        """
+        INSERT INTO contact_us (name, email, subject, message, created_at, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """,
+        (name, email, subject, message, created_at, updated_at),
+    )
+    invalidate("contact_us")
 
 
 async def send_email(name: str, email: str, subject: str, message: str):
@@ -1,52 +1,49 @@
 import datetime
-import aiomysql
-from db import get_db_connection
+from utils.query_executor import fetch_one, fetch_all, fetch_scalar, execute
+from utils.pagination import is_paged, page_args, keyset_filter, build_page
 
 # -------------------------------------------------
 # Get all form contact entries
 # -------------------------------------------------
-async def get_all_form_contacts():
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM form_contact ORDER BY id DESC")
-        rows = await cursor.fetchall()
-    conn.close()
-    return rows
+async def get_all_form_contacts(cursor: str = None, limit: int = None, with_total: bool = False):
+    if not is_paged(cursor, limit):
+        return await fetch_all("SELECT * FROM form_contact ORDER BY id DESC")
+
+    # Newest first, like the unpaged list
+    after_id, limit = page_args(cursor, limit)
+    keyset, params = keyset_filter("id", after_id, descending=True)
+    rows = await fetch_all(
+        f"SELECT * FROM form_contact WHERE {keyset} ORDER BY id DESC LIMIT %s",
+        (*params, limit + 1)
+    )
+    total = await fetch_scalar("SELECT COUNT(*) FROM form_contact") if with_total else None
+    return build_page(rows, limit, total=total)
 
 
 # -------------------------------------------------
 # Get single form contact by ID
 # -------------------------------------------------
 async def get_form_contact_by_id(contact_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM form_contact WHERE id = %s", (contact_id,))
-        row = await cursor.fetchone()
-    conn.close()
-    return row
+    return await fetch_one("SELECT * FROM form_contact WHERE id = %s", (contact_id,))
 
 
 # -------------------------------------------------
 # Create new form contact
 # -------------------------------------------------
 async def create_form_contact(data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        now = datetime.datetime.now()
-        await cursor.execute("""
-            INSERT INTO form_contact (title, name, subject, email, message, created_at)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """, (
-            data.get("title"),
-            data.get("name"),
-            data.get("subject"),
-            data.get("email"),
-            data.get("message"),
-            now
-        ))
-        await conn.commit()
-        contact_id = cursor.lastrowid
-    conn.close()
+    now = datetime.datetime.now()
+    result = await execute("""
+        INSERT INTO form_contact (title, name, subject, email, message, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, (
+        data.get("title"),
+        data.get("name"),
+        data.get("subject"),
+        data.get("email"),
+        data.get("message"),
+        now
+    ))
+    contact_id = result.lastrowid
     return {"id": contact_id, **data, "created_at": now}
 
 
@@ -54,32 +51,26 @@ async def create_form_contact(data: dict):
 # Update existing form contact
 # -------------------------------------------------
 async def update_form_contact(contact_id: int, data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        # Preserve created_at
-        await cursor.execute("SELECT created_at FROM form_contact WHERE id = %s", (contact_id,))
-        row = await cursor.fetchone()
-        if not row:
-            conn.close()
-            return {"error": "Form contact not found"}
+    # Preserve created_at
+    row = await fetch_one("SELECT created_at FROM form_contact WHERE id = %s", (contact_id,))
+    if not row:
+        return {"error": "Form contact not found"}
 
-        created_at = row["created_at"]
+    created_at = row["created_at"]
 
-        await cursor.execute("""
-            UPDATE form_contact
-            SET title = %s, name = %s, subject = %s, email = %s, message = %s, created_at = %s
-            WHERE id = %s
-        """, (
-            data.get("title"),
-            data.get("name"),
-            data.get("subject"),
-            data.get("email"),
-            data.get("message"),
-            created_at,
-            contact_id
-        ))
-        await conn.commit()
-    conn.close()
+    await execute("""
+        UPDATE form_contact
+        SET title = %s, name = %s, subject = %s, email = %s, message = %s, created_at = %s
+        WHERE id = %s
+    """, (
+        data.get("title"),
+        data.get("name"),
+        data.get("subject"),
+        data.get("email"),
+        data.get("message"),
+        created_at,
+        contact_id
+    ))
     return {"id": contact_id, **data, "created_at": created_at}
 
 
@@ -87,9 +78,5 @@ async def update_form_contact(contact_id: int, data: dict):
 # Delete a form contact
 # -------------------------------------------------
 async def delete_form_contact(contact_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        await cursor.execute("DELETE FROM form_contact WHERE id = %s", (contact_id,))
-        await conn.commit()
-    conn.close()
+    await execute("DELETE FROM form_contact WHERE id = %s", (contact_id,))
     return {"message": f"Form contact {contact_id} deleted"}
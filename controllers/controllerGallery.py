@@ -1,58 +1,347 @@
 import os
+import asyncio
 import datetime
-import aiomysql
 from fastapi.responses import JSONResponse
-from db import get_db_connection
-from cpanel_ftp_uploader import upload_to_ftp
+from db import transaction
+from utils.query_executor import fetch_one, fetch_all, fetch_scalar, execute
+from utils.pagination import is_paged, page_args, keyset_filter, build_page
+from utils.storage import get_storage, UploadTooLarge, UPLOAD_MAX_BYTES
+from utils.content_hash import hash_upload, content_name
+from utils.response_cache import invalidate
+from utils.gallery_variants import schedule_gallery_variants, copy_gallery_variants, attach_srcsets
+from utils.image_variants import IMAGE_VARIANTS_ENABLED
+from utils.upload_jobs import (
+    spool_upload, enqueue_upload, remove_spool,
+    GALLERY_DELETED, GALLERY_ACTIVE, GALLERY_PENDING, GALLERY_FAILED,
+)
 
 
 # ------------------------------------------------------
-# CREATE GALLERY ITEM + UPLOAD IMAGE TO CPANEL (FTP)
+# CONTENT DEDUPLICATION HELPERS
+# ------------------------------------------------------
+async def _stored_by_hash(digests) -> dict:
+    """{content_hash: {"id", "path"}} for hashes whose file is already in storage."""
+    digests = sorted(set(digests))
+    if not digests:
+        return {}
+
+    # Soft-deleted rows still have their file; pending / failed ones may not
+    placeholders = ",".join(["%s"] * len(digests))
+    rows = await fetch_all(f"""
+        SELECT id, path, content_hash FROM gallery
+        WHERE content_hash IN ({placeholders}) AND status IN (%s, %s)
+        ORDER BY id
+    """, (*digests, GALLERY_ACTIVE, GALLERY_DELETED))
+
+    found = {}
+    for row in rows:
+        found.setdefault(row["content_hash"], row)
+    return found
+
+
+async def _queue_variants(file, filename: str, gallery_ids: list, reuse_from: int = None):
+    """Variants for new rows: copied from `reuse_from` when it has them, rendered otherwise."""
+    try:
+        if reuse_from and await copy_gallery_variants(reuse_from, gallery_ids):
+            return
+        if IMAGE_VARIANTS_ENABLED:
+            spool_path, _, _ = await spool_upload(file)
+            schedule_gallery_variants(gallery_ids[0], spool_path, filename, share_with=tuple(gallery_ids[1:]))
+    except Exception as e:
+        print(f"⚠️ Gallery {gallery_ids[0]}: could not queue image variants: {e}")
+
+
+# ------------------------------------------------------
+# CREATE GALLERY ITEM + UPLOAD IMAGE TO MEDIA STORAGE
 # ------------------------------------------------------
 async def create_gallery(file, user_id: int, image_id: int = None):
-    db = await get_db_connection()
-    is_pool = hasattr(db, "acquire")
     now = datetime.datetime.utcnow()
 
     try:
-        file_bytes = await file.read()
-        if not file_bytes:
+        # Reject early when the size is already known; hashing and the storage driver enforce it again
+        if (getattr(file, "size", None) or 0) > UPLOAD_MAX_BYTES:
+            return JSONResponse(status_code=413, content={"error": f"File exceeds the {UPLOAD_MAX_BYTES} byte upload limit"})
+
+        try:
+            digest, size = await hash_upload(file)
+        except UploadTooLarge as e:
+            return JSONResponse(status_code=413, content={"error": str(e)})
+
+        if not size:
             return JSONResponse(status_code=400, content={"error": "File is empty"})
 
-        filename = f"{now.strftime('%Y%m%d%H%M%S')}_{file.filename}"
+        # Same bytes as an earlier upload: point at that file instead of sending it again
+        existing = (await _stored_by_hash([digest])).get(digest)
+        if existing:
+            filename = existing["path"]
+        else:
+            filename = content_name(digest, file.filename)
+
+            # Streamed to storage chunk by chunk, never held in memory as a whole
+            try:
+                written = await get_storage().save(file, filename)
+            except UploadTooLarge as e:
+                return JSONResponse(status_code=413, content={"error": str(e)})
+            except Exception:
+                return JSONResponse(status_code=500, content={"error": "Storage upload failed"})
 
-        uploaded = await upload_to_ftp(file_bytes, filename)
-        if not uploaded:
-            return JSONResponse(status_code=500, content={"error": "FTP upload failed"})
+            if not written:
+                return JSONResponse(status_code=400, content={"error": "File is empty"})
 
         base_url = os.getenv('CPANEL_BASE_URL', '').rstrip('/')
         image_url = f"{base_url}/{filename}" if base_url else filename
 
         query = """
-            INSERT INTO gallery (path, image_id, user_id, status, created_at, updated_at)
-            VALUES (%s, %s, %s, 1, %s, %s)
+            INSERT INTO gallery (path, content_hash, image_id, user_id, status, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, 1, %s, %s)
         """
 
-        if is_pool:
-            async with db.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute(query, (filename, image_id, user_id, now, now))
-                    await conn.commit()
+        result = await execute(query, (filename, digest, image_id, user_id, now, now))
+
+        # Thumbnails / WebP / AVIF are rendered after the response, from a local copy
+        await _queue_variants(file, filename, [result.lastrowid], reuse_from=existing and existing["id"])
+
+        invalidate("gallery")
+        return {
+            "message": "Upload successful",
+            "file": filename,
+            "url": image_url,
+            "deduplicated": bool(existing),
+        }
+
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+
+# ------------------------------------------------------
+# CREATE MANY GALLERY ITEMS IN ONE REQUEST
+# ------------------------------------------------------
+GALLERY_BATCH_MAX_FILES = int(os.getenv("GALLERY_BATCH_MAX_FILES", 50))
+# Transfers in flight per batch; 0 = what the storage driver handles at once (FTP: the pool size)
+GALLERY_BATCH_CONCURRENCY = int(os.getenv("GALLERY_BATCH_CONCURRENCY", 0))
+
+
+async def create_gallery_batch(files: list, user_id: int, image_id: int = None):
+    if not files:
+        return JSONResponse(status_code=400, content={"error": "No files uploaded"})
+    if len(files) > GALLERY_BATCH_MAX_FILES:
+        return JSONResponse(status_code=400, content={"error": f"At most {GALLERY_BATCH_MAX_FILES} files per batch"})
+
+    now = datetime.datetime.utcnow()
+    base_url = os.getenv('CPANEL_BASE_URL', '').rstrip('/')
+    storage = get_storage()
+    semaphore = asyncio.Semaphore(GALLERY_BATCH_CONCURRENCY or storage.concurrency)
+
+    results = [
+        {"index": i, "name": file.filename, "status": "failed"} for i, file in enumerate(files)
+    ]
+
+    # Hash everything first (local reads), so duplicates are known before any transfer
+    digests = {}
+    for result, file in zip(results, files):
+        if (getattr(file, "size", None) or 0) > UPLOAD_MAX_BYTES:
+            result["error"] = f"File exceeds the {UPLOAD_MAX_BYTES} byte upload limit"
+            continue
+        try:
+            digest, size = await hash_upload(file)
+        except UploadTooLarge as e:
+            result["error"] = str(e)
+            continue
+        if not size:
+            result["error"] = "File is empty"
+            continue
+        digests[result["index"]] = digest
+
+    existing = await _stored_by_hash(digests.values())
+
+    # One transfer per new content hash; later files with the same bytes wait for it
+    first_of = {}
+    for index, digest in digests.items():
+        if digest not in existing:
+            first_of.setdefault(digest, index)
+
+    async def upload_one(digest: str, index: int):
+        filename = content_name(digest, files[index].filename)
+        async with semaphore:
+            try:
+                written = await storage.save(files[index], filename)
+            except UploadTooLarge as e:
+                return digest, None, str(e)
+            except Exception:
+                return digest, None, "Storage upload failed"
+        if not written:
+            return digest, None, "File is empty"
+        return digest, filename, None
+
+    stored = {digest: row["path"] for digest, row in existing.items()}
+    errors = {}
+    for digest, filename, error in await asyncio.gather(*(
+        upload_one(digest, index) for digest, index in first_of.items()
+    )):
+        if filename:
+            stored[digest] = filename
+        else:
+            errors[digest] = error
+
+    uploaded = []
+    for index, digest in digests.items():
+        result = results[index]
+        if digest in stored:
+            filename = stored[digest]
+            result.update(
+                status="uploaded",
+                file=filename,
+                url=f"{base_url}/{filename}" if base_url else filename,
+                deduplicated=digest in existing or first_of.get(digest) != index,
+            )
+            uploaded.append(result)
         else:
-            async with db.cursor() as cursor:
-                await cursor.execute(query, (filename, image_id, user_id, now, now))
-                await db.commit()
+            result["error"] = errors.get(digest, "Storage upload failed")
+
+    if uploaded:
+        try:
+            # One row at a time so each id is its own lastrowid: a multi-row INSERT's ids
+            # are not consecutive under auto_increment_increment > 1, and executemany
+            # may split the batch. One transaction keeps it one commit.
+            async with transaction() as conn:
+                for r in uploaded:
+                    inserted = await execute("""
+                        INSERT INTO gallery (path, content_hash, image_id, user_id, status, created_at, updated_at)
+                        VALUES (%s, %s, %s, %s, 1, %s, %s)
+                    """, (r["file"], digests[r["index"]], image_id, user_id, now, now), conn=conn)
+                    r["id"] = inserted.lastrowid
+        except Exception as e:
+            for r in uploaded:
+                r.pop("id", None)
+            return JSONResponse(status_code=500, content={"error": str(e), "results": results})
+
+        invalidate("gallery")
+
+        # Variants once per distinct content, shared by every row holding it
+        ids_by_digest = {}
+        for r in uploaded:
+            ids_by_digest.setdefault(digests[r["index"]], []).append(r)
+        for digest, rows in ids_by_digest.items():
+            source = existing.get(digest)
+            await _queue_variants(
+                files[rows[0]["index"]], rows[0]["file"], [r["id"] for r in rows],
+                reuse_from=source and source["id"],
+            )
+
+    return {
+        "message": f"{len(uploaded)} of {len(files)} files uploaded",
+        "uploaded": len(uploaded),
+        "failed": len(files) - len(uploaded),
+        "results": results,
+    }
 
-        return {"message": "Upload successful", "file": filename, "url": image_url}
+
+# ------------------------------------------------------
+# CREATE GALLERY ITEM AS A BACKGROUND UPLOAD JOB (202)
+# ------------------------------------------------------
+async def create_gallery_job(file, user_id: int, image_id: int = None):
+    now = datetime.datetime.utcnow()
+    spool_path = None
+
+    try:
+        if (getattr(file, "size", None) or 0) > UPLOAD_MAX_BYTES:
+            return JSONResponse(status_code=413, content={"error": f"File exceeds the {UPLOAD_MAX_BYTES} byte upload limit"})
+
+        # Local disk only (hashed on the way); the storage transfer happens in utils/upload_jobs.py
+        try:
+            spool_path, size, digest = await spool_upload(file)
+        except UploadTooLarge as e:
+            return JSONResponse(status_code=413, content={"error": str(e)})
+
+        if not size:
+            remove_spool(spool_path)
+            return JSONResponse(status_code=400, content={"error": "File is empty"})
+
+        existing = (await _stored_by_hash([digest])).get(digest)
+        if existing:
+            # Nothing to transfer: the row is active right away and the job is already done
+            result = await execute("""
+                INSERT INTO gallery (path, content_hash, image_id, user_id, status, upload_size,
+                                     upload_sent, upload_attempts, created_at, updated_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, 0, %s, %s)
+            """, (existing["path"], digest, image_id, user_id, GALLERY_ACTIVE, size, size, now, now))
+            job_id = result.lastrowid
+            # Rendered from the upload when the source row has no variants (yet)
+            await _queue_variants(file, existing["path"], [job_id], reuse_from=existing["id"])
+            remove_spool(spool_path)
+            spool_path = None
+            invalidate("gallery")
+
+            return JSONResponse(status_code=200, content={
+                "message": "Already uploaded",
+                "job_id": job_id,
+                "file": existing["path"],
+                "status_url": f"/api/gallery/jobs/{job_id}",
+                "deduplicated": True,
+            })
+
+        filename = content_name(digest, file.filename)
+
+        query = """
+            INSERT INTO gallery (path, content_hash, image_id, user_id, status, spool_path, upload_size,
+                                 upload_sent, upload_attempts, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, 0, 0, %s, %s)
+        """
+
+        result = await execute(query, (filename, digest, image_id, user_id, GALLERY_PENDING, spool_path, size, now, now))
+        job_id = result.lastrowid
+        enqueue_upload(job_id)
+
+        return JSONResponse(status_code=202, content={
+            "message": "Upload queued",
+            "job_id": job_id,
+            "file": filename,
+            "status_url": f"/api/gallery/jobs/{job_id}",
+        })
 
     except Exception as e:
-        if db:
-            await db.rollback()
+        remove_spool(spool_path)
         return JSONResponse(status_code=500, content={"error": str(e)})
 
-    finally:
-        if db and not is_pool:
-            db.close()  # <-- Removed await here
+
+# ------------------------------------------------------
+# UPLOAD JOB STATUS
+# ------------------------------------------------------
+JOB_STATES = {
+    GALLERY_DELETED: "deleted",
+    GALLERY_ACTIVE: "done",
+    GALLERY_PENDING: "pending",
+    GALLERY_FAILED: "failed",
+}
+
+
+async def get_gallery_job(gallery_id: int):
+    row = await fetch_one("""
+        SELECT id, path, status, upload_size, upload_sent, upload_attempts, upload_error
+        FROM gallery WHERE id = %s
+    """, (gallery_id,))
+    if not row:
+        return None
+
+    state = JOB_STATES.get(row["status"], "unknown")
+    if state == "pending" and row["upload_attempts"]:
+        state = "uploading"
+
+    total = row["upload_size"]
+    sent = total if state == "done" else (row["upload_sent"] or 0)
+    base_url = os.getenv('CPANEL_BASE_URL', '').rstrip('/')
+
+    return {
+        "job_id": row["id"],
+        "status": state,
+        "file": row["path"],
+        "bytes_total": total,
+        "bytes_sent": sent,
+        "progress": round(100 * sent / total, 1) if total else (100.0 if state == "done" else 0.0),
+        "attempts": row["upload_attempts"],
+        "error": row["upload_error"],
+        "url": f"{base_url}/{row['path']}" if state == "done" else None,
+    }
 
 
 # ------------------------------------------------------
@@ -87,36 +376,18 @@ async def create_gallery(file, user_id: int, image_id: int = None):
 # GET BY ID
 # ------------------------------------------------------
 async def get_gallery_by_id(gallery_id: int):
-    db = await get_db_connection()
-    is_pool = hasattr(db, "acquire")
-    row = None
+    query = "SELECT * FROM gallery WHERE id = %s"
 
-    try:
-        query = "SELECT * FROM gallery WHERE id = %s"
-
-        if is_pool:
-            async with db.acquire() as conn:
-                async with conn.cursor(aiomysql.DictCursor) as cursor:
-                    await cursor.execute(query, (gallery_id,))
-                    row = await cursor.fetchone()
-        else:
-            async with db.cursor(aiomysql.DictCursor) as cursor:
-                await cursor.execute(query, (gallery_id,))
-                row = await cursor.fetchone()
-
-        return row
-
-    finally:
-        if db and not is_pool:
-            db.close()  # <-- Removed await here
+    row = await fetch_one(query, (gallery_id,))
+    if row:
+        await attach_srcsets([row], id_key="id")
+    return row
 
 
 # ------------------------------------------------------
 # UPDATE
 # ------------------------------------------------------
 async def update_gallery(gallery_id: int, image_id: int, user_id: int, status: int):
-    db = await get_db_connection()
-    is_pool = hasattr(db, "acquire")
     now = datetime.datetime.utcnow()
 
     try:
@@ -126,90 +397,59 @@ async def update_gallery(gallery_id: int, image_id: int, user_id: int, status: i
             WHERE id=%s
         """
 
-        if is_pool:
-            async with db.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute(query, (image_id, user_id, status, now, gallery_id))
-                    await conn.commit()
-        else:
-            async with db.cursor() as cursor:
-                await cursor.execute(query, (image_id, user_id, status, now, gallery_id))
-                await db.commit()
+        await execute(query, (image_id, user_id, status, now, gallery_id))
 
+        invalidate("gallery")
         return {"message": "Gallery updated"}
 
     except Exception as e:
-        if db:
-            await db.rollback()
         return JSONResponse(status_code=500, content={"error": str(e)})
 
-    finally:
-        if db and not is_pool:
-            db.close()  # <-- Removed await here
-
 
 # ------------------------------------------------------
 # SOFT DELETE
 # ------------------------------------------------------
 async def soft_delete_gallery(gallery_id: int):
-    db = await get_db_connection()
-    is_pool = hasattr(db, "acquire")
-
     try:
         query = "UPDATE gallery SET status = 0 WHERE id = %s"
 
-        if is_pool:
-            async with db.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.execute(query, (gallery_id,))
-                    await conn.commit()
-        else:
-            async with db.cursor() as cursor:
-                await cursor.execute(query, (gallery_id,))
-                await db.commit()
+        await execute(query, (gallery_id,))
 
+        invalidate("gallery")
         return {"message": "Gallery soft-deleted"}
 
     except Exception as e:
-        if db:
-            await db.rollback()
         return JSONResponse(status_code=500, content={"error": str(e)})
 
-    finally:
-        if db and not is_pool:
-            db.close()  # <-- Removed await here
-
-
 
-async def get_all_gallery():
-    db = await get_db_connection()
-    is_pool = hasattr(db, "acquire")
-    rows = []
 
+async def get_all_gallery(cursor: str = None, limit: int = None, with_total: bool = False):
     base_url = os.getenv('CPANEL_BASE_URL', '').rstrip('/')
 
-    try:
+    page = None
+    if not is_paged(cursor, limit):
         query = "SELECT * FROM gallery WHERE status = 1"
 
-        if is_pool:
-            async with db.acquire() as conn:
-                async with conn.cursor(aiomysql.DictCursor) as cursor:
-                    await cursor.execute(query)
-                    rows = await cursor.fetchall()
+        rows = await fetch_all(query)
+    else:
+        after_id, limit = page_args(cursor, limit)
+        keyset, params = keyset_filter("id", after_id)
+        page = build_page(await fetch_all(
+            f"SELECT * FROM gallery WHERE status = 1 AND {keyset} ORDER BY id LIMIT %s",
+            (*params, limit + 1)
+        ), limit)
+        if with_total:
+            page["total"] = await fetch_scalar("SELECT COUNT(*) FROM gallery WHERE status = 1")
+        rows = page["items"]
+
+    # Add full URL field for each record
+    for row in rows:
+        if 'path' in row and row['path']:
+            row['url'] = f"{base_url}/{row['path']}"
         else:
-            async with db.cursor(aiomysql.DictCursor) as cursor:
-                await cursor.execute(query)
-                rows = await cursor.fetchall()
-
-        # Add full URL field for each record
-        for row in rows:
-            if 'path' in row and row['path']:
-                row['url'] = f"{base_url}/{row['path']}"
-            else:
-                row['url'] = None
-
-        return rows
-
-    finally:
-        if db and not is_pool:
-            db.close()
\ No newline at end of file
+            row['url'] = None
+
+    # {"webp": "<url> 320w, ...", "avif": ...} when variants exist
+    await attach_srcsets(rows, id_key="id")
+
+    return page if page is not None else rows
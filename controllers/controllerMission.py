@@ -1,7 +1,7 @@
 import os
 import datetime
-import aiomysql
-from db import get_db_connection
+from utils.query_executor import fetch_one, fetch_all, execute
+from utils.response_cache import invalidate
 
 
 # ---------------------------------------------------------------------
@@ -27,31 +27,12 @@ def build_url(path: str):
     return f"{base}/{path}"
 
 
-# ---------------------------------------------------------------------
-# 🔧 Helper for all DB operations
-# ---------------------------------------------------------------------
-async def execute_query(query: str, params=None, fetchone=False, fetchall=False, commit=False):
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute(query, params or ())
-            if commit:
-                await conn.commit()
-            if fetchone:
-                return await cursor.fetchone()
-            if fetchall:
-                return await cursor.fetchall()
-    finally:
-        conn.close()
-
-
 # ---------------------------------------------------------------------
 # 🔹 Get all missions admin
 # ---------------------------------------------------------------------
 async def get_all_missions():
-    missions = await execute_query(
-        "SELECT * FROM mission ORDER BY id DESC",
-        fetchall=True
+    missions = await fetch_all(
+        "SELECT * FROM mission ORDER BY id DESC"
     )
 
     # Fix image paths
@@ -65,10 +46,9 @@ async def get_all_missions():
 # 🔹 Get mission by id (public)
 # ---------------------------------------------------------------------
 async def get_mission_by_id(mission_id: int):
-    mission = await execute_query(
+    mission = await fetch_one(
         "SELECT * FROM mission WHERE id = %s AND status = 1",
-        (mission_id,),
-        fetchone=True
+        (mission_id,)
     )
 
     if mission:
@@ -101,17 +81,12 @@ async def create_mission(data: dict):
         now,
     )
 
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor() as cursor:
-            await cursor.execute(query, values)
-            await conn.commit()
-            mission_id = cursor.lastrowid
-    finally:
-        conn.close()
+    result = await execute(query, values)
+    mission_id = result.lastrowid
 
     data["path"] = build_url(data.get("path"))
 
+    invalidate("mission")
     return {"id": mission_id, **data}
 
 
@@ -140,10 +115,11 @@ async def update_mission(mission_id: int, data: dict):
         mission_id
     )
 
-    await execute_query(query, values, commit=True)
+    await execute(query, values)
 
     data["path"] = build_url(data.get("path"))
 
+    invalidate("mission")
     return {"id": mission_id, **data}
 
 
@@ -151,11 +127,11 @@ async def update_mission(mission_id: int, data: dict):
 # 🔹 Soft delete
 # ---------------------------------------------------------------------
 async def delete_mission(mission_id: int):
-    await execute_query(
+    await execute(
         "UPDATE mission SET status = 0 WHERE id = %s",
-        (mission_id,),
-        commit=True
+        (mission_id,)
     )
+    invalidate("mission")
     return {"message": "Mission soft-deleted"}
 
 
@@ -163,9 +139,8 @@ async def delete_mission(mission_id: int):
 # 🔹 Public missions (clean paths)
 # ---------------------------------------------------------------------
 async def get_all_missions_public():
-    missions = await execute_query(
-        "SELECT * FROM mission WHERE status = 1",
-        fetchall=True
+    missions = await fetch_all(
+        "SELECT * FROM mission WHERE status = 1"
     )
 
     for m in missions:
@@ -1,43 +1,37 @@
 import datetime
-import aiomysql
-from db import get_db_connection
+from db import db_connection
+from utils.query_executor import fetch_one, fetch_all, fetch_scalar, execute
+from utils.pagination import is_paged, page_args, keyset_filter, build_page
 
 
-async def get_all_news():
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM news WHERE status = 1")
-        rows = await cursor.fetchall()
-    conn.close()
-    return rows
+async def get_all_news(cursor: str = None, limit: int = None, with_total: bool = False):
+    if not is_paged(cursor, limit):
+        return await fetch_all("SELECT * FROM news WHERE status = 1")
+
+    after_id, limit = page_args(cursor, limit)
+    keyset, params = keyset_filter("id", after_id)
+    rows = await fetch_all(
+        f"SELECT * FROM news WHERE status = 1 AND {keyset} ORDER BY id LIMIT %s",
+        (*params, limit + 1)
+    )
+    total = await fetch_scalar("SELECT COUNT(*) FROM news WHERE status = 1") if with_total else None
+    return build_page(rows, limit, total=total)
 
 
 async def get_news_by_id(news_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM news WHERE id = %s", (news_id,))
-        row = await cursor.fetchone()
-    conn.close()
-    return row
+    return await fetch_one("SELECT * FROM news WHERE id = %s", (news_id,))
 
 
 async def create_news(data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
+    async with db_connection() as conn:
         # ✅ Validate foreign keys
-        await cursor.execute("SELECT id FROM gallery WHERE id = %s", (data.get("image_id"),))
-        if not await cursor.fetchone():
-            conn.close()
+        if not await fetch_one("SELECT id FROM gallery WHERE id = %s", (data.get("image_id"),), conn=conn):
             return {"error": "image_id not found"}
 
-        await cursor.execute("SELECT id FROM banner WHERE id = %s", (data.get("banner_id"),))
-        if not await cursor.fetchone():
-            conn.close()
+        if not await fetch_one("SELECT id FROM banner WHERE id = %s", (data.get("banner_id"),), conn=conn):
             return {"error": "banner_id not found"}
 
-        await cursor.execute("SELECT id FROM users WHERE id = %s", (data.get("user_id"),))
-        if not await cursor.fetchone():
-            conn.close()
+        if not await fetch_one("SELECT id FROM users WHERE id = %s", (data.get("user_id"),), conn=conn):
             return {"error": "user_id not found"}
 
         now = datetime.datetime.now()
@@ -56,21 +50,17 @@ async def create_news(data: dict):
             now
         )
 
-        await cursor.execute(insert_query, values)
-        news_id = cursor.lastrowid
+        result = await execute(insert_query, values, conn=conn)
+        news_id = result.lastrowid
 
-    conn.close()
     return {"id": news_id, **data}
 
 
 async def update_news(news_id: int, data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
+    async with db_connection() as conn:
         # ✅ Check if news exists
-        await cursor.execute("SELECT created_at FROM news WHERE id = %s", (news_id,))
-        row = await cursor.fetchone()
+        row = await fetch_one("SELECT created_at FROM news WHERE id = %s", (news_id,), conn=conn)
         if not row:
-            conn.close()
             return {"error": "News not found"}
 
         created_at = row["created_at"]
@@ -92,15 +82,11 @@ async def update_news(news_id: int, data: dict):
             news_id
         )
 
-        await cursor.execute(update_query, values)
+        await execute(update_query, values, conn=conn)
 
-    conn.close()
     return {"id": news_id, **data, "created_at": created_at, "updated_at": updated_at}
 
 
 async def delete_news(news_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        await cursor.execute("UPDATE news SET status = 0 WHERE id = %s", (news_id,))
-    conn.close()
+    await execute("UPDATE news SET status = 0 WHERE id = %s", (news_id,))
     return {"message": f"News {news_id} soft-deleted (status = 0)"}
@@ -1,7 +1,8 @@
 # controllers/controllerPermission.py
 import datetime
-import aiomysql
-from db import get_db_connection
+from db import db_connection
+from utils.query_executor import fetch_one, fetch_all, execute
+from utils.permissions import permission_registry_changed
 
 
 # -------------------------
@@ -17,11 +18,7 @@ from db import get_db_connection
 
 
 async def get_all_permissions():
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM permission WHERE status = 1")
-        permissions = await cursor.fetchall()
-    conn.close()
+    permissions = await fetch_all("SELECT * FROM permission WHERE status = 1")
     return permissions  # <-- return plain list, not wrapped in dict
 
 
@@ -30,14 +27,10 @@ async def get_all_permissions():
 # Get permission by ID
 # -------------------------
 async def get_permission_by_id(permission_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute(
-            "SELECT * FROM permission WHERE id = %s AND status = 1",
-            (permission_id,),
-        )
-        permission = await cursor.fetchone()
-    conn.close()
+    permission = await fetch_one(
+        "SELECT * FROM permission WHERE id = %s AND status = 1",
+        (permission_id,),
+    )
 
     if not permission:
         return {"error": "Permission not found"}
@@ -48,26 +41,23 @@ async def get_permission_by_id(permission_id: int):
 # Create permission
 # -------------------------
 async def create_permission(data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        await cursor.execute(
-            """
-            INSERT INTO permission (name, status, created_at, updated_at)
-            VALUES (%s, %s, %s, %s)
-            """,
-            (
-                data.get("name"),
-                data.get("status", 1),
-                now,
-                now,
-            ),
-        )
-        await conn.commit()
-        permission_id = cursor.lastrowid
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    result = await execute(
+        """
+        INSERT INTO permission (name, status, created_at, updated_at)
+        VALUES (%s, %s, %s, %s)
+        """,
+        (
+            data.get("name"),
+            data.get("status", 1),
+            now,
+            now,
+        ),
+    )
+    permission_id = result.lastrowid
+    permission_registry_changed()  # new bit position, in every worker
 
-    conn.close()
     return {
         "message": "Permission created successfully",
         "data": {
@@ -84,17 +74,14 @@ async def create_permission(data: dict):
 # Update permission
 # -------------------------
 async def update_permission(permission_id: int, data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM permission WHERE id = %s", (permission_id,))
-        row = await cursor.fetchone()
+    async with db_connection() as conn:
+        row = await fetch_one("SELECT * FROM permission WHERE id = %s", (permission_id,), conn=conn)
         if not row:
-            conn.close()
             return {"error": "Permission not found"}
 
         updated_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        await cursor.execute(
+        await execute(
             """
             UPDATE permission
             SET name = %s, status = %s, updated_at = %s
@@ -106,9 +93,10 @@ async def update_permission(permission_id: int, data: dict):
                 updated_at,
                 permission_id,
             ),
+            conn=conn,
         )
-        await conn.commit()
-    conn.close()
+
+    permission_registry_changed()  # a rename moves the name to this bit
 
     return {
         "message": "Permission updated successfully",
@@ -126,21 +114,17 @@ async def update_permission(permission_id: int, data: dict):
 # Soft delete permission
 # -------------------------
 async def delete_permission(permission_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT id FROM permission WHERE id = %s", (permission_id,))
-        if not await cursor.fetchone():
-            conn.close()
+    async with db_connection() as conn:
+        if not await fetch_one("SELECT id FROM permission WHERE id = %s", (permission_id,), conn=conn):
             return {"error": "Permission not found"}
 
         updated_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        await cursor.execute(
+        await execute(
             "UPDATE permission SET status = 0, updated_at = %s WHERE id = %s",
             (updated_at, permission_id),
+            conn=conn,
         )
-        await conn.commit()
-    conn.close()
 
     return {
         "message": f"Permission {permission_id} soft-deleted successfully",
@@ -1,9 +1,13 @@
 import datetime
-import aiomysql
-from db import get_db_connection  # should return aiomysql connection
+from collections import Counter
+from fastapi import HTTPException
+from db import db_connection, transaction
+from utils.query_executor import fetch_one, fetch_all, fetch_scalar, execute, execute_many
+from utils.pagination import is_paged, page_args, keyset_filter, build_page
 import re
 import unicodedata
 import os
+from utils.response_cache import invalidate
 # import aiomysql
 # from db import get_db_connection
 
@@ -33,402 +37,370 @@ def build_url(path: str):
 
 
 # ===============================
-# Get all products (admin)
+# Catalog loader
 # ===============================
-async def get_all_products():
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("""
-            SELECT 
-                p.id AS product_id,
-                p.name AS product_name,
-                p.detail,
-                p.status,
-                p.created_at,
-                p.updated_at,
-                p.category_id,
-                p.type_id,
-                p.image_id,
-                p.is_active,
-                p.about_product,
-                p.image_id_about_product,
-                p.path_about_product,
-                p.path AS primary_path,
-                p.user_id,
-
-                ps.spicification_id,
-
-                pi.id AS product_image_id,
-                pi.image_path
-            FROM product p
-            LEFT JOIN product_spicification ps ON ps.product_id = p.id
-            LEFT JOIN product_images pi ON pi.product_id = p.id
-            ORDER BY p.id
-        """)
-        rows = await cursor.fetchall()
-
-    products = {}
+# Specs and images are loaded with one `IN (...)` query per batch of product ids
+# and stitched on product_id, instead of LEFT JOINing both tables onto product
+# (which returns specs × images rows for every product).
+CATALOG_IN_BATCH_SIZE = max(int(os.getenv("CATALOG_IN_BATCH_SIZE", 1000)), 1)
 
-    for row in rows:
-        pid = row["product_id"]
-
-        if pid not in products:
-            products[pid] = {
-                "id": pid,
-                "name": row["product_name"],
-                "detail": row["detail"],
-                "status": row["status"],
-                "is_active": row["is_active"],
-                "about_product": row["about_product"],
-                "image_id_about_product": row["image_id_about_product"],
-                "path_about_product": build_url(row["path_about_product"]),   # ✅ FIXED
-                "type_id": row["type_id"],
-                "created_at": row["created_at"],
-                "updated_at": row["updated_at"],
-                "category_id": row["category_id"],
-
-                "image_id": row["image_id"],
-                "primary_path": build_url(row["primary_path"]),  # ✅ FIXED
-
-                "user_id": row["user_id"],
-                "spicifications": [],
-                "images": []
-            }
-
-        # Add spicification
-        if row["spicification_id"] and row["spicification_id"] not in products[pid]["spicifications"]:
-            products[pid]["spicifications"].append(row["spicification_id"])
-
-        # Add product images
-        if row["product_image_id"]:
-            img_obj = {
-                "id": row["product_image_id"],
-                "path": build_url(row["image_path"])      # ✅ FIXED
-            }
-            if img_obj not in products[pid]["images"]:
-                products[pid]["images"].append(img_obj)
-
-    await conn.ensure_closed()
-    return list(products.values())
+
+async def _fetch_by_product_ids(query: str, product_ids: list, conn):
+    rows = []
+    for i in range(0, len(product_ids), CATALOG_IN_BATCH_SIZE):
+        batch = product_ids[i:i + CATALOG_IN_BATCH_SIZE]
+        placeholders = ",".join(["%s"] * len(batch))
+        rows.extend(await fetch_all(query.format(ids=placeholders), batch, conn=conn))
+    return rows
+
+
+async def load_product_relations(product_ids: list, spec_details: bool = True, conn=None,
+                                 relations=("specs", "images")):
+    """
+    Return ({product_id: [spec, ...]}, {product_id: [{"id", "path"}, ...]}).
+    With spec_details=False a spec is just its spicification_id.
+    A relation missing from `relations` is not queried (its lists stay empty).
+    """
+    specs = {pid: [] for pid in product_ids}
+    images = {pid: [] for pid in product_ids}
+    if not product_ids:
+        return specs, images
+
+    if "specs" not in relations:
+        spec_rows = []
+    elif spec_details:
+        spec_rows = await _fetch_by_product_ids("""
+            SELECT ps.product_id, ps.spicification_id AS id,
+                   s.title, s.descriptions AS description
+            FROM product_spicification ps
+            LEFT JOIN spicification s ON s.id = ps.spicification_id
+            WHERE ps.product_id IN ({ids})
+            ORDER BY ps.product_id
+        """, product_ids, conn)
+    else:
+        spec_rows = await _fetch_by_product_ids("""
+            SELECT product_id, spicification_id AS id
+            FROM product_spicification
+            WHERE product_id IN ({ids})
+            ORDER BY product_id
+        """, product_ids, conn)
+
+    seen = set()
+    for row in spec_rows:
+        key = (row["product_id"], row["id"])
+        if not row["id"] or key in seen:
+            continue
+        seen.add(key)
+        pid = row.pop("product_id")
+        specs[pid].append(row if spec_details else row["id"])
+
+    if "images" in relations:
+        image_rows = await _fetch_by_product_ids("""
+            SELECT product_id, id, image_path AS path
+            FROM product_images
+            WHERE product_id IN ({ids})
+            ORDER BY product_id, id
+        """, product_ids, conn)
+
+        for row in image_rows:
+            images[row.pop("product_id")].append(row)
+
+    return specs, images
+
+
+async def load_catalog(query: str, params=None, spec_details: bool = True, relations=("specs", "images")):
+    """Base product rows for `query` plus their specs and images (see load_product_relations)."""
+    async with db_connection() as conn:
+        rows = await fetch_all(query, params, conn=conn)
+        specs, images = await load_product_relations(
+            [r["product_id"] for r in rows], spec_details=spec_details, conn=conn, relations=relations
+        )
+    return rows, specs, images
+
+
+def _image_urls(images: list):
+    return [{"id": img["id"], "path": build_url(img["path"])} for img in images]
 
 
 # ===============================
-# Get product by ID
+# Sparse fieldsets (?fields= / ?include=)
 # ===============================
-async def get_product_by_id(product_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("""
-            SELECT 
-                p.id AS product_id,
-                p.name AS product_name,
-                p.detail,
-                p.status,
-                p.created_at,
-                p.updated_at,
-                p.category_id,
-                p.image_id,
-                p.is_active,
-                p.about_product,
-                p.image_id_about_product,
-                p.path_about_product,
-                p.type_id,
-                p.path AS primary_path,
-                p.user_id,
-
-                ps.spicification_id,
-
-                pi.id AS product_image_id,
-                pi.image_path
-            FROM product p
-            LEFT JOIN product_spicification ps ON ps.product_id = p.id
-            LEFT JOIN product_images pi ON pi.product_id = p.id
-            WHERE p.id = %s
-        """, (product_id,))
-        rows = await cursor.fetchall()
+# Response key -> product column. Only the requested keys are SELECTed, and
+# specs / images are only queried when they are included.
+PRODUCT_FIELDS = {
+    "id": "p.id",
+    "name": "p.name",
+    "slug": "p.slug",
+    "detail": "p.detail",
+    "status": "p.status",
+    "is_active": "p.is_active",
+    "about_product": "p.about_product",
+    "image_id_about_product": "p.image_id_about_product",
+    "path_about_product": "p.path_about_product",
+    "type_id": "p.type_id",
+    "new": "p.new",
+    "created_at": "p.created_at",
+    "updated_at": "p.updated_at",
+    "category_id": "p.category_id",
+    "image_id": "p.image_id",
+    "primary_path": "p.path",
+    "user_id": "p.user_id",
+}
+PRODUCT_RELATIONS = ("specs", "images")
+
+# Paths turned into full URLs when an endpoint serves URLs
+URL_FIELDS = ("primary_path", "path_about_product")
+# Blanked when the product's about section is disabled (is_active = 0)
+ABOUT_FIELDS = ("about_product", "image_id_about_product", "path_about_product")
+
+# Default field list of each endpoint (= its response before ?fields= existed)
+ADMIN_PRODUCT_FIELDS = (
+    "id", "name", "detail", "status", "is_active", "about_product",
+    "image_id_about_product", "path_about_product", "type_id", "created_at",
+    "updated_at", "category_id", "image_id", "primary_path", "user_id",
+)
+DETAIL_PRODUCT_FIELDS = (
+    "id", "name", "slug", "detail", "is_active", "about_product",
+    "image_id_about_product", "path_about_product", "type_id", "new", "status",
+    "created_at", "updated_at", "category_id", "image_id", "primary_path", "user_id",
+)
+PUBLIC_PRODUCT_FIELDS = (
+    "id", "name", "slug", "detail", "status", "created_at", "updated_at",
+    "category_id", "image_id", "primary_path", "image_id_about_product",
+    "path_about_product", "type_id", "user_id",
+)
+NEW_PRODUCT_FIELDS = (
+    "id", "name", "slug", "detail", "status", "new", "created_at", "updated_at",
+    "category_id", "image_id", "primary_path", "image_id_about_product",
+    "path_about_product", "user_id",
+)
+CATEGORY_PRODUCT_FIELDS = (
+    "id", "name", "detail", "status", "created_at", "updated_at", "category_id",
+    "image_id", "image_id_about_product", "path_about_product", "primary_path", "user_id",
+)
+
+
+def _split(value: str):
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def select_product_fields(fields: str = None, include: str = None, allowed: tuple = ADMIN_PRODUCT_FIELDS):
+    """
+    Parse ?fields=name,slug&include=images against an endpoint's default fields.
+    No ?fields= → all of `allowed`; "id" is always returned.
+    No ?include= → both relations, unless ?fields= was given (then none).
+    """
+    if fields is None:
+        selected = allowed
+    else:
+        requested = set(_split(fields))
+        unknown = requested - set(allowed)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(sorted(unknown))}")
+        selected = tuple(f for f in allowed if f == "id" or f in requested)
+
+    if include is None:
+        relations = PRODUCT_RELATIONS if fields is None else ()
+    else:
+        relations = tuple(_split(include))
+        unknown = set(relations) - set(PRODUCT_RELATIONS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown include(s): {', '.join(sorted(unknown))}")
+
+    return selected, relations
+
+
+def product_projection(fields: tuple, hide_inactive_about: bool = False) -> str:
+    """SELECT list for `fields`; rows are keyed by response key, plus product_id."""
+    columns = ["p.id AS product_id"]
+    columns += [f"{PRODUCT_FIELDS[f]} AS `{f}`" for f in fields if f != "id"]
+    if hide_inactive_about and "is_active" not in fields and set(fields) & set(ABOUT_FIELDS):
+        columns.append("p.is_active AS `is_active`")
+    return ",\n            ".join(columns)
+
+
+def shape_product(row: dict, fields: tuple, relations: tuple, specs: dict, images: dict,
+                  urls: bool = True, hide_inactive_about: bool = False) -> dict:
+    pid = row["product_id"]
+    product = {"id": pid}
+
+    for field in fields:
+        if field == "id":
+            continue
+        value = row[field]
+        product[field] = build_url(value) if urls and field in URL_FIELDS else value
+
+    if "specs" in relations:
+        product["spicifications"] = specs[pid]
+    if "images" in relations:
+        product["images"] = _image_urls(images[pid]) if urls else images[pid]
 
-    if not rows:
-        await conn.ensure_closed()
-        return None
+    # Disable about-product fields if inactive
+    if hide_inactive_about and row.get("is_active") == 0:
+        for field in ABOUT_FIELDS:
+            if field in product:
+                product[field] = None
 
-    first = rows[0]
-
-    # ✅ Base product object + URLs fixed
-    product = {
-        "id": first["product_id"],
-        "name": first["product_name"],
-        "detail": first["detail"],
-        "status": first["status"],
-        "is_active": first["is_active"],
-        "about_product": first["about_product"],
-        "image_id_about_product": first["image_id_about_product"],
-        "path_about_product": build_url(first["path_about_product"]),   # ✅ FIXED
-        "type_id": first["type_id"],
-        "created_at": first["created_at"],
-        "updated_at": first["updated_at"],
-        "category_id": first["category_id"],
-        "image_id": first["image_id"],
-        "primary_path": build_url(first["primary_path"]),               # ✅ FIXED
-        "user_id": first["user_id"],
-        "spicifications": [],
-        "images": []
-    }
+    return product
 
-    # Disable about-product fields if inactive
-    if product["is_active"] == 0:
-        product["about_product"] = None
-        product["image_id_about_product"] = None
-        product["path_about_product"] = None
 
-    # Add unique specs + images with full URL
-    for row in rows:
+# ===============================
+# Get all products (admin)
+# ===============================
+async def get_all_products(cursor: str = None, limit: int = None, with_total: bool = False,
+                           fields: str = None, include: str = None):
+    fields, relations = select_product_fields(fields, include, ADMIN_PRODUCT_FIELDS)
+    paged = is_paged(cursor, limit)
+    after_id, limit = page_args(cursor, limit) if paged else (None, None)
+    keyset, params = keyset_filter("p.id", after_id)
 
-        # Specs
-        if row["spicification_id"] and row["spicification_id"] not in product["spicifications"]:
-            product["spicifications"].append(row["spicification_id"])
+    rows, specs, images = await load_catalog(f"""
+        SELECT
+            {product_projection(fields)}
+        FROM product p
+        WHERE {keyset}
+        ORDER BY p.id
+        {"LIMIT %s" if paged else ""}
+    """, (*params, limit + 1) if paged else None, spec_details=False, relations=relations)
 
-        # Images
-        if row["product_image_id"]:
-            img_obj = {
-                "id": row["product_image_id"],
-                "path": build_url(row["image_path"])   # ✅ FIXED
-            }
-            if img_obj not in product["images"]:
-                product["images"].append(img_obj)
+    products = [shape_product(row, fields, relations, specs, images) for row in rows]
 
-    await conn.ensure_closed()
-    return product
+    if not paged:
+        return products
 
+    total = await fetch_scalar("SELECT COUNT(*) FROM product") if with_total else None
+    return build_page(products, limit, total=total)
 
-# def build_url(path: str):
-#     base = os.getenv("CPANEL_BASE_URL", "").rstrip("/")
-#     if not path:
-#         return None
-#     return f"{base}/{path}"
-
-
-async def get_product_by_slug(slug: str):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("""
-            SELECT 
-                p.id AS product_id,
-                p.name AS product_name,
-                p.slug,
-                p.detail,
-                p.status,
-                p.created_at,
-                p.updated_at,
-                p.category_id,
-                p.product_category,
-                p.is_active,
-                p.about_product,
-                p.image_id_about_product,
-                p.path_about_product,
-                p.type_id,
-                p.new,
-                p.image_id,
-                p.path AS primary_path,
-                p.user_id,
-
-                ps.spicification_id,
-                s.title AS spec_title,
-                s.descriptions AS spec_description,
-
-                pi.id AS product_image_id,
-                pi.image_path
-            FROM product p
-            LEFT JOIN product_spicification ps ON ps.product_id = p.id
-            LEFT JOIN spicification s ON s.id = ps.spicification_id
-            LEFT JOIN product_images pi ON pi.product_id = p.id
-            WHERE p.slug = %s
-        """, (slug,))
-        rows = await cursor.fetchall()
+
+# ===============================
+# Get product by ID
+# ===============================
+async def get_product_by_id(product_id: int, fields: str = None, include: str = None):
+    fields, relations = select_product_fields(fields, include, ADMIN_PRODUCT_FIELDS)
+    rows, specs, images = await load_catalog(f"""
+        SELECT
+            {product_projection(fields, hide_inactive_about=True)}
+        FROM product p
+        WHERE p.id = %s
+    """, (product_id,), spec_details=False, relations=relations)
 
     if not rows:
-        await conn.ensure_closed()
         return None
 
-    row = rows[0]
-
-    # ===========================
-    # Build product base object
-    # ===========================
-    product = {
-        "id": row["product_id"],
-        "name": row["product_name"],
-        "slug": row["slug"],
-        "detail": row["detail"],
-        "is_active": row["is_active"],
-        "about_product": row["about_product"],
-        "image_id_about_product": row["image_id_about_product"],
-        "path_about_product": build_url(row["path_about_product"]),
-        "type_id": row["type_id"],
-        "new": row["new"],
-        "status": row["status"],
-        "created_at": row["created_at"],
-        "updated_at": row["updated_at"],
-        "category_id": row["category_id"],
-        "image_id": row["image_id"],
-        "primary_path": build_url(row["primary_path"]),
-        "user_id": row["user_id"],
-        "spicifications": [],
-        "images": []
-    }
-
-    # ===========================
-    # Disable about_product when inactive
-    # ===========================
-    if product["is_active"] == 0:
-        product["about_product"] = None
-        product["image_id_about_product"] = None
-        product["path_about_product"] = None
-
-    # ===========================
-    # Build specification + images list
-    # ===========================
-    for r in rows:
-
-        # Add spec
-        if r["spicification_id"]:
-            spec_obj = {
-                "id": r["spicification_id"],
-                "title": r.get("spec_title"),
-                "description": r.get("spec_description"),
-            }
-            if spec_obj not in product["spicifications"]:
-                product["spicifications"].append(spec_obj)
-
-        # Add image
-        if r["product_image_id"]:
-            img_obj = {
-                "id": r["product_image_id"],
-                "path": build_url(r["image_path"])
-            }
-            if img_obj not in product["images"]:
-                product["images"].append(img_obj)
-
-    await conn.ensure_closed()
-    return product
+    return shape_product(rows[0], fields, relations, specs, images, hide_inactive_about=True)
 
 
-async def get_products_by_type_id(type_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("""
-            SELECT 
-                p.id AS product_id,
-                p.name AS product_name,
-                p.slug,
-                p.detail,
-                p.status,
-                p.created_at,
-                p.updated_at,
-                p.category_id,
-                p.product_category,
-                p.is_active,
-                p.about_product,
-                p.image_id_about_product,
-                p.path_about_product,
-                p.type_id,
-                p.new,
-                p.image_id,
-                p.path AS primary_path,
-                p.user_id,
-
-                ps.spicification_id,
-                s.title AS spec_title,
-                s.descriptions AS spec_description,
-
-                pi.id AS product_image_id,
-                pi.image_path
-            FROM product p
-            LEFT JOIN product_spicification ps ON ps.product_id = p.id
-            LEFT JOIN spicification s ON s.id = ps.spicification_id
-            LEFT JOIN product_images pi ON pi.product_id = p.id
-            WHERE p.type_id = %s
-            ORDER BY p.id DESC
-        """, (type_id,))
-
-        rows = await cursor.fetchall()
+async def get_product_by_slug(slug: str, fields: str = None, include: str = None):
+    fields, relations = select_product_fields(fields, include, DETAIL_PRODUCT_FIELDS)
+    rows, specs, images = await load_catalog(f"""
+        SELECT
+            {product_projection(fields, hide_inactive_about=True)}
+        FROM product p
+        WHERE p.slug = %s
+    """, (slug,), relations=relations)
 
     if not rows:
-        await conn.ensure_closed()
-        return []
-
-    products = {}
-    for r in rows:
-        pid = r["product_id"]
-
-        # Create base product structure if not exists
-        if pid not in products:
-            products[pid] = {
-                "id": r["product_id"],
-                "name": r["product_name"],
-                "slug": r["slug"],
-                "detail": r["detail"],
-                "is_active": r["is_active"],
-                "about_product": r["about_product"],
-                "image_id_about_product": r["image_id_about_product"],
-                "path_about_product": build_url(r["path_about_product"]),
-                "type_id": r["type_id"],
-                "new": r["new"],
-                "status": r["status"],
-                "created_at": r["created_at"],
-                "updated_at": r["updated_at"],
-                "category_id": r["category_id"],
-                "image_id": r["image_id"],
-                "primary_path": build_url(r["primary_path"]),
-                "user_id": r["user_id"],
-                "spicifications": [],
-                "images": []
-            }
-
-            # Disable about_product if inactive
-            if products[pid]["is_active"] == 0:
-                products[pid]["about_product"] = None
-                products[pid]["image_id_about_product"] = None
-                products[pid]["path_about_product"] = None
-
-        # Add specifications
-        if r["spicification_id"]:
-            spec_obj = {
-                "id": r["spicification_id"],
-                "title": r.get("spec_title"),
-                "description": r.get("spec_description"),
-            }
-            if spec_obj not in products[pid]["spicifications"]:
-                products[pid]["spicifications"].append(spec_obj)
-
-        # Add images
-        if r["product_image_id"]:
-            img_obj = {
-                "id": r["product_image_id"],
-                "path": build_url(r["image_path"])
-            }
-            if img_obj not in products[pid]["images"]:
-                products[pid]["images"].append(img_obj)
-
-    await conn.ensure_closed()
-
-    # Return list of products
-    return list(products.values())
+        return None
+
+    return shape_product(rows[0], fields, relations, specs, images, hide_inactive_about=True)
+
+
+async def get_products_by_type_id(type_id: int, fields: str = None, include: str = None):
+    fields, relations = select_product_fields(fields, include, DETAIL_PRODUCT_FIELDS)
+    rows, specs, images = await load_catalog(f"""
+        SELECT
+            {product_projection(fields, hide_inactive_about=True)}
+        FROM product p
+        WHERE p.type_id = %s
+        ORDER BY p.id DESC
+    """, (type_id,), relations=relations)
+
+    return [
+        shape_product(row, fields, relations, specs, images, hide_inactive_about=True)
+        for row in rows
+    ]
+
+
+# ===============================
+# Spec / image relations
+# ===============================
+# Updates diff the submitted lists against the product's current rows and write
+# only the difference: one multi-row DELETE and one multi-row INSERT per table
+# at most, nothing for rows that stay (their ids and created_at are kept).
+
+def _placeholders(values) -> str:
+    return ",".join(["%s"] * len(values))
+
+
+async def sync_product_specs(product_id: int, spec_ids, conn):
+    """Make product_spicification match `spec_ids`. Returns (inserted, deleted)."""
+    wanted = list(dict.fromkeys(int(s) for s in spec_ids))
+    rows = await fetch_all(
+        "SELECT spicification_id FROM product_spicification WHERE product_id=%s FOR UPDATE",
+        (product_id,), conn=conn
+    )
+    current = {row["spicification_id"] for row in rows}
+
+    removed = list(current - set(wanted))
+    added = [s for s in wanted if s not in current]
+    if removed:
+        await execute(
+            f"DELETE FROM product_spicification WHERE product_id=%s AND spicification_id IN ({_placeholders(removed)})",
+            (product_id, *removed), conn=conn
+        )
+    await execute_many(
+        "INSERT INTO product_spicification (product_id, spicification_id) VALUES (%s, %s)",
+        [(product_id, s) for s in added],
+        conn=conn
+    )
+    return len(added), len(removed)
+
+
+async def sync_product_images(product_id: int, paths, now, conn):
+    """Make product_images match `paths` (repeats allowed). Returns (inserted, deleted)."""
+    rows = await fetch_all(
+        "SELECT id, image_path FROM product_images WHERE product_id=%s ORDER BY id FOR UPDATE",
+        (product_id,), conn=conn
+    )
+    wanted = Counter(paths)
+    kept = Counter()
+    doomed = []
+    for row in rows:
+        if kept[row["image_path"]] < wanted[row["image_path"]]:
+            kept[row["image_path"]] += 1
+        else:
+            doomed.append(row["id"])
+
+    missing = wanted - kept
+    added = []
+    for path in paths:
+        if missing[path] > 0:
+            added.append(path)
+            missing[path] -= 1
+
+    if doomed:
+        await execute(f"DELETE FROM product_images WHERE id IN ({_placeholders(doomed)})", doomed, conn=conn)
+    await execute_many(
+        "INSERT INTO product_images (product_id, image_path, created_at, updated_at) VALUES (%s, %s, %s, %s)",
+        [(product_id, path, now, now) for path in added],
+        conn=conn
+    )
+    return len(added), len(doomed)
 
 
 # ===============================
 # Create product
 # ===============================
 async def create_product(data: dict):
-    conn = await get_db_connection()
     now = datetime.datetime.utcnow()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        try:
-            images = [img for img in data.get("images", []) if img.get("path")]
-            first_image = images[0] if images else None
+    try:
+        images = [img for img in data.get("images", []) if img.get("path")]
+        first_image = images[0] if images else None
 
-            slug = slugify(data.get("name", ""))  # generate slug from name
+        slug = slugify(data.get("name", ""))  # generate slug from name
 
-            await cursor.execute("""
+        async with transaction() as conn:
+            result = await execute("""
                 INSERT INTO product 
                 (category, category_sub, name, slug, is_active, about_product, image_id_about_product, image_id, path, detail, user_id, category_id, status, created_at, updated_at)
                 VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
@@ -448,37 +420,40 @@ async def create_product(data: dict):
                 data.get("status", 1),
                 now,
                 now
-            ))
-            product_id = cursor.lastrowid
-
-            for spic_id in data.get("spicification_id", []):
-                await cursor.execute("INSERT INTO product_spicification (product_id, spicification_id) VALUES (%s,%s)", (product_id, spic_id))
-
-            for img in images:
-                await cursor.execute("INSERT INTO product_images (product_id, image_path, created_at, updated_at) VALUES (%s,%s,%s,%s)", (product_id, img['path'], now, now))
-
-            await conn.commit()
-            return {
-                "id": product_id,
-                "name": data.get("name"),
-                "slug": slug,                  # <-- include slug in returned data
-                "detail": data.get("detail"),
-                "status": data.get("status", 1),
-                "created_at": now,
-                "updated_at": now,
-                "category_id": data.get("category_id"),
-                "image_id": first_image['id'] if first_image else None,
-                "primary_path": first_image['path'] if first_image else None,
-                "user_id": data.get("user_id"),
-                "spicifications": data.get("spicification_id", []),
-                "images": images
-            }
-
-        except Exception as e:
-            await conn.rollback()
-            return {"error": str(e)}
-        finally:
-            await conn.ensure_closed()
+            ), conn=conn)
+            product_id = result.lastrowid
+
+            await execute_many(
+                "INSERT INTO product_spicification (product_id, spicification_id) VALUES (%s,%s)",
+                [(product_id, spic_id) for spic_id in data.get("spicification_id", [])],
+                conn=conn
+            )
+
+            await execute_many(
+                "INSERT INTO product_images (product_id, image_path, created_at, updated_at) VALUES (%s,%s,%s,%s)",
+                [(product_id, img['path'], now, now) for img in images],
+                conn=conn
+            )
+
+        invalidate("product")
+        return {
+            "id": product_id,
+            "name": data.get("name"),
+            "slug": slug,                  # <-- include slug in returned data
+            "detail": data.get("detail"),
+            "status": data.get("status", 1),
+            "created_at": now,
+            "updated_at": now,
+            "category_id": data.get("category_id"),
+            "image_id": first_image['id'] if first_image else None,
+            "primary_path": first_image['path'] if first_image else None,
+            "user_id": data.get("user_id"),
+            "spicifications": data.get("spicification_id", []),
+            "images": images
+        }
+
+    except Exception as e:
+        return {"error": str(e)}
 
 
 
@@ -486,14 +461,12 @@ async def create_product(data: dict):
 # Update product
 # ===============================
 async def update_product(product_id: int, data: dict):
-    conn = await get_db_connection()
     updated_at = datetime.datetime.utcnow()
 
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        try:
+    try:
+        async with transaction() as conn:
             # Check product exists
-            await cursor.execute("SELECT created_at FROM product WHERE id=%s", (product_id,))
-            row = await cursor.fetchone()
+            row = await fetch_one("SELECT created_at FROM product WHERE id=%s", (product_id,), conn=conn)
             if not row:
                 return {"error": "Product not found"}
 
@@ -513,7 +486,7 @@ async def update_product(product_id: int, data: dict):
             # -----------------------------
             #       UPDATE PRODUCT
             # -----------------------------
-            await cursor.execute("""
+            await execute("""
                 UPDATE product SET
                     category=%s,
                     category_sub=%s,
@@ -551,37 +524,24 @@ async def update_product(product_id: int, data: dict):
                 data.get("status", 1),
                 updated_at,
                 product_id
-            ))
+            ), conn=conn)
 
             # -----------------------------
             #  UPDATE SPECIFICATION RELATIONS
             # -----------------------------
-            await cursor.execute("DELETE FROM product_spicification WHERE product_id=%s", (product_id,))
-            for spic_id in data.get("spicification_id", []):
-                await cursor.execute(
-                    "INSERT INTO product_spicification (product_id, spicification_id) VALUES (%s, %s)",
-                    (product_id, spic_id)
-                )
+            await sync_product_specs(product_id, data.get("spicification_id", []), conn)
 
             # -----------------------------
             #      UPDATE GALLERY IMAGES
             # -----------------------------
-            await cursor.execute("DELETE FROM product_images WHERE product_id=%s", (product_id,))
-            for img in images:
-                await cursor.execute(
-                    "INSERT INTO product_images (product_id, image_path, created_at, updated_at) VALUES (%s, %s, %s, %s)",
-                    (product_id, img["path"], updated_at, updated_at)
-                )
+            await sync_product_images(product_id, [img["path"] for img in images], updated_at, conn)
 
-            await conn.commit()
-            return {"id": product_id, **data, "slug": slug}
+        invalidate("product")
+        return {"id": product_id, **data, "slug": slug}
 
-        except Exception as e:
-            await conn.rollback()
-            return {"error": str(e)}
+    except Exception as e:
+        return {"error": str(e)}
 
-        finally:
-            conn.close()
 
 
 
@@ -589,83 +549,26 @@ async def update_product(product_id: int, data: dict):
 # Soft delete product
 # ===============================
 async def delete_product(product_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("UPDATE product SET status=0, updated_at=%s WHERE id=%s", (datetime.datetime.utcnow(), product_id))
-        await conn.commit()
-    await conn.ensure_closed()
+    await execute("UPDATE product SET status=0, updated_at=%s WHERE id=%s", (datetime.datetime.utcnow(), product_id))
+    invalidate("product")
     return {"message": f"Product {product_id} soft-deleted"}
 
 
 # ===============================
 # Get all products for public (with specs/images)
 # ===============================
-async def get_all_products_public():
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("""
-            SELECT 
-                p.id AS product_id,
-                p.name AS product_name,
-                p.slug,
-                p.detail,
-                p.status,
-                p.created_at,
-                p.updated_at,
-                p.category_id,
-                p.image_id,
-                p.path AS primary_path,
-                p.image_id_about_product,
-                p.path_about_product,
-                p.type_id,
-                p.user_id,
-                ps.spicification_id,
-                s.title AS spec_title,
-                s.descriptions AS spec_description,
-                pi.id AS product_image_id,
-                pi.image_path
-            FROM product p
-            LEFT JOIN product_spicification ps ON ps.product_id=p.id
-            LEFT JOIN spicification s ON s.id=ps.spicification_id
-            LEFT JOIN product_images pi ON pi.product_id=p.id
-            WHERE p.status=1
-            ORDER BY p.id DESC
-        """)
-        rows = await cursor.fetchall()
-
-    products = {}
-    for row in rows:
-        pid = row["product_id"]
-        if pid not in products:
-            products[pid] = {
-                "id": pid,
-                "name": row["product_name"],
-                "slug": row["slug"],
-                "detail": row["detail"],
-                "status": row["status"],
-                "created_at": row["created_at"],
-                "updated_at": row["updated_at"],
-                "category_id": row["category_id"],
-                "image_id": row["image_id"],
-                "primary_path": row["primary_path"],
-                "image_id_about_product": row["image_id_about_product"],
-                "path_about_product": row["path_about_product"],
-                "type_id": row["type_id"],
-                "user_id": row["user_id"],
-                "spicifications": [],
-                "images": []
-            }
-        if row["spicification_id"]:
-            spec_obj = {"id": row["spicification_id"], "title": row["spec_title"], "description": row["spec_description"]}
-            if spec_obj not in products[pid]["spicifications"]:
-                products[pid]["spicifications"].append(spec_obj)
-        if row["product_image_id"]:
-            img_obj = {"id": row["product_image_id"], "path": row["image_path"]}
-            if img_obj not in products[pid]["images"]:
-                products[pid]["images"].append(img_obj)
-
-    await conn.ensure_closed()
-    return list(products.values())
+async def get_all_products_public(fields: str = None, include: str = None):
+    fields, relations = select_product_fields(fields, include, PUBLIC_PRODUCT_FIELDS)
+    rows, specs, images = await load_catalog(f"""
+        SELECT
+            {product_projection(fields)}
+        FROM product p
+        WHERE p.status=1
+        ORDER BY p.id DESC
+    """, relations=relations)
+
+    # Paths are returned as stored (no base URL)
+    return [shape_product(row, fields, relations, specs, images, urls=False) for row in rows]
 
 
 
@@ -676,12 +579,10 @@ async def update_product_category(product_id: int, data: dict):
     """
     Update only the 'product_category' field for a product.
     """
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        try:
+    try:
+        async with db_connection() as conn:
             # Check if product exists
-            await cursor.execute("SELECT id FROM product WHERE id = %s", (product_id,))
-            row = await cursor.fetchone()
+            row = await fetch_one("SELECT id FROM product WHERE id = %s", (product_id,), conn=conn)
             if not row:
                 return {"success": False, "error": "Product not found"}
 
@@ -690,27 +591,24 @@ async def update_product_category(product_id: int, data: dict):
                 return {"success": False, "error": "'product_category' is required"}
 
             # Update product category
-            await cursor.execute("""
+            await execute("""
                 UPDATE product 
                 SET product_category = %s,
                     updated_at = %s
                 WHERE id = %s
-            """, (category, datetime.datetime.utcnow(), product_id))
-            
-            await conn.commit()
-            return {
-                "success": True,
-                "id": product_id,
-                "product_category": category,
-                "message": "Product category updated successfully"
-            }
+            """, (category, datetime.datetime.utcnow(), product_id), conn=conn)
 
-        except Exception as e:
-            await conn.rollback()
-            return {"success": False, "error": str(e)}
+        invalidate("product")
+        return {
+            "success": True,
+            "id": product_id,
+            "product_category": category,
+            "message": "Product category updated successfully"
+        }
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
 
-        finally:
-            conn.close()
 
 
 # ------------------------------
@@ -720,13 +618,10 @@ async def update_product_new(product_id: int, data: dict):
     """
     Update ONLY the 'type_id' field of a product.
     """
-    conn = await get_db_connection()
-
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        try:
+    try:
+        async with db_connection() as conn:
             # Check if product exists
-            await cursor.execute("SELECT id FROM product WHERE id = %s", (product_id,))
-            row = await cursor.fetchone()
+            row = await fetch_one("SELECT id FROM product WHERE id = %s", (product_id,), conn=conn)
 
             if not row:
                 return {"success": False, "error": "Product not found"}
@@ -740,7 +635,7 @@ async def update_product_new(product_id: int, data: dict):
                 }
 
             # Update field
-            await cursor.execute("""
+            await execute("""
                 UPDATE product
                 SET type_id = %s,
                     updated_at = %s
@@ -749,187 +644,43 @@ async def update_product_new(product_id: int, data: dict):
                 new_type_id,
                 datetime.datetime.utcnow(),
                 product_id
-            ))
-
-            await conn.commit()
-
-            return {
-                "success": True,
-                "id": product_id,
-                "type_id": new_type_id,
-                "message": "Product type_id updated successfully"
-            }
-
-        except Exception as e:
-            await conn.rollback()
-            return {"success": False, "error": str(e)}
-
-        finally:
-            conn.close()
-
-
-async def get_all_new_products_public():
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("""
-            SELECT 
-                p.id AS product_id,
-                p.name AS product_name,
-                p.detail,
-                p.status,
-                p.new,
-                p.slug,
-                p.created_at,
-                p.updated_at,
-                p.category_id,
-                p.image_id,
-                p.path AS primary_path,
-                p.image_id_about_product,
-                p.path_about_product,
-                p.user_id,
-
-                ps.spicification_id,
-                s.title AS spec_title,
-                s.descriptions AS spec_description,
-
-                pi.id AS product_image_id,
-                pi.image_path
-            FROM product p
-            LEFT JOIN product_spicification ps ON ps.product_id = p.id
-            LEFT JOIN spicification s ON s.id = ps.spicification_id
-            LEFT JOIN product_images pi ON pi.product_id = p.id
-            WHERE p.status = 1 AND p.new = 1
-            ORDER BY p.id DESC
-        """)
-        rows = await cursor.fetchall()
-
-    await conn.ensure_closed()
-
-    products = {}
-
-    for row in rows:
-        pid = row["product_id"]
-
-        if pid not in products:
-            products[pid] = {
-                "id": pid,
-                "name": row["product_name"],
-                "slug": row["slug"],
-                "detail": row["detail"],
-                "status": row["status"],
-                "new": row["new"],
-                "created_at": row["created_at"],
-                "updated_at": row["updated_at"],
-                "category_id": row["category_id"],
-
-                "image_id": row["image_id"],
-                "primary_path": build_url(row["primary_path"]),   # ✅ FIXED
-
-                "image_id_about_product": row["image_id_about_product"],
-                "path_about_product": build_url(row["path_about_product"]),  # ✅ FIXED
-
-                "user_id": row["user_id"],
-                "spicifications": [],
-                "images": []
-            }
-
-        # Add spec
-        if row["spicification_id"]:
-            spec_obj = {
-                "id": row["spicification_id"],
-                "title": row.get("spec_title"),
-                "description": row.get("spec_description"),
-            }
-            if spec_obj not in products[pid]["spicifications"]:
-                products[pid]["spicifications"].append(spec_obj)
-
-        # Add product images
-        if row["product_image_id"]:
-            img_obj = {
-                "id": row["product_image_id"],
-                "path": build_url(row["image_path"])   # ✅ FIXED
-            }
-            if img_obj not in products[pid]["images"]:
-                products[pid]["images"].append(img_obj)
-
-    return list(products.values())
-
-
-async def get_all_products_by_category_public(category: str):
-    
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("""
-            SELECT 
-                p.id AS product_id,
-                p.name AS product_name,
-                p.detail,
-                p.status,
-                p.created_at,
-                p.updated_at,
-                p.category_id,
-                p.image_id,
-                p.path AS primary_path,
-                p.user_id,
-                
-                ps.spicification_id,
-                s.title AS spec_title,
-                s.descriptions AS spec_description,
-                p.image_id_about_product,
-                p.path_about_product,
-
-                pi.id AS product_image_id,
-                pi.image_path
-            FROM product p
-            LEFT JOIN product_spicification ps ON ps.product_id = p.id
-            LEFT JOIN spicification s ON s.id = ps.spicification_id
-            LEFT JOIN product_images pi ON pi.product_id = p.id
-            WHERE p.status = 1 AND p.category_id = %s
-            ORDER BY p.id DESC
-        """, (category,))
-        rows = await cursor.fetchall()
-
-    await conn.ensure_closed()
-
-    # ✅ Build structured response
-    products = {}
-    for row in rows:
-        pid = row["product_id"]
-        if pid not in products:
-            products[pid] = {
-                "id": pid,
-                "name": row["product_name"],
-                "detail": row["detail"],
-                "status": row["status"],
-                "created_at": row["created_at"],
-                "updated_at": row["updated_at"],
-                "category_id": row["category_id"],
-                "image_id": row["image_id"],
-                "image_id_about_product": row["image_id_about_product"],
-                "path_about_product": row["path_about_product"],
-                "primary_path": row["primary_path"],
-                "user_id": row["user_id"],
-                "spicifications": [],
-                "images": []
-            }
-
-        # ✅ Add specification
-        if row["spicification_id"]:
-            spec_obj = {
-                "id": row["spicification_id"],
-                "title": row.get("spec_title"),
-                "description": row.get("spec_description")
-            }
-            if spec_obj not in products[pid]["spicifications"]:
-                products[pid]["spicifications"].append(spec_obj)
-
-        # ✅ Add image
-        if row["product_image_id"]:
-            img_obj = {
-                "id": row["product_image_id"],
-                "path": row["image_path"]
-            }
-            if img_obj not in products[pid]["images"]:
-                products[pid]["images"].append(img_obj)
-
-    return list(products.values())
\ No newline at end of file
+            ), conn=conn)
+
+        invalidate("product")
+        return {
+            "success": True,
+            "id": product_id,
+            "type_id": new_type_id,
+            "message": "Product type_id updated successfully"
+        }
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+
+async def get_all_new_products_public(fields: str = None, include: str = None):
+    fields, relations = select_product_fields(fields, include, NEW_PRODUCT_FIELDS)
+    rows, specs, images = await load_catalog(f"""
+        SELECT
+            {product_projection(fields)}
+        FROM product p
+        WHERE p.status = 1 AND p.new = 1
+        ORDER BY p.id DESC
+    """, relations=relations)
+
+    return [shape_product(row, fields, relations, specs, images) for row in rows]
+
+
+async def get_all_products_by_category_public(category: str, fields: str = None, include: str = None):
+    fields, relations = select_product_fields(fields, include, CATEGORY_PRODUCT_FIELDS)
+    rows, specs, images = await load_catalog(f"""
+        SELECT
+            {product_projection(fields)}
+        FROM product p
+        WHERE p.status = 1 AND p.category_id = %s
+        ORDER BY p.id DESC
+    """, (category,), relations=relations)
+
+    # Paths are returned as stored (no base URL)
+    return [shape_product(row, fields, relations, specs, images, urls=False) for row in rows]
@@ -1,7 +1,7 @@
 import os
 import datetime
-import aiomysql
-from db import get_db_connection
+from utils.query_executor import fetch_one, fetch_all, execute
+from utils.response_cache import invalidate
 
 
 # =====================================
@@ -22,33 +22,11 @@ def build_url(path: str):
     return f"{base}/{path}"
 
 
-# =====================================
-# Helper: auto DB execution
-# =====================================
-async def exec_query(query, params=None, fetchone=False, fetchall=False, commit=False):
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute(query, params or ())
-
-            if commit:
-                await conn.commit()
-
-            if fetchone:
-                return await cursor.fetchone()
-
-            if fetchall:
-                return await cursor.fetchall()
-
-    finally:
-        await conn.ensure_closed()
-
-
 # =====================================
 # Get all CEOs (admin)
 # =====================================
 async def get_all_ceos():
-    rows = await exec_query("SELECT * FROM profile_ceo WHERE status = 1", fetchall=True)
+    rows = await fetch_all("SELECT * FROM profile_ceo WHERE status = 1")
 
     for r in rows:
         r["path"] = build_url(r.get("path"))
@@ -60,10 +38,9 @@ async def get_all_ceos():
 # Get CEO by ID
 # =====================================
 async def get_ceo_by_id(ceo_id: int):
-    row = await exec_query(
+    row = await fetch_one(
         "SELECT * FROM profile_ceo WHERE id = %s",
-        (ceo_id,),
-        fetchone=True
+        (ceo_id,)
     )
 
     if row:
@@ -80,7 +57,7 @@ async def create_ceo(data: dict):
 
     # Check foreign keys exist
     for field, table in [("image_id", "gallery"), ("user_id", "users")]:
-        fk = await exec_query(f"SELECT id FROM {table} WHERE id=%s", (data.get(field),), fetchone=True)
+        fk = await fetch_one(f"SELECT id FROM {table} WHERE id=%s", (data.get(field),))
         if not fk:
             return {"error": f"{field} not found"}
 
@@ -106,20 +83,15 @@ async def create_ceo(data: dict):
         now
     )
 
-    conn = await get_db_connection()
     try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute(query, values)
-            await conn.commit()
-            ceo_id = cursor.lastrowid
+        result = await execute(query, values)
+        ceo_id = result.lastrowid
     except Exception as e:
-        await conn.rollback()
         return {"error": str(e)}
-    finally:
-        await conn.ensure_closed()
 
     data["path"] = build_url(data.get("path"))
 
+    invalidate("profile_ceo")
     return {"id": ceo_id, **data, "created_at": now, "updated_at": now}
 
 
@@ -127,10 +99,9 @@ async def create_ceo(data: dict):
 # Update CEO
 # =====================================
 async def update_ceo(ceo_id: int, data: dict):
-    existing = await exec_query(
+    existing = await fetch_one(
         "SELECT created_at FROM profile_ceo WHERE id = %s",
-        (ceo_id,),
-        fetchone=True
+        (ceo_id,)
     )
 
     if not existing:
@@ -162,10 +133,11 @@ async def update_ceo(ceo_id: int, data: dict):
         ceo_id
     )
 
-    await exec_query(query, values, commit=True)
+    await execute(query, values)
 
     data["path"] = build_url(data.get("path"))
 
+    invalidate("profile_ceo")
     return {"id": ceo_id, **data, "created_at": created_at, "updated_at": updated_at}
 
 
@@ -173,11 +145,11 @@ async def update_ceo(ceo_id: int, data: dict):
 # Soft delete CEO
 # =====================================
 async def delete_ceo(ceo_id: int):
-    await exec_query(
+    await execute(
         "UPDATE profile_ceo SET status=0, updated_at=%s WHERE id=%s",
-        (datetime.datetime.utcnow(), ceo_id),
-        commit=True
+        (datetime.datetime.utcnow(), ceo_id)
     )
+    invalidate("profile_ceo")
     return {"message": f"Profile CEO {ceo_id} soft-deleted (status = 0)"}
 
 
@@ -185,9 +157,8 @@ async def delete_ceo(ceo_id: int):
 # Get all CEOs (public)
 # =====================================
 async def get_all_ceos_public():
-    rows = await exec_query(
-        "SELECT * FROM profile_ceo WHERE status = 1",
-        fetchall=True
+    rows = await fetch_all(
+        "SELECT * FROM profile_ceo WHERE status = 1"
     )
     for r in rows:
         r["path"] = build_url(r.get("path"))
@@ -198,10 +169,9 @@ async def get_all_ceos_public():
 # Get CEO testimonial list
 # =====================================
 async def get_testimonial_public(type_id: int):
-    rows = await exec_query(
+    rows = await fetch_all(
         "SELECT * FROM profile_ceo WHERE publisher = %s AND status = 1",
-        (type_id,),
-        fetchall=True
+        (type_id,)
     )
 
     for r in rows:
@@ -224,6 +194,7 @@ async def set_testimonial(ceo_id: int, data: dict):
 
     values = (data.get("publisher"), updated_at, ceo_id)
 
-    await exec_query(query, values, commit=True)
+    await execute(query, values)
 
+    invalidate("profile_ceo")
     return {"message": f"CEO {ceo_id} testimonial publisher updated", "publisher": data.get("publisher")}
@@ -1,52 +1,37 @@
 import datetime
-import aiomysql
-from db import get_db_connection  # should return aiomysql connection
+from db import db_connection
+from utils.query_executor import fetch_one, fetch_all, execute
 
 
 # ===============================
 # Get all roles (active)
 # ===============================
 async def get_all_roles():
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM role WHERE status = 1")
-        rows = await cursor.fetchall()
-    await conn.ensure_closed()
-    return rows
+    return await fetch_all("SELECT * FROM role WHERE status = 1")
 
 
 # ===============================
 # Get role by ID
 # ===============================
 async def get_role_by_id(role_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM role WHERE id = %s", (role_id,))
-        row = await cursor.fetchone()
-    await conn.ensure_closed()
-    return row
+    return await fetch_one("SELECT * FROM role WHERE id = %s", (role_id,))
 
 
 # ===============================
 # Create role
 # ===============================
 async def create_role(data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
+    async with db_connection() as conn:
         # Check if name exists
-        await cursor.execute("SELECT * FROM role WHERE name = %s AND status = 1", (data.get("name"),))
-        if await cursor.fetchone():
-            await conn.ensure_closed()
+        if await fetch_one("SELECT * FROM role WHERE name = %s AND status = 1", (data.get("name"),), conn=conn):
             return {"error": "Role name already exists"}
 
         now = datetime.datetime.utcnow()
-        await cursor.execute("""
+        result = await execute("""
             INSERT INTO role (name, status, created_at, updated_at)
             VALUES (%s, %s, %s, %s)
-        """, (data.get("name"), data.get("status", 1), now, now))
-        role_id = cursor.lastrowid
-        await conn.commit()
-    await conn.ensure_closed()
+        """, (data.get("name"), data.get("status", 1), now, now), conn=conn)
+        role_id = result.lastrowid
     return {"id": role_id, **data, "created_at": now, "updated_at": now}
 
 
@@ -54,32 +39,25 @@ async def create_role(data: dict):
 # Update role
 # ===============================
 async def update_role(role_id: int, data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
+    async with db_connection() as conn:
         # Prevent duplicate name
-        await cursor.execute("SELECT * FROM role WHERE name = %s AND id != %s AND status = 1", (data.get("name"), role_id))
-        if await cursor.fetchone():
-            await conn.ensure_closed()
+        if await fetch_one("SELECT * FROM role WHERE name = %s AND id != %s AND status = 1", (data.get("name"), role_id), conn=conn):
             return {"error": "Role name already exists"}
 
         # Fetch existing created_at
-        await cursor.execute("SELECT created_at FROM role WHERE id = %s", (role_id,))
-        row = await cursor.fetchone()
+        row = await fetch_one("SELECT created_at FROM role WHERE id = %s", (role_id,), conn=conn)
         if not row:
-            await conn.ensure_closed()
             return {"error": "Role not found"}
 
         created_at = row["created_at"]
         updated_at = datetime.datetime.utcnow()
 
         # Update role
-        await cursor.execute("""
-            UPDATE role 
-            SET name = %s, status = %s, created_at = %s, updated_at = %s 
+        await execute("""
+            UPDATE role
+            SET name = %s, status = %s, created_at = %s, updated_at = %s
             WHERE id = %s
-        """, (data.get("name"), data.get("status", 1), created_at, updated_at, role_id))
-        await conn.commit()
-    await conn.ensure_closed()
+        """, (data.get("name"), data.get("status", 1), created_at, updated_at, role_id), conn=conn)
 
     return {"id": role_id, "name": data.get("name"), "status": data.get("status", 1),
             "created_at": created_at, "updated_at": updated_at}
@@ -89,11 +67,7 @@ async def update_role(role_id: int, data: dict):
 # Soft delete role
 # ===============================
 async def delete_role(role_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        # Soft delete (status = 0)
-        await cursor.execute("UPDATE role SET status = 0, updated_at = %s WHERE id = %s",
-                             (datetime.datetime.utcnow(), role_id))
-        await conn.commit()
-    await conn.ensure_closed()
+    # Soft delete (status = 0)
+    await execute("UPDATE role SET status = 0, updated_at = %s WHERE id = %s",
+                  (datetime.datetime.utcnow(), role_id))
     return {"message": f"Role {role_id} deleted successfully!"}
@@ -1,7 +1,8 @@
 import os
 import datetime
-import aiomysql
-from db import get_db_connection
+from db import db_connection
+from utils.query_executor import fetch_one, fetch_all, execute
+from utils.response_cache import invalidate
 
 
 # ===============================
@@ -25,37 +26,25 @@ def build_url(path: str):
 # Get all solutions (admin)
 # ===============================
 async def get_all_solutions():
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute("SELECT * FROM solution ORDER BY id DESC")
-            rows = await cursor.fetchall()
+    rows = await fetch_all("SELECT * FROM solution ORDER BY id DESC")
 
-            # Add full URL
-            for r in rows:
-                r["path"] = build_url(r.get("path"))
+    # Add full URL
+    for r in rows:
+        r["path"] = build_url(r.get("path"))
 
-        return rows
-    finally:
-        await conn.ensure_closed()
+    return rows
 
 
 # ===============================
 # Get solution by ID (admin)
 # ===============================
 async def get_solution_by_id(solution_id: int):
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute("SELECT * FROM solution WHERE id = %s", (solution_id,))
-            row = await cursor.fetchone()
+    row = await fetch_one("SELECT * FROM solution WHERE id = %s", (solution_id,))
 
-            if row:
-                row["path"] = build_url(row.get("path"))
+    if row:
+        row["path"] = build_url(row.get("path"))
 
-        return row
-    finally:
-        await conn.ensure_closed()
+    return row
 
 
 # ===============================
@@ -64,162 +53,128 @@ async def get_solution_by_id(solution_id: int):
 async def create_solution(data: dict):
     now = datetime.datetime.utcnow()
 
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
+    async with db_connection() as conn:
 
-            # FK checks
-            await cursor.execute("SELECT id FROM gallery WHERE id = %s", (data.get("image_id"),))
-            if not await cursor.fetchone():
-                return {"error": "image_id not found"}
+        # FK checks
+        if not await fetch_one("SELECT id FROM gallery WHERE id = %s", (data.get("image_id"),), conn=conn):
+            return {"error": "image_id not found"}
 
-            await cursor.execute("SELECT id FROM users WHERE id = %s", (data.get("user_id"),))
-            if not await cursor.fetchone():
-                return {"error": "user_id not found"}
+        if not await fetch_one("SELECT id FROM users WHERE id = %s", (data.get("user_id"),), conn=conn):
+            return {"error": "user_id not found"}
 
-            await cursor.execute("""
-                INSERT INTO solution
-                (category, category_sub, title, image_id, path, user_id, status, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                data.get("category"),
-                data.get("category_sub"),
-                data.get("title"),
-                data.get("image_id"),
-                data.get("path"),
-                data.get("user_id"),
-                data.get("status", 1),
-                now,
-                now
-            ))
+        result = await execute("""
+            INSERT INTO solution
+            (category, category_sub, title, image_id, path, user_id, status, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            data.get("category"),
+            data.get("category_sub"),
+            data.get("title"),
+            data.get("image_id"),
+            data.get("path"),
+            data.get("user_id"),
+            data.get("status", 1),
+            now,
+            now
+        ), conn=conn)
 
-            solution_id = cursor.lastrowid
-            await conn.commit()
+        solution_id = result.lastrowid
 
-        data["path"] = build_url(data.get("path"))
-        return {"id": solution_id, **data, "created_at": now, "updated_at": now}
-
-    finally:
-        await conn.ensure_closed()
+    data["path"] = build_url(data.get("path"))
+    invalidate("solution")
+    return {"id": solution_id, **data, "created_at": now, "updated_at": now}
 
 
 # ===============================
 # Update solution
 # ===============================
 async def update_solution(solution_id: int, data: dict):
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-
-            await cursor.execute("SELECT created_at FROM solution WHERE id=%s", (solution_id,))
-            row = await cursor.fetchone()
-            if not row:
-                return {"error": "Solution not found"}
-
-            created_at = row["created_at"]
-            updated_at = datetime.datetime.utcnow()
-
-            await cursor.execute("""
-                UPDATE solution SET
-                    category=%s,
-                    category_sub=%s,
-                    title=%s,
-                    image_id=%s,
-                    path=%s,
-                    user_id=%s,
-                    status=%s,
-                    created_at=%s,
-                    updated_at=%s
-                WHERE id=%s
-            """, (
-                data.get("category"),
-                data.get("category_sub"),
-                data.get("title"),
-                data.get("image_id"),
-                data.get("path"),
-                data.get("user_id"),
-                data.get("status", 1),
-                created_at,
-                updated_at,
-                solution_id
-            ))
-
-            await conn.commit()
-
-        data["path"] = build_url(data.get("path"))
-
-        return {
-            "id": solution_id,
-            **data,
-            "created_at": created_at,
-            "updated_at": updated_at
-        }
-
-    finally:
-        await conn.ensure_closed()
+    async with db_connection() as conn:
+
+        row = await fetch_one("SELECT created_at FROM solution WHERE id=%s", (solution_id,), conn=conn)
+        if not row:
+            return {"error": "Solution not found"}
+
+        created_at = row["created_at"]
+        updated_at = datetime.datetime.utcnow()
+
+        await execute("""
+            UPDATE solution SET
+                category=%s,
+                category_sub=%s,
+                title=%s,
+                image_id=%s,
+                path=%s,
+                user_id=%s,
+                status=%s,
+                created_at=%s,
+                updated_at=%s
+            WHERE id=%s
+        """, (
+            data.get("category"),
+            data.get("category_sub"),
+            data.get("title"),
+            data.get("image_id"),
+            data.get("path"),
+            data.get("user_id"),
+            data.get("status", 1),
+            created_at,
+            updated_at,
+            solution_id
+        ), conn=conn)
+
+    data["path"] = build_url(data.get("path"))
+
+    invalidate("solution")
+    return {
+        "id": solution_id,
+        **data,
+        "created_at": created_at,
+        "updated_at": updated_at
+    }
 
 
 # ===============================
 # Soft delete solution
 # ===============================
 async def delete_solution(solution_id: int):
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute(
-                "UPDATE solution SET status = 0, updated_at=%s WHERE id=%s",
-                (datetime.datetime.utcnow(), solution_id)
-            )
-            await conn.commit()
-
-        return {"message": f"Solution {solution_id} soft-deleted"}
+    await execute(
+        "UPDATE solution SET status = 0, updated_at=%s WHERE id=%s",
+        (datetime.datetime.utcnow(), solution_id)
+    )
 
-    finally:
-        await conn.ensure_closed()
+    invalidate("solution")
+    return {"message": f"Solution {solution_id} soft-deleted"}
 
 
 # ===============================
 # Get solutions for public
 # ===============================
 async def get_all_solutions_public(limit: int = 4):
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute("""
-                SELECT * FROM solution
-                WHERE status = 1
-                ORDER BY id DESC
-                LIMIT %s
-            """, (limit,))
-            rows = await cursor.fetchall()
-
-            # Add full URL
-            for r in rows:
-                r["path"] = build_url(r.get("path"))
+    rows = await fetch_all("""
+        SELECT * FROM solution
+        WHERE status = 1
+        ORDER BY id DESC
+        LIMIT %s
+    """, (limit,))
 
-        return rows
+    # Add full URL
+    for r in rows:
+        r["path"] = build_url(r.get("path"))
 
-    finally:
-        await conn.ensure_closed()
+    return rows
 
 
 # ===============================
 # Get one public solution
 # ===============================
 async def get_solution_public_by_id(solution_id: int):
-    conn = await get_db_connection()
-    try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            await cursor.execute(
-                "SELECT * FROM solution WHERE id = %s AND status = 1",
-                (solution_id,)
-            )
-            row = await cursor.fetchone()
-
-            if row:
-                row["path"] = build_url(row.get("path"))
-
-        return row
-
-    finally:
-        await conn.ensure_closed()
+    row = await fetch_one(
+        "SELECT * FROM solution WHERE id = %s AND status = 1",
+        (solution_id,)
+    )
+
+    if row:
+        row["path"] = build_url(row.get("path"))
+
+    return row
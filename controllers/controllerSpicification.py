@@ -1,49 +1,37 @@
 import datetime
-import aiomysql
-from db import get_db_connection  # Should return an aiomysql connection pool
+from db import db_connection
+from utils.query_executor import fetch_one, fetch_all, execute
+from utils.response_cache import invalidate
 
 
 # ===============================
 # Get all spicifications
 # ===============================
 async def get_all_spicifications():
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM spicification WHERE status = 1")
-        rows = await cursor.fetchall()
-    await conn.ensure_closed()
-    return rows
+    return await fetch_all("SELECT * FROM spicification WHERE status = 1")
 
 
 # ===============================
 # Get spicification by ID
 # ===============================
 async def get_spicification_by_id(spicification_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute(
-            "SELECT * FROM spicification WHERE id = %s", (spicification_id,)
-        )
-        row = await cursor.fetchone()
-    await conn.ensure_closed()
-    return row
+    return await fetch_one(
+        "SELECT * FROM spicification WHERE id = %s", (spicification_id,)
+    )
 
 
 # ===============================
 # Create spicification
 # ===============================
 async def create_spicification(data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
+    async with db_connection() as conn:
         # Check if user_id exists
-        await cursor.execute("SELECT id FROM users WHERE id = %s", (data.get("user_id"),))
-        if not await cursor.fetchone():
-            await conn.ensure_closed()
+        if not await fetch_one("SELECT id FROM users WHERE id = %s", (data.get("user_id"),), conn=conn):
             return {"error": "user_id not found"}
 
         now = datetime.datetime.utcnow()
-        await cursor.execute("""
-            INSERT INTO spicification 
+        result = await execute("""
+            INSERT INTO spicification
             (category, category_sub, title, descriptions, user_id, status, created_at, updated_at)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """, (
@@ -55,10 +43,9 @@ async def create_spicification(data: dict):
             data.get("status", 1),
             now,
             now
-        ))
-        spicification_id = cursor.lastrowid
-        await conn.commit()
-    await conn.ensure_closed()
+        ), conn=conn)
+        spicification_id = result.lastrowid
+    invalidate("spicification")
     return {"id": spicification_id, **data}
 
 
@@ -66,20 +53,17 @@ async def create_spicification(data: dict):
 # Update spicification
 # ===============================
 async def update_spicification(spicification_id: int, data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
+    async with db_connection() as conn:
         # Get current created_at to preserve
-        await cursor.execute("SELECT created_at FROM spicification WHERE id = %s", (spicification_id,))
-        row = await cursor.fetchone()
+        row = await fetch_one("SELECT created_at FROM spicification WHERE id = %s", (spicification_id,), conn=conn)
         if not row:
-            await conn.ensure_closed()
             return {"error": "Spicification not found"}
 
         created_at = row["created_at"]
         updated_at = datetime.datetime.utcnow()
 
-        await cursor.execute("""
-            UPDATE spicification 
+        await execute("""
+            UPDATE spicification
             SET category=%s, category_sub=%s, title=%s, descriptions=%s, user_id=%s,
                 status=%s, created_at=%s, updated_at=%s
             WHERE id=%s
@@ -93,9 +77,8 @@ async def update_spicification(spicification_id: int, data: dict):
             created_at,
             updated_at,
             spicification_id
-        ))
-        await conn.commit()
-    await conn.ensure_closed()
+        ), conn=conn)
+    invalidate("spicification")
     return {"id": spicification_id, **data}
 
 
@@ -103,11 +86,8 @@ async def update_spicification(spicification_id: int, data: dict):
 # Soft delete spicification
 # ===============================
 async def delete_spicification(spicification_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute(
-            "UPDATE spicification SET status = 0 WHERE id = %s", (spicification_id,)
-        )
-        await conn.commit()
-    await conn.ensure_closed()
+    await execute(
+        "UPDATE spicification SET status = 0 WHERE id = %s", (spicification_id,)
+    )
+    invalidate("spicification")
     return {"message": f"Spicification {spicification_id} soft-deleted"}
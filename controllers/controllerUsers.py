@@ -1,82 +1,88 @@
 import datetime
+import json
 from fastapi import HTTPException
-from security import hash_password, verify_password
-from db import get_db_connection  # this should return an aiomysql connection
-import aiomysql
+from security import hash_password_async, verify_password_async, PasswordHasherBusy
+from db import db_connection, transaction
+from utils.query_executor import fetch_one, fetch_all, fetch_scalar, execute
+from utils.pagination import is_paged, page_args, keyset_filter, build_page
+from utils.permissions import role_permission_ids
+from utils.token_revocation import bump_permission_version, permission_version_changed
 import pymysql
 
 # ===============================
 # Users
 # ===============================
 
-async def get_all_users():
-    conn = await get_db_connection()
+async def get_all_users(cursor: str = None, limit: int = None, with_total: bool = False):
+    paged = is_paged(cursor, limit)
+    after_id, limit = page_args(cursor, limit) if paged else (None, None)
+    keyset, params = keyset_filter("u.id", after_id, descending=True)
+
     try:
-        async with conn.cursor(aiomysql.DictCursor) as cursor:
-            query = """
-                SELECT 
-                    u.id,
-                    u.username,
-                    u.email,
-                    u.status,
-                    u.created_at,
-                    u.updated_at,
-                    r.name AS role_name
-                FROM users AS u
-                LEFT JOIN role AS r ON u.role_id = r.id
-                ORDER BY u.id DESC
-            """
-            await cursor.execute(query)
-            rows = await cursor.fetchall()
-            return rows
+        query = f"""
+            SELECT
+                u.id,
+                u.username,
+                u.email,
+                u.status,
+                u.created_at,
+                u.updated_at,
+                r.name AS role_name
+            FROM users AS u
+            LEFT JOIN role AS r ON u.role_id = r.id
+            WHERE {keyset}
+            ORDER BY u.id DESC
+        """
+        if not paged:
+            return await fetch_all(query)
+
+        rows = await fetch_all(query + " LIMIT %s", (*params, limit + 1))
+        total = await fetch_scalar("SELECT COUNT(*) FROM users") if with_total else None
+        return build_page(rows, limit, total=total)
     except Exception as e:
         print("❌ Error fetching users:", e)
-        return []
-    finally:
-        conn.close()
+        return build_page([], limit) if paged else []
 
 
 async def get_user_by_id(user_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
-        user = await cursor.fetchone()
-    conn.close()
+    user = await fetch_one("SELECT * FROM users WHERE id = %s", (user_id,))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
+def _hasher_busy():
+    # The bcrypt executor is saturated (login storm); ask the client to come back
+    return HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
 async def create_user(data: dict):
     now = datetime.datetime.now()
-    hashed_pw = hash_password(data['password'])
+    try:
+        hashed_pw = await hash_password_async(data['password'])
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     sql = """
         INSERT INTO users (username, password, email, role_id, status, created_at, updated_at)
         VALUES (%s, %s, %s, %s, %s, %s, %s)
     """
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        await cursor.execute(sql, (
-            data['username'],
-            hashed_pw,
-            data['email'],
-            data.get('role_id'),
-            data.get('status', 1),
-            now,
-            now
-        ))
-        await conn.commit()
-        new_id = cursor.lastrowid
-    conn.close()
-    return {"id": new_id}
+    result = await execute(sql, (
+        data['username'],
+        hashed_pw,
+        data['email'],
+        data.get('role_id'),
+        data.get('status', 1),
+        now,
+        now
+    ))
+    return {"id": result.lastrowid}
 
 async def authenticate_user(email: str, password: str):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
-        user = await cursor.fetchone()
-    conn.close()
+    user = await fetch_one("SELECT * FROM users WHERE email = %s", (email,))
 
-    if not user or not verify_password(password, user['password']):
+    try:
+        valid = bool(user) and await verify_password_async(password, user['password'])
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     return user
 
@@ -87,27 +93,29 @@ async def update_user(user_id: int, data: dict):
         SET username=%s, email=%s, role_id=%s, status=%s, updated_at=%s
         WHERE id = %s
     """
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        await cursor.execute(sql, (
+    async with transaction() as conn:
+        before = await fetch_one("SELECT role_id, status FROM users WHERE id = %s FOR UPDATE", (user_id,), conn=conn)
+        await execute(sql, (
             data['username'],
             data.get('email'),
             data.get('role_id'),
             data.get('status', 1),
             now,
             user_id
-        ))
-        await conn.commit()
-    conn.close()
+        ), conn=conn)
+        # A new role or status changes what the user's tokens grant
+        version = None
+        if before and (before["role_id"], before["status"]) != (data.get('role_id'), data.get('status', 1)):
+            version = await bump_permission_version(user_id, conn=conn)
+    permission_version_changed(version)
     return {"message": "User updated successfully"}
 
 async def delete_user(user_id: int):
     sql = "UPDATE users SET status = 0 WHERE id = %s"
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        await cursor.execute(sql, (user_id,))
-        await conn.commit()
-    conn.close()
+    async with transaction() as conn:
+        await execute(sql, (user_id,), conn=conn)
+        version = await bump_permission_version(user_id, conn=conn)
+    permission_version_changed(version)  # their tokens stop working now, not at expiry
     return {"message": "User deactivated (status=0)"}
 
 # ===============================
@@ -121,12 +129,8 @@ async def get_permissions_for_role(role_id: int):
         JOIN role_permissions rp ON p.id = rp.permission_id
         WHERE rp.role_id = %s
     """
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        await cursor.execute(sql, (role_id,))
-        perms = [row[0] for row in await cursor.fetchall()]
-    conn.close()
-    return perms
+    rows = await fetch_all(sql, (role_id,))
+    return [row["name"] for row in rows]
 
 async def get_user_from_db(email: str):
     sql = """
@@ -135,12 +139,56 @@ async def get_user_from_db(email: str):
         JOIN role r ON u.role_id = r.id
         WHERE u.email = %s
     """
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute(sql, (email,))
-        user = await cursor.fetchone()
-    conn.close()
-    return user
+    return await fetch_one(sql, (email,))
+
+# Login: the user row, its direct grants and its permission version in one round
+# trip; role grants come from the in-process role -> permissions map
+# (utils/permissions.py). Deactivated users (status 0) are not found, so
+# delete_user's version bump is not undone by logging in again. Tables from
+# migrations that were not applied yet are left out of the query after the
+# first errno 1146.
+_login_optional_tables = {"user_permission": True, "user_permission_version": True}
+
+
+def _login_sql() -> str:
+    direct = """(SELECT JSON_ARRAYAGG(up.permission_id)
+              FROM user_permission up
+             WHERE up.user_id = u.id)""" if _login_optional_tables["user_permission"] else "NULL"
+    with_version = _login_optional_tables["user_permission_version"]
+    return f"""
+    SELECT u.id, u.email, u.password, u.role_id, r.name AS role,
+           {direct} AS direct_permission_ids,
+           {"COALESCE(upv.version, 0)" if with_version else "0"} AS permission_version
+    FROM users u
+    JOIN role r ON u.role_id = r.id
+    {"LEFT JOIN user_permission_version upv ON upv.user_id = u.id" if with_version else ""}
+    WHERE u.email = %s AND u.status = 1
+"""
+
+
+async def get_login_user(email: str):
+    while True:
+        try:
+            return await fetch_one(_login_sql(), (email,))
+        except pymysql.err.ProgrammingError as e:
+            errno, message = (list(e.args) + [None, ""])[:2]
+            # "Table 'db.user_permission' doesn't exist"
+            missing = [t for t, present in _login_optional_tables.items()
+                       if present and errno == 1146 and f".{t}'" in str(message)]
+            if not missing:
+                raise
+            for table in missing:
+                _login_optional_tables[table] = False
+
+
+async def get_login_permission_ids(user) -> set:
+    """Role grants (cached map) plus the direct grants fetched by get_login_user."""
+    ids = set(await role_permission_ids(user["role_id"]))
+    direct = user.get("direct_permission_ids")
+    if direct:
+        # A JSON array, not GROUP_CONCAT: that one is cut at group_concat_max_len without an error
+        ids.update(json.loads(direct))
+    return ids
 
 async def get_user_permissions(user_id):
     sql_role = """
@@ -156,19 +204,14 @@ async def get_user_permissions(user_id):
         JOIN user_permission up ON up.permission_id = p.id
         WHERE up.user_id = %s
     """
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
+    async with db_connection() as conn:
         try:
-            await cursor.execute(sql_role, (user_id,))
-            role_permissions = [row['permission'] for row in await cursor.fetchall()]
-
-            await cursor.execute(sql_user, (user_id,))
-            user_permissions = [row['permission'] for row in await cursor.fetchall()]
+            role_permissions = [row['permission'] for row in await fetch_all(sql_role, (user_id,), conn=conn)]
+            user_permissions = [row['permission'] for row in await fetch_all(sql_user, (user_id,), conn=conn)]
         except pymysql.err.ProgrammingError as e:
             # If table doesn't exist (errno 1146), return empty permissions instead of crashing
             if getattr(e, "args", [None])[0] == 1146:
                 return []
             raise
 
-    conn.close()
     return list(set(role_permissions + user_permissions))
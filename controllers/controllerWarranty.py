@@ -1,46 +1,34 @@
 import datetime
-from db import get_db_connection
-import aiomysql
+from db import db_connection
+from utils.query_executor import fetch_one, fetch_all, execute
+from utils.response_cache import invalidate
 
 # ===============================
 # Get all warranties (admin)
 # ===============================
 async def get_all_warranties():
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM warranty")
-        rows = await cursor.fetchall()
-    conn.close()
-    return rows
+    return await fetch_all("SELECT * FROM warranty")
 
 # ===============================
 # Get warranty by ID
 # ===============================
 async def get_warranty_by_id(warranty_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM warranty WHERE id = %s", (warranty_id,))
-        row = await cursor.fetchone()
-    conn.close()
-    return row
+    return await fetch_one("SELECT * FROM warranty WHERE id = %s", (warranty_id,))
 
 # ===============================
 # Update warranty
 # ===============================
 async def update_warranty(warranty_id: int, data: dict):
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
+    async with db_connection() as conn:
         # Check if warranty exists
-        await cursor.execute("SELECT created_at FROM warranty WHERE id = %s", (warranty_id,))
-        row = await cursor.fetchone()
+        row = await fetch_one("SELECT created_at FROM warranty WHERE id = %s", (warranty_id,), conn=conn)
         if not row:
-            conn.close()
             return {"error": "Warranty not found"}
 
         created_at = row["created_at"]
         updated_at = datetime.datetime.now()
 
-        await cursor.execute("""
+        await execute("""
             UPDATE warranty SET
                 title = %s,
                 descriptions = %s,
@@ -61,29 +49,20 @@ async def update_warranty(warranty_id: int, data: dict):
             created_at,
             updated_at,
             warranty_id
-        ))
-        await conn.commit()
-    conn.close()
+        ), conn=conn)
+    invalidate("warranty")
     return {"id": warranty_id, "updated_at": updated_at, **data}
 
 # ===============================
 # Soft delete warranty
 # ===============================
 async def delete_warranty(warranty_id: int):
-    conn = await get_db_connection()
-    async with conn.cursor() as cursor:
-        await cursor.execute("UPDATE warranty SET status = 0 WHERE id = %s", (warranty_id,))
-        await conn.commit()
-    conn.close()
+    await execute("UPDATE warranty SET status = 0 WHERE id = %s", (warranty_id,))
+    invalidate("warranty")
     return {"message": f"Warranty {warranty_id} soft-deleted"}
 
 # ===============================
 # Get all warranties (public)
 # ===============================
 async def get_all_warranties_public():
-    conn = await get_db_connection()
-    async with conn.cursor(aiomysql.DictCursor) as cursor:
-        await cursor.execute("SELECT * FROM warranty WHERE status = 1")
-        rows = await cursor.fetchall()
-    conn.close()
-    return rows
+    return await fetch_all("SELECT * FROM warranty WHERE status = 1")
@@ -2,42 +2,112 @@ import aioftp
 import ssl
 import os
 
+from utils.ftp_pool import FTPPool
+from utils.storage import UploadTooLarge, UPLOAD_CHUNK_SIZE, UPLOAD_MAX_BYTES
+
 
 FTP_HOST = os.getenv("CPANEL_FTP_HOST")
 FTP_USER = os.getenv("CPANEL_FTP_USER")
 FTP_PASS = os.getenv("CPANEL_FTP_PASSWORD")
 FTP_UPLOAD_DIR = os.getenv("CPANEL_FTP_UPLOAD_DIR", "/public_html/uploads").rstrip("/")
 
+# Warm, logged-in sessions per worker (see utils/ftp_pool.py)
+FTP_POOL_SIZE = int(os.getenv("FTP_POOL_SIZE", 4))
+FTP_POOL_IDLE_TIMEOUT = float(os.getenv("FTP_POOL_IDLE_TIMEOUT", 60))
+
 
 if not all([FTP_HOST, FTP_USER, FTP_PASS]):
     raise EnvironmentError("Missing one or more required FTP environment variables: "
                            "CPANEL_FTP_HOST, CPANEL_FTP_USER, CPANEL_FTP_PASSWORD")
 
+# For plain FTP (no SSL)
+ftp_pool = FTPPool(
+    FTP_HOST,
+    FTP_USER,
+    FTP_PASS,
+    size=FTP_POOL_SIZE,
+    idle_timeout=FTP_POOL_IDLE_TIMEOUT,
+    socket_timeout=30
+)
+
+
+class _BytesReader:
+    # Lets upload_to_ftp() reuse the streaming path for an in-memory payload
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        end = len(self.data) if size < 0 else self.offset + size
+        chunk = bytes(self.data[self.offset:end])
+        self.offset += len(chunk)
+        return chunk
+
+
+async def stream_to_ftp(file, filename: str, max_bytes: int = UPLOAD_MAX_BYTES) -> int:
+    """
+    Copy `file` (anything with `async read(n)`, e.g. an UploadFile) to FTP in
+    UPLOAD_CHUNK_SIZE pieces. Returns the bytes written; 0 means the file was
+    empty and nothing was uploaded. Raises UploadTooLarge past `max_bytes`
+    (the partial remote file is removed) and re-raises FTP errors.
+    """
+    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+    if not chunk:
+        return 0
+
+    remote_path = f"{FTP_UPLOAD_DIR}/{filename}"
+    written = 0
+    too_large = False
 
-async def upload_to_ftp(file_bytes: bytes, filename: str) -> bool:
     try:
-        # For plain FTP (no SSL)
-        async with aioftp.Client.context(
-            host=FTP_HOST,
-            user=FTP_USER,
-            password=FTP_PASS,
-            ssl=None,  # disable SSL/TLS
-            socket_timeout=30
-        ) as client:
-
-            try:
-                await client.make_directory(FTP_UPLOAD_DIR)
-            except aioftp.StatusCodeError as e:
-                if not e.received_codes or "550" not in e.received_codes:
-                    raise
-
-            remote_path = f"{FTP_UPLOAD_DIR}/{filename}"
+        async with ftp_pool.session() as client:
+            await ftp_pool.ensure_directory(client, FTP_UPLOAD_DIR)
+
             async with client.upload_stream(remote_path) as stream:
-                await stream.write(file_bytes)
+                while chunk:
+                    written += len(chunk)
+                    if written > max_bytes:
+                        too_large = True
+                        break
+                    await stream.write(chunk)
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
 
-        return True
+            # The stream was closed cleanly above, so the control connection is free for DELE
+            if too_large:
+                try:
+                    await client.remove_file(remote_path)
+                except aioftp.StatusCodeError as e:
+                    print(f"⚠️ Could not remove partial upload {remote_path}: {e}")
 
     except Exception as e:
         print(f"FTP Upload Error: {e}")
+        # The directory may have been removed behind our back; check it again next time
+        ftp_pool.forget_directory(FTP_UPLOAD_DIR)
+        raise
+
+    if too_large:
+        raise UploadTooLarge(max_bytes)
+    return written
+
+
+async def upload_to_ftp(file_bytes: bytes, filename: str) -> bool:
+    try:
+        return await stream_to_ftp(_BytesReader(file_bytes), filename, max_bytes=len(file_bytes)) > 0
+    except Exception:
         return False
 
+
+async def delete_from_ftp(filename: str):
+    remote_path = f"{FTP_UPLOAD_DIR}/{filename}"
+    async with ftp_pool.session() as client:
+        if await client.exists(remote_path):
+            await client.remove_file(remote_path)
+
+
+async def exists_on_ftp(filename: str) -> bool:
+    async with ftp_pool.session() as client:
+        return await client.exists(f"{FTP_UPLOAD_DIR}/{filename}")
+
+
+async def close_ftp_pool():
+    await ftp_pool.close()
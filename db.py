@@ -1,5 +1,7 @@
+import asyncio
 import aiomysql
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import HTTPException
 
@@ -7,6 +9,13 @@ load_dotenv()
 
 pool = None
 
+# Pool sizing is per gunicorn worker: total MySQL connections = workers × DB_POOL_MAX_SIZE
+DB_POOL_MIN_SIZE = max(int(os.getenv("DB_POOL_MIN_SIZE", 2)), 0)
+DB_POOL_MAX_SIZE = max(int(os.getenv("DB_POOL_MAX_SIZE", 10)), DB_POOL_MIN_SIZE, 1)
+DB_ACQUIRE_TIMEOUT = float(os.getenv("DB_ACQUIRE_TIMEOUT", 10))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 3600))
+
+
 # ✅ Initialize MySQL connection pool
 async def init_db_pool():
     global pool
@@ -14,6 +23,7 @@ async def init_db_pool():
         return  # already connected
 
     try:
+        # minsize connections are opened here, so the pool is warm before the first request
         pool = await aiomysql.create_pool(
             host=os.getenv("DB_HOST"),
             user=os.getenv("DB_USER"),
@@ -21,17 +31,28 @@ async def init_db_pool():
             db=os.getenv("DB_NAME"),
             port=int(os.getenv("DB_PORT", 3306)),
             autocommit=True,
-            maxsize=5000000,         
-            # maxsize=50,         
+            minsize=DB_POOL_MIN_SIZE,
+            maxsize=DB_POOL_MAX_SIZE,
+            pool_recycle=DB_POOL_RECYCLE,
             charset="utf8mb4"
         )
-        print("✅ MySQL connection pool created successfully")
+        print(f"✅ MySQL connection pool created successfully "
+              f"(min={DB_POOL_MIN_SIZE}, max={DB_POOL_MAX_SIZE})")
 
     except Exception as e:
         print("❌ Error creating MySQL pool:", e)
         raise HTTPException(status_code=500, detail=f"Database pool error: {e}")
 
 
+# ✅ Close pool on shutdown
+async def close_db_pool():
+    global pool
+    if pool is not None and not pool._closed:
+        pool.close()
+        await pool.wait_closed()
+    pool = None
+
+
 # ✅ Get DB connection safely
 async def get_db_connection():
     global pool
@@ -39,8 +60,10 @@ async def get_db_connection():
         await init_db_pool()
 
     try:
-        conn = await pool.acquire()
-        return conn
+        return await asyncio.wait_for(pool.acquire(), timeout=DB_ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"❌ Timed out after {DB_ACQUIRE_TIMEOUT}s waiting for a DB connection")
+        raise HTTPException(status_code=503, detail="Database busy, please retry")
     except Exception as e:
         print("❌ Error acquiring connection:", e)
         raise HTTPException(status_code=500, detail=f"Database connection error: {e}")
@@ -51,3 +74,32 @@ async def release_db_connection(conn):
     global pool
     if pool and conn:
         pool.release(conn)
+
+
+# ✅ Leased connection: always handed back to the pool, even on errors
+@asynccontextmanager
+async def db_connection():
+    conn = await get_db_connection()
+    try:
+        yield conn
+    finally:
+        await release_db_connection(conn)
+
+
+# ✅ FastAPI dependency version of db_connection()
+async def get_db():
+    async with db_connection() as conn:
+        yield conn
+
+
+# ✅ Leased connection inside one transaction: COMMIT on success, ROLLBACK on any error
+@asynccontextmanager
+async def transaction():
+    async with db_connection() as conn:
+        await conn.begin()
+        try:
+            yield conn
+        except BaseException:
+            await conn.rollback()
+            raise
+        await conn.commit()
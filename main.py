@@ -4,7 +4,17 @@ from fastapi.staticfiles import StaticFiles
 import warnings
 
 # ✅ Add this import for DB pool
-from db import init_db_pool, pool
+from db import init_db_pool, close_db_pool
+from utils.invalidation_bus import start_invalidation_bus, stop_invalidation_bus
+from utils.json_response import FastJSONResponse
+from utils.compression import CompressionMiddleware
+from utils.storage import get_storage, close_storage, MEDIA_STORAGE
+from utils.upload_jobs import start_upload_workers, stop_upload_workers
+from utils.image_variants import shutdown_image_pool
+from security import password_executor
+from utils.permissions import load_permission_registry
+from utils.token_revocation import start_token_revocation, stop_token_revocation
+from auth_dependencies import compile_route_permissions
 
 # Router imports
 from routers import (
@@ -28,10 +38,11 @@ from routers import (
     routerPermission,
     routerRolePermission,
     routerSpicification,
-    routerContactUs
+    routerContactUs,
+    routerMedia
 )
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)  # orjson instead of stdlib json
 
 origins = [
     "http://localhost:5173",
@@ -52,6 +63,9 @@ app.add_middleware(
     allow_headers=["*"],          # Allow all headers
 )
 
+# ✅ gzip / brotli for JSON responses above COMPRESSION_MIN_SIZE (cached ones come precompressed)
+app.add_middleware(CompressionMiddleware)
+
 # Inject fallback for missing product controller function to avoid AttributeError at runtime
 try:
     import controllers.controllerProduct as controllerProduct
@@ -70,15 +84,24 @@ except Exception:
 async def startup_event():
     await init_db_pool()  # initialize only one pool
     print("✅ Database pool initialized")
+    await start_invalidation_bus()  # cache invalidations from the other gunicorn workers
+    print(f"🔑 Permission registry: {await load_permission_registry()} permissions")
+    print(f"🔒 {len(compile_route_permissions(app))} routes require a permission")
+    await start_token_revocation()  # permission versions + revoked token ids, kept in memory
+    get_storage()  # fail at boot, not on the first upload, when MEDIA_STORAGE is misconfigured
+    await start_upload_workers()  # background gallery uploads (?background=true)
 
 # ✅ Close DB Pool on Shutdown
 @app.on_event("shutdown")
 async def shutdown_event():
-    global pool
-    if pool:
-        pool.close()
-        await pool.wait_closed()
-        print("🧹 Database pool closed cleanly")
+    await stop_invalidation_bus()
+    await stop_token_revocation()
+    await stop_upload_workers()
+    shutdown_image_pool()
+    password_executor.shutdown()
+    await close_storage()
+    await close_db_pool()
+    print("🧹 Database pool closed cleanly")
 
 # Include routers
 app.include_router(routerUsers.router)
@@ -103,7 +126,9 @@ app.include_router(routerRolePermission.router)
 app.include_router(routerSpicification.router)
 app.include_router(routerGallery.router)
 app.include_router(routerContactUs.router)
-# app.mount("/api/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Single-host deployments keep uploads on local disk and serve them from here
+if MEDIA_STORAGE == "local":
+    app.include_router(routerMedia.router)
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 # Include your gallery API router
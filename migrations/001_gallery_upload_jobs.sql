@@ -0,0 +1,12 @@
+-- Background gallery uploads (utils/upload_jobs.py, POST /api/gallery/create?background=true)
+--
+-- gallery.status: 0 deleted, 1 active, 2 upload pending, 3 upload failed.
+-- Public queries already filter on status = 1, so pending / failed rows stay hidden.
+
+ALTER TABLE gallery
+    ADD COLUMN spool_path      VARCHAR(512) NULL,
+    ADD COLUMN upload_size     BIGINT       NULL,
+    ADD COLUMN upload_sent     BIGINT       NULL,
+    ADD COLUMN upload_attempts INT          NOT NULL DEFAULT 0,
+    ADD COLUMN upload_error    VARCHAR(255) NULL,
+    ADD INDEX idx_gallery_status_updated (status, updated_at);
@@ -0,0 +1,14 @@
+-- Resized / re-encoded copies of gallery images (utils/gallery_variants.py)
+--
+-- One row per width × format; `path` is relative to CPANEL_BASE_URL like gallery.path.
+
+CREATE TABLE gallery_variant (
+    id          INT PRIMARY KEY AUTO_INCREMENT,
+    gallery_id  INT          NOT NULL,
+    width       INT          NOT NULL,
+    height      INT          NOT NULL,
+    format      VARCHAR(10)  NOT NULL,
+    path        VARCHAR(255) NOT NULL,
+    created_at  DATETIME     NOT NULL,
+    KEY idx_gallery_variant_gallery (gallery_id)
+);
@@ -0,0 +1,8 @@
+-- Content-addressed gallery uploads (utils/content_hash.py)
+--
+-- sha256 of the uploaded bytes. Rows sharing a hash point at the same stored
+-- file; rows from before this migration stay NULL and are never deduplicated.
+
+ALTER TABLE gallery
+    ADD COLUMN content_hash CHAR(64) NULL AFTER path,
+    ADD KEY idx_gallery_content_hash (content_hash);
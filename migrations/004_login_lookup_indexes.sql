@@ -0,0 +1,12 @@
+-- Single-query login (controllers/controllerUsers.get_login_user)
+--
+-- Login looks the user up by email and reads that user's direct grants in a
+-- correlated subquery; both need an index to stay a single indexed lookup.
+-- Skip a statement if the schema already has an equivalent key (e.g. a
+-- UNIQUE on users.email or a (user_id, permission_id) primary key).
+
+ALTER TABLE users
+    ADD INDEX idx_users_email (email);
+
+ALTER TABLE user_permission
+    ADD INDEX idx_user_permission_user (user_id, permission_id);
@@ -0,0 +1,24 @@
+-- Token revocation without a query per request (utils/token_revocation.py)
+--
+-- user_permission_version: bumped whenever a user's grants change; tokens carry
+-- the version they were issued with ("pv") and older ones are rejected. Workers
+-- re-read only rows whose updated_at moved, hence the index.
+--
+-- revoked_token: token ids ("jti") revoked by logout, kept until the token
+-- would have expired anyway.
+
+CREATE TABLE IF NOT EXISTS user_permission_version (
+    user_id    INT          NOT NULL PRIMARY KEY,
+    version    INT          NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    KEY idx_user_permission_version_updated (updated_at)
+);
+
+CREATE TABLE IF NOT EXISTS revoked_token (
+    jti        CHAR(32)     NOT NULL PRIMARY KEY,
+    user_id    INT          NULL,
+    expires_at DATETIME     NOT NULL,
+    revoked_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    KEY idx_revoked_token_revoked (revoked_at),
+    KEY idx_revoked_token_expires (expires_at)
+);
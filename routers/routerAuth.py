@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from utils.jwt_handler import create_access_token
-from controllers.controllerUsers import get_user_from_db, get_user_permissions
-from security import pwd_context
+from controllers.controllerUsers import get_login_user, get_login_permission_ids
+from security import verify_password_async, PasswordHasherBusy, password_hasher_stats
+from utils.jwt_handler import get_current_user, token_cache_stats, invalidate_token_cache, oauth2_scheme
+from utils.permissions import ensure_ids_registered, encode_permission_ids, permission_names
+from auth_dependencies import ROUTE_PERMISSIONS, MONITORING_PERMISSION, auth_overhead_stats, require_permission
+from utils.token_revocation import revoke_token, token_revocation_stats
+from utils.rate_limit import login_retry_after, login_throttle_stats
 
 router = APIRouter(prefix="/api/auth", tags=["Auth"])
 
@@ -12,22 +18,41 @@ class LoginRequest(BaseModel):
 
 
 @router.post("/login")
-async def login(request: LoginRequest):
-    # ✅ Await async database function
-    user = await get_user_from_db(request.email)
+async def login(request: LoginRequest, http_request: Request):
+    # Per-IP and per-email token buckets, checked before any query or bcrypt work
+    retry_after = login_retry_after(http_request.client.host if http_request.client else None, request.email)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts, please retry later",
+            headers={"Retry-After": str(retry_after)},
+        )
 
-    if not user or not pwd_context.verify(request.password, user["password"]):
+    # ✅ One indexed lookup: user row plus direct grants
+    user = await get_login_user(request.email)
+
+    # bcrypt runs on the password executor, so other requests keep being served meanwhile
+    try:
+        valid = bool(user) and await verify_password_async(request.password, user["password"])
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    # ✅ Await async function to fetch permissions
-    permissions = await get_user_permissions(user["id"])
+    # ✅ Role grants come from the in-process role map, no extra query
+    permission_ids = await get_login_permission_ids(user)
+    await ensure_ids_registered(permission_ids)
+    permissions = permission_names(permission_ids)
 
-    # ✅ Create JWT token
+    # ✅ Create JWT token; grants go in as a bitmask (utils/permissions.py), the body keeps the names
     access_token = create_access_token({
         "sub": user["email"],
         "role": user["role"],
         "user_id": user["id"],
-        "permissions": permissions
+        "perms": encode_permission_ids(permission_ids),
+        "pv": user["permission_version"],  # read with the grants, see utils/token_revocation.py
+        "jti": uuid.uuid4().hex      # token id, so logout can revoke this one token
     })
 
     return {
@@ -36,3 +61,41 @@ async def login(request: LoginRequest):
         "user_id": user["id"],
         "permissions": permissions
     }
+
+
+@router.post("/logout")
+async def logout(user=Depends(get_current_user), token: str = Depends(oauth2_scheme)):
+    # Rejected by every worker from now on, not only when it expires
+    revoked = await revoke_token(user)
+    invalidate_token_cache(token=token)
+    return {"message": "Logged out", "revoked": revoked}
+
+
+@router.get("/login-throttle/stats")
+async def login_throttle_metrics(user=Depends(require_permission(MONITORING_PERMISSION))):
+    # Allowed / limited login attempts and tracked keys per bucket type (this worker)
+    return login_throttle_stats()
+
+
+@router.get("/password-hasher/stats")
+async def password_hasher_metrics(user=Depends(require_permission(MONITORING_PERMISSION))):
+    # Queue depth / wait times of this worker's bcrypt executor
+    return password_hasher_stats()
+
+
+@router.get("/token-cache/stats")
+async def token_cache_metrics(user=Depends(require_permission(MONITORING_PERMISSION))):
+    # Hits skip HMAC verification and JSON parsing of the bearer token
+    return token_cache_stats()
+
+
+@router.get("/overhead/stats")
+async def auth_overhead_metrics(user=Depends(require_permission(MONITORING_PERMISSION))):
+    # Route → required permission, and time spent in require_permission per route (this worker)
+    return {"routes": ROUTE_PERMISSIONS, "overhead": auth_overhead_stats()}
+
+
+@router.get("/revocation/stats")
+async def token_revocation_metrics(user=Depends(require_permission(MONITORING_PERMISSION))):
+    # Stale / revoked rejections and the revoked-id Bloom filter of this worker
+    return token_revocation_stats()
@@ -1,23 +1,10 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, status
-from utils.jwt_handler import get_current_user
+from auth_dependencies import require_permission
 import controllers.controllerBanner as controllerBanner
+from utils.response_cache import cached_public
 
 router = APIRouter(prefix="/api/banners", tags=["Banners"])
 
-# -----------------------------
-# Permission dependency
-# -----------------------------
-def require_permission(permission: str):
-    def permission_checker(user=Depends(get_current_user)):
-        permissions = user.get("permissions", [])
-        if permission not in permissions:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Missing permission: {permission}",
-            )
-        return user
-    return permission_checker
-
 
 # -----------------------------
 # ADMIN ROUTES (Protected)
@@ -64,10 +51,12 @@ async def set_banner_type(banner_id: int, request: Request):
 # PUBLIC ROUTES (No auth)
 # -----------------------------
 @router.get("/all/public")
+@cached_public("banner", "gallery")
 async def get_all_public():
     return await controllerBanner.get_all_banners_public()
 
 
 @router.get("/all/public/{banner_type}")
+@cached_public("banner", "gallery")
 async def get_public_by_type(banner_type: int):
     return await controllerBanner.get_banner_by_type(banner_type)
@@ -1,19 +1,10 @@
 from fastapi import APIRouter, Depends, Request, HTTPException
 from controllers import controllerCategories
-from utils.jwt_handler import get_current_user
+from auth_dependencies import require_permission
+from utils.response_cache import cached_public
 
 router = APIRouter(prefix="/api/categories", tags=["Categories"])
 
-# -------------------------
-# 🔒 Permission dependency
-# -------------------------
-def require_permission(permission: str):
-    def permission_checker(user=Depends(get_current_user)):
-        if "permissions" not in user or permission not in user["permissions"]:
-            raise HTTPException(status_code=403, detail="Forbidden")
-        return user
-    return permission_checker
-
 
 # -------------------------
 # 📦 Admin Category Routes
@@ -57,5 +48,6 @@ async def delete(category_id: int, user=Depends(require_permission("Delete Categ
 # 🌍 Public Category Route
 # -------------------------
 @router.get("/all/public")
+@cached_public("category")
 async def get_all_public():
     return await controllerCategories.get_all_categories_public()
@@ -1,19 +1,10 @@
 from fastapi import APIRouter, Request, Depends, HTTPException
 import controllers.controllerChooseUs as controller
-from utils.jwt_handler import get_current_user
+from auth_dependencies import require_permission
+from utils.response_cache import cached_public
 
 router = APIRouter(prefix="/api/choose-us", tags=["Choose Us"])
 
-# ----------------------------------------
-# Permission middleware
-# ----------------------------------------
-def require_permission(permission: str):
-    def permission_checker(user=Depends(get_current_user)):
-        if permission not in user["permissions"]:
-            raise HTTPException(status_code=403, detail="Forbidden")
-        return user
-    return permission_checker
-
 # ----------------------------------------
 # Admin Routes
 # ----------------------------------------
@@ -43,10 +34,12 @@ async def delete(choose_id: int, user=Depends(require_permission("Delete choose
 # Public Routes
 # ----------------------------------------
 @router.get("/all/public")
+@cached_public("choose_us")
 async def get_all_public():
     return await controller.get_all_choose_us_public()
 
 @router.get("/all/public/{choose_id}")
+@cached_public("choose_us")
 async def get_by_id_public(choose_id: int):
     return await controller.get_choose_us_by_id_public(choose_id)
 
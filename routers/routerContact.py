@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Request
 import controllers.controllerContact as controller
+from utils.response_cache import cached_public
 
 router = APIRouter(prefix="/api/contacts", tags=["Contact Us"])
 
@@ -7,8 +8,8 @@ router = APIRouter(prefix="/api/contacts", tags=["Contact Us"])
 # Admin Routes
 # ----------------------------------------
 @router.get("/")
-async def get_all():
-    return await controller.get_all_contacts()
+async def get_all(cursor: str = None, limit: int = None, with_total: bool = False):
+    return await controller.get_all_contacts(cursor, limit, with_total)
 
 @router.get("/{contact_id}")
 async def get_by_id(contact_id: int):
@@ -32,6 +33,7 @@ async def delete(contact_id: int):
 # Public Route (Optional)
 # ----------------------------------------
 @router.get("/all/public")
+@cached_public("contact_us")
 async def get_all_public():
     """Return all contacts (for public site display)."""
     return await controller.get_all_contacts()
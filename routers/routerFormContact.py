@@ -4,8 +4,8 @@ import controllers.controllerFormContact as controller
 router = APIRouter(prefix="/form-contacts", tags=["Form Contact"])
 
 @router.get("/")
-async def get_all():
-    return await controller.get_all_form_contacts()
+async def get_all(cursor: str = None, limit: int = None, with_total: bool = False):
+    return await controller.get_all_form_contacts(cursor, limit, with_total)
 
 @router.get("/{contact_id}")
 async def get_by_id(contact_id: int):
@@ -1,7 +1,11 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
-from typing import Optional
+from typing import List, Optional
+from utils.json_response import fast_json
 from controllers.controllerGallery import (
     create_gallery,
+    create_gallery_batch,
+    create_gallery_job,
+    get_gallery_job,
     get_all_gallery,
     get_gallery_by_id,
     update_gallery,
@@ -16,7 +20,12 @@ async def create(
     file: UploadFile = File(...),
     user_id: int = Form(...),
     image_id: Optional[int] = Form(None),
+    background: bool = False,
 ):
+    if background:
+        # 202 + job id right after spooling; poll GET /jobs/{job_id}
+        return await create_gallery_job(file, user_id, image_id)
+
     result = await create_gallery(file, user_id, image_id)
     # If create_gallery returns JSONResponse on error, handle here:
     if isinstance(result, dict) and "error" in result:
@@ -24,10 +33,31 @@ async def create(
     return result
 
 
+@router.post("/create/batch", status_code=status.HTTP_201_CREATED)
+async def create_batch(
+    files: List[UploadFile] = File(...),
+    user_id: int = Form(...),
+    image_id: Optional[int] = Form(None),
+):
+    # Per-file results; files that failed are listed with their error, the rest are inserted
+    return await create_gallery_batch(files, user_id, image_id)
+
+
 @router.get("/", status_code=status.HTTP_200_OK)
-async def get_all():
-    rows = await get_all_gallery()
-    return {"gallery": rows}
+async def get_all(cursor: Optional[str] = None, limit: Optional[int] = None, with_total: bool = False):
+    result = await get_all_gallery(cursor, limit, with_total)
+    if isinstance(result, dict):
+        # Paged: keep the "gallery" key, plus next_cursor / limit / total
+        return fast_json({"gallery": result.pop("items"), **result})
+    return fast_json({"gallery": result})
+
+
+@router.get("/jobs/{job_id}", status_code=status.HTTP_200_OK)
+async def get_job(job_id: int):
+    job = await get_gallery_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return job
 
 
 @router.get("/{gallery_id}", status_code=status.HTTP_200_OK)
@@ -1,24 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from utils.jwt_handler import get_current_user
+from auth_dependencies import require_permission
 import controllers.controllerIndustryDev as controller
+from utils.response_cache import cached_public
 
 router = APIRouter(prefix="/api/industry", tags=["Industry Development"])
 
-# ----------------------------
-# Permission checker
-# ----------------------------
-def require_permission(permission: str):
-    def permission_checker(user=Depends(get_current_user)):
-        permissions = user.get("permissions", [])
-        if permission not in permissions:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Missing permission: {permission}"
-            )
-        return user
-    return permission_checker
-
-
 # ----------------------------
 # Admin routes (Protected)
 # ----------------------------
@@ -52,5 +38,6 @@ async def delete(industry_id: int):
 # Public routes
 # ----------------------------
 @router.get("/all/public")
+@cached_public("industry_development")
 async def get_all_public():
     return await controller.get_all_industries_public()
@@ -0,0 +1,29 @@
+import asyncio
+import os
+import stat
+
+from fastapi import APIRouter, HTTPException, Request
+
+from utils.storage import get_storage, MEDIA_URL_PREFIX
+from utils.media_response import MediaFileResponse, MEDIA_ACCEL_REDIRECT, accel_redirect_response
+
+router = APIRouter(prefix=MEDIA_URL_PREFIX, tags=["Media"])
+
+
+@router.api_route("/{name:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_media(name: str, request: Request):
+    storage = get_storage()
+    if storage.kind != "local":
+        raise HTTPException(status_code=404, detail="Not found")
+
+    try:
+        path = storage.path(name)
+        stat_result = await asyncio.to_thread(os.stat, path)
+    except (ValueError, FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="Not found")
+    if not stat.S_ISREG(stat_result.st_mode) or path.endswith(".part"):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    if MEDIA_ACCEL_REDIRECT:
+        return accel_redirect_response(name, stat_result)
+    return MediaFileResponse(path, stat_result, request.headers, request.method)
@@ -1,19 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from controllers import controllerMission
-from utils.jwt_handler import get_current_user
+from auth_dependencies import require_permission
+from utils.response_cache import cached_public
 
 router = APIRouter(prefix="/api/missions", tags=["Mission"])
 
 
-# ✅ Permission dependency
-def require_permission(permission: str):
-    def permission_checker(user=Depends(get_current_user)):
-        if permission not in user.get("permissions", []):
-            raise HTTPException(status_code=403, detail="Forbidden")
-        return user
-    return permission_checker
-
-
 # ✅ Use await for all async controller calls
 @router.get("/")
 async def get_all(user=Depends(require_permission("Read Missions"))):
@@ -43,5 +35,6 @@ async def delete(mission_id: int, user=Depends(require_permission("Delete Missio
 
 
 @router.get("/all/public")
+@cached_public("mission")
 async def get_all_public():
     return await controllerMission.get_all_missions_public()
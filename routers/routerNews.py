@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Request
 import controllers.controllerNews as controllerNews
+from utils.json_response import fast_json
 
 router = APIRouter(prefix="/api/news", tags=["News"])
 
 @router.get("/")
-async def get_all():
-    return await controllerNews.get_all_news()
+async def get_all(cursor: str = None, limit: int = None, with_total: bool = False):
+    return fast_json(await controllerNews.get_all_news(cursor, limit, with_total))
 
 @router.get("/{news_id}")
 async def get_by_id(news_id: int):
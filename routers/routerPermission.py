@@ -1,15 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from controllers import controllerPermission
-from utils.jwt_handler import get_current_user
+from auth_dependencies import require_permission
 
 router = APIRouter(prefix="/api/permissions", tags=["permissions"])
 
-def require_permission(permission: str):
-    def permission_checker(user=Depends(get_current_user)):
-        if permission not in user["permissions"]:
-            raise HTTPException(status_code=403, detail="Forbidden")
-        return user
-    return permission_checker
 
 @router.get("/")
 async def get_all(user=Depends(require_permission("Read Permissions"))):
@@ -1,23 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from controllers import controllerProduct
-from utils.jwt_handler import get_current_user
+from auth_dependencies import require_permission
+from utils.response_cache import cached_public
+from utils.json_response import fast_json
 
 router = APIRouter(prefix="/api/products", tags=["products"])
 
-def require_permission(permission: str):
-    def permission_checker(user=Depends(get_current_user)):
-        if permission not in user["permissions"]:
-            raise HTTPException(status_code=403, detail="Forbidden")
-        return user
-    return permission_checker
+# Tables the public product responses are built from (see utils/response_cache.py)
+PRODUCT_TABLES = ("product", "spicification")
+
 
 @router.get("/")
-async def get_all(user=Depends(require_permission("Read Products"))):
-    return await controllerProduct.get_all_products()
+async def get_all(cursor: str = None, limit: int = None, with_total: bool = False,
+                  fields: str = None, include: str = None,
+                  user=Depends(require_permission("Read Products"))):
+    # Straight to orjson: no jsonable_encoder pass over the whole catalog
+    return fast_json(await controllerProduct.get_all_products(cursor, limit, with_total, fields, include))
 
 @router.get("/{product_id}")
-async def get_one(product_id: int, user=Depends(require_permission("Read Products"))):
-    return await controllerProduct.get_product_by_id(product_id)
+async def get_one(product_id: int, fields: str = None, include: str = None,
+                  user=Depends(require_permission("Read Products"))):
+    return fast_json(await controllerProduct.get_product_by_id(product_id, fields, include))
 
 @router.post("/create")
 async def create(request: Request, user=Depends(require_permission("Create Products"))):
@@ -35,25 +38,30 @@ async def delete(product_id: int, user=Depends(require_permission("Delete Produc
 
 
 @router.get("/all/public")
-async def get_all_public():
-    return await controllerProduct.get_all_products_public()
+@cached_public(*PRODUCT_TABLES)
+async def get_all_public(fields: str = None, include: str = None):
+    return await controllerProduct.get_all_products_public(fields, include)
 
 @router.get("/all/public/{slug}")
-async def get_all_public_id(slug: str):
-    return await controllerProduct.get_product_by_slug(slug)
+@cached_public(*PRODUCT_TABLES)
+async def get_all_public_id(slug: str, fields: str = None, include: str = None):
+    return await controllerProduct.get_product_by_slug(slug, fields, include)
 
 @router.get("/all/public/{type_id}/type")
-async def get_all_public_type(type_id: int):
-    return await controllerProduct.get_products_by_type_id(type_id)
+@cached_public(*PRODUCT_TABLES)
+async def get_all_public_type(type_id: int, fields: str = None, include: str = None):
+    return await controllerProduct.get_products_by_type_id(type_id, fields, include)
 
 
 @router.get("/category/{category}/all/public")
-async def get_all_products_by_category_public(category: str):
-    return await controllerProduct.get_all_products_by_category_public(category)
+@cached_public(*PRODUCT_TABLES)
+async def get_all_products_by_category_public(category: str, fields: str = None, include: str = None):
+    return await controllerProduct.get_all_products_by_category_public(category, fields, include)
 
 @router.get("/new/all/public")
-async def get_all_new_products_public():
-    return await controllerProduct.get_all_new_products_public()
+@cached_public(*PRODUCT_TABLES)
+async def get_all_new_products_public(fields: str = None, include: str = None):
+    return await controllerProduct.get_all_new_products_public(fields, include)
 
 @router.put("/update/product/category/{product_id}")
 async def update_category(product_id: int, request: Request, user=Depends(require_permission("Update Products"))):
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Request
 import controllers.controllerProfileCeo as controller
+from utils.response_cache import cached_public
 
 router = APIRouter(prefix="/api/ceo", tags=["Profile CEO"])
 
@@ -27,10 +28,12 @@ async def delete(ceo_id: int):
 
 
 @router.get("/all/public")
+@cached_public("profile_ceo")
 async def get_all_public():
     return await controller.get_all_ceos_public()
 
 @router.get("/get_testimonial_public/all/public/{publisher_id}")
+@cached_public("profile_ceo")
 async def get_all_by_type_public(publisher_id: int):
     return await controller.get_testimonial_public(publisher_id)
 
@@ -1,18 +1,11 @@
 from fastapi import APIRouter, Depends, Request, HTTPException
 from controllers import controllerRole
 from utils.jwt_handler import get_current_user
+from auth_dependencies import require_permission
 
 router = APIRouter(prefix="/api/roles", tags=["Roles"])
 
 
-def require_permission(permission: str):
-    def permission_checker(user=Depends(get_current_user)):
-        if permission not in user["permissions"]:
-            raise HTTPException(status_code=403, detail="Forbidden")
-        return user
-    return permission_checker
-
-
 # ===============================
 # Get all roles
 # ===============================
@@ -67,5 +60,5 @@ async def get_me(payload: dict = Depends(get_current_user)):
         "email": payload["sub"],
         "role": payload["role"],
         "user_id": payload["user_id"],
-        "permissions": payload["permissions"]
+        "permissions": sorted(payload["permissions"])
     }
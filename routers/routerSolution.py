@@ -1,15 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from controllers import controllerSolution
-from utils.jwt_handler import get_current_user
+from auth_dependencies import require_permission
+from utils.response_cache import cached_public
 
 router = APIRouter(prefix="/api/solutions", tags=["solutions"])
 
-def require_permission(permission: str):
-    def permission_checker(user=Depends(get_current_user)):
-        if permission not in user.get("permissions", []):
-            raise HTTPException(status_code=403, detail="Forbidden")
-        return user
-    return permission_checker
 
 # ===============================
 # Admin routes
@@ -43,10 +38,12 @@ async def delete(solution_id: int, user=Depends(require_permission("Delete Solut
 # Public routes
 # ===============================
 @router.get("/all/public")
+@cached_public("solution")
 async def get_all_public():
     return await controllerSolution.get_all_solutions_public()
 
 @router.get("/all/public/{solution_id}")
+@cached_public("solution")
 async def get_public_by_id(solution_id: int):
     solution = await controllerSolution.get_solution_public_by_id(solution_id)
     if not solution:
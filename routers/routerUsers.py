@@ -1,42 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 import controllers.controllerUsers as user_ctrl
-from utils.jwt_handler import get_current_user
-import inspect
+from auth_dependencies import require_permission
+from utils.json_response import fast_json
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
-def require_permission(permission: str):
-    async def permission_checker(user=Depends(get_current_user)):
-        try:
-            # if dependency returned a coroutine for some reason, await it
-            if inspect.isawaitable(user):
-                user = await user
-            # be defensive: support dict or object with .permissions
-            if isinstance(user, dict):
-                perms = user.get("permissions", []) or []
-            elif hasattr(user, "permissions"):
-                perms = getattr(user, "permissions") or []
-                if inspect.isawaitable(perms):
-                    perms = await perms
-            else:
-                perms = []
-            # ensure perms is iterable
-            if not hasattr(perms, "__iter__"):
-                perms = []
-        except Exception:
-            # If anything unexpected occurs, deny access instead of crashing
-            raise HTTPException(status_code=403, detail="Forbidden")
-        if permission not in perms:
-            raise HTTPException(status_code=403, detail="Forbidden")
-        return user
-    return permission_checker
 
 # -------------------------------
 # Get all users
 # -------------------------------
 @router.get("/")
-async def get_all(user=Depends(require_permission("Read Users"))):
-    return await user_ctrl.get_all_users()
+async def get_all(cursor: str = None, limit: int = None, with_total: bool = False,
+                  user=Depends(require_permission("Read Users"))):
+    return fast_json(await user_ctrl.get_all_users(cursor, limit, with_total))
 
 # -------------------------------
 # Get one user by ID
@@ -1,15 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from controllers import controllerWarranty
-from utils.jwt_handler import get_current_user
+from auth_dependencies import require_permission
+from utils.response_cache import cached_public
 
 router = APIRouter(prefix="/api/warranties", tags=["warranties"])
 
-def require_permission(permission: str):
-    def permission_checker(user=Depends(get_current_user)):
-        if permission not in user["permissions"]:
-            raise HTTPException(status_code=403, detail="Forbidden")
-        return user
-    return permission_checker
 
 # -------------------------------
 # Get all warranties
@@ -52,5 +47,6 @@ async def delete(warranty_id: int, user=Depends(require_permission("Delete Warra
 # Get all public warranties
 # -------------------------------
 @router.get("/all/public")
+@cached_public("warranty")
 async def get_all_public():
     return await controllerWarranty.get_all_warranties_public()
@@ -1,15 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from controllers import controllerWelcome
-from utils.jwt_handler import get_current_user
+from auth_dependencies import require_permission
+from utils.response_cache import cached_public
 
 router = APIRouter(prefix="/api/welcome", tags=["Welcome"])
 
-def require_permission(permission: str):
-    def permission_checker(user=Depends(get_current_user)):
-        if permission not in user["permissions"]:
-            raise HTTPException(status_code=403, detail="Forbidden")
-        return user
-    return permission_checker
 
 # -------------------------------
 # Get all welcome entries
@@ -52,5 +47,6 @@ async def delete(welcome_id: int, user=Depends(require_permission("Delete Welcom
 # Get all public welcome entries
 # -------------------------------
 @router.get("/all/public")
+@cached_public("welcome")
 async def get_all_public():
     return await controllerWelcome.get_all_welcome_public()
@@ -1,9 +1,118 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a few threads per worker hash in parallel without
+# blocking the event loop. Beyond PASSWORD_HASH_QUEUE_MAX waiting jobs, new
+# ones are refused instead of queueing up behind a login storm.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_QUEUE_MAX = int(os.getenv("PASSWORD_HASH_QUEUE_MAX", 64))
+
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+# ===============================
+# Bounded executor
+# ===============================
+class PasswordHasherBusy(Exception):
+    """More than PASSWORD_HASH_QUEUE_MAX hash / verify jobs are already waiting."""
+
+
+class BoundedExecutor:
+    """Thread pool with a cap on waiting jobs and queue-depth / wait-time counters."""
+
+    def __init__(self, workers: int, max_queue: int, name: str):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.peak_queued = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def queued(self) -> int:
+        """Jobs waiting for a thread."""
+        return self.submitted - self.started
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.queued() >= self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy()
+            self.submitted += 1
+            self.peak_queued = max(self.peak_queued, self.queued())
+        enqueued = time.perf_counter()
+
+        def job():
+            waited = time.perf_counter() - enqueued
+            with self._lock:
+                self.started += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.completed += 1
+
+        future = self._executor.submit(job)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Still queued: drop it and keep the counters balanced (a running bcrypt cannot be stopped)
+            if future.cancel():
+                with self._lock:
+                    self.started += 1
+                    self.completed += 1
+                    self.cancelled += 1
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self.started
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.submitted - started,
+                "running": started - self.completed,
+                "peak_queued": self.peak_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "cancelled": self.cancelled,
+                "wait_avg_ms": round(1000 * self.wait_total / started, 2) if started else 0.0,
+                "wait_max_ms": round(1000 * self.wait_max, 2),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_executor = BoundedExecutor(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_MAX, "bcrypt")
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password() on the password executor; raises PasswordHasherBusy when it is saturated."""
+    return await password_executor.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password() on the password executor; raises PasswordHasherBusy when it is saturated."""
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+def password_hasher_stats() -> dict:
+    return password_executor.stats()
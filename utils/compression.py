@@ -0,0 +1,128 @@
+# utils/compression.py
+#
+# gzip / brotli response compression negotiated from Accept-Encoding.
+# CompressionMiddleware (added in main.py) compresses regular responses; the
+# public response cache stores compressed variants next to each cached body
+# and sets Content-Encoding itself, which the middleware then leaves alone.
+
+import gzip
+import os
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional, gzip is always available
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") != "0"
+# Bodies smaller than this are sent as-is (headers + framing would eat the gain)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def available_encodings() -> tuple:
+    """Supported encodings, preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str):
+    """Best encoding the client accepts ("br" / "gzip"), or None for identity."""
+    if not COMPRESSION_ENABLED or not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            param = param.strip()
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def is_compressible(content_type: str) -> bool:
+    return bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware: compress single-chunk responses of COMPRESSION_MIN_SIZE bytes or more.
+    Streaming responses (file downloads) and already-encoded bodies pass through.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message  # held back until we know the body
+                return
+
+            if message["type"] != "http.response.body" or start is None:
+                if start is not None:
+                    # http.response.pathsend (zero-copy file body): pass the file through as is
+                    pending, start = start, None
+                    await send(pending)
+                await send(message)
+                return
+
+            pending, start = start, None
+            headers = MutableHeaders(raw=pending["headers"])
+            body = message.get("body", b"")
+
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or "content-range" in headers
+                or len(body) < self.minimum_size
+                or not is_compressible(headers.get("content-type", ""))
+            ):
+                await send(pending)
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(pending)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
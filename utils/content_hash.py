@@ -0,0 +1,54 @@
+# utils/content_hash.py
+#
+# Content addressing for uploads: a file is stored as <sha256><ext>, so the
+# same bytes always get the same name and URL (cacheable forever), and a
+# repeat upload is recognised by gallery.content_hash before anything is sent
+# to storage (migrations/003_gallery_content_hash.sql).
+#
+# Direct uploads hash in a pre-pass over the request's local temp file, not
+# inside Storage.save(): the name is the hash and a duplicate must be known
+# before the transfer starts, and none of the drivers can rename an object
+# after it was sent (S3 would need a server-side copy, FTP a second round
+# trip). Background jobs hash while spooling instead (utils/upload_jobs.py),
+# because they read the upload once anyway.
+
+import asyncio
+import hashlib
+import os
+import re
+
+from utils.storage import UploadTooLarge, UPLOAD_CHUNK_SIZE, UPLOAD_MAX_BYTES
+
+_EXTENSION = re.compile(r"\.[a-z0-9]{1,10}")
+
+
+def content_name(digest: str, filename: str) -> str:
+    """<sha256><ext>, keeping the original extension when it is a plain one."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    return f"{digest}{ext}" if _EXTENSION.fullmatch(ext) else digest
+
+
+def _hash_file(src, max_bytes: int):
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = src.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        digest.update(chunk)
+    return digest.hexdigest(), size
+
+
+async def hash_upload(file, max_bytes: int = UPLOAD_MAX_BYTES):
+    """
+    (sha256 hex, size) of an UploadFile. Reads the request's local temp file in
+    a thread, nothing goes over the network; the file is rewound afterwards.
+    """
+    await file.seek(0)
+    try:
+        return await asyncio.to_thread(_hash_file, file.file, max_bytes)
+    finally:
+        await file.seek(0)
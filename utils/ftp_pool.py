@@ -0,0 +1,105 @@
+# utils/ftp_pool.py
+#
+# Pool of logged-in aioftp clients. Uploads borrow a warm session instead of
+# paying connect + login + MKD + QUIT round trips every time.
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import aioftp
+
+
+class FTPPool:
+    """
+    At most `size` sessions are in use at once (extra uploads wait).
+    Idle sessions older than `idle_timeout` are dropped, and sessions idle for
+    more than `check_after` seconds get a NOOP before they are handed out.
+    """
+
+    def __init__(self, host: str, user: str, password: str, port: int = 21, size: int = 4,
+                 idle_timeout: float = 60, check_after: float = 5, socket_timeout: float = 30):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.port = port
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.check_after = check_after
+        self.socket_timeout = socket_timeout
+
+        self._idle = []          # [(client, last_used)], most recently used last
+        self._semaphore = asyncio.Semaphore(size)
+        self._directories = set()  # remote directories known to exist
+
+    async def _connect(self):
+        client = aioftp.Client(socket_timeout=self.socket_timeout)
+        try:
+            await client.connect(self.host, self.port)
+            await client.login(self.user, self.password)
+        except BaseException:
+            client.close()
+            raise
+        return client
+
+    async def _is_healthy(self, client, last_used: float) -> bool:
+        idle = time.monotonic() - last_used
+        if idle > self.idle_timeout:
+            return False
+        if idle <= self.check_after:
+            return True
+        try:
+            await asyncio.wait_for(client.command("NOOP", "2xx"), self.socket_timeout)
+            return True
+        except Exception:
+            return False
+
+    async def _checkout(self):
+        while self._idle:
+            client, last_used = self._idle.pop()
+            if await self._is_healthy(client, last_used):
+                return client
+            client.close()
+        return await self._connect()
+
+    @asynccontextmanager
+    async def session(self):
+        """Borrow a logged-in client; it goes back to the pool unless the block raised."""
+        async with self._semaphore:
+            client = await self._checkout()
+            try:
+                yield client
+            except BaseException:
+                # The control connection may be mid-reply; never reuse it
+                client.close()
+                raise
+            self._idle.append((client, time.monotonic()))
+
+    async def ensure_directory(self, client, path: str):
+        """MKD -p once per pool; later calls for the same path are free."""
+        if path in self._directories:
+            return
+        try:
+            await client.make_directory(path)
+        except aioftp.StatusCodeError as e:
+            if not e.received_codes or "550" not in e.received_codes:
+                raise
+        self._directories.add(path)
+
+    def forget_directory(self, path: str):
+        self._directories.discard(path)
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for client, _ in idle:
+            try:
+                await asyncio.wait_for(client.quit(), 5)
+            except Exception:
+                client.close()
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "known_directories": len(self._directories),
+        }
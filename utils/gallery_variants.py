@@ -0,0 +1,144 @@
+# utils/gallery_variants.py
+#
+# Upload-time derivatives for gallery images: render them in the image process
+# pool (utils/image_variants.py), store them next to the original and
+# record them in gallery_variant (migrations/002_gallery_variants.sql).
+# Readers turn them into srcset strings with srcsets_for_gallery_ids().
+
+import asyncio
+import datetime
+import os
+import shutil
+import tempfile
+
+from utils.storage import get_storage
+from utils.image_variants import generate_variants, IMAGE_VARIANTS_ENABLED
+from utils.query_executor import fetch_all, execute_many
+from utils.response_cache import invalidate
+
+# Fire-and-forget variant jobs of this worker (kept referenced until done)
+_pending = set()
+
+
+class _FileReader:
+    def __init__(self, path: str):
+        self.file = open(path, "rb")
+
+    async def read(self, size: int = -1) -> bytes:
+        return await asyncio.to_thread(self.file.read, size)
+
+    def close(self):
+        self.file.close()
+
+
+async def process_gallery_variants(gallery_id: int, src_path: str, filename: str, share_with=()) -> int:
+    """
+    Render, upload and record the variants of one gallery image. Returns how
+    many were stored. Rows in `share_with` (same content) get the same variants.
+    """
+    if not IMAGE_VARIANTS_ENABLED:
+        return 0
+
+    stem = os.path.splitext(filename)[0]
+    out_dir = tempfile.mkdtemp(prefix="variants-")
+    try:
+        variants = await generate_variants(src_path, out_dir, stem)
+        if not variants:
+            return 0  # not an image
+
+        now = datetime.datetime.utcnow()
+        rows = []
+        for variant in variants:
+            name = os.path.basename(variant["file"])
+            reader = _FileReader(variant["file"])
+            try:
+                await get_storage().save(reader, name)
+            finally:
+                reader.close()
+            for owner in (gallery_id, *share_with):
+                rows.append((owner, variant["width"], variant["height"], variant["format"], name, now))
+
+        await execute_many("""
+            INSERT INTO gallery_variant (gallery_id, width, height, format, path, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, rows)
+
+        invalidate("gallery")
+        return len(rows)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def schedule_gallery_variants(gallery_id: int, src_path: str, filename: str, cleanup: bool = True, share_with=()):
+    """Run process_gallery_variants() after the response; deletes src_path afterwards when cleanup=True."""
+    async def run():
+        try:
+            count = await process_gallery_variants(gallery_id, src_path, filename, share_with)
+            if count:
+                print(f"🖼️ Gallery {gallery_id}: {count} image variants stored")
+        except Exception as e:
+            print(f"⚠️ Gallery {gallery_id}: image variants failed: {e}")
+        finally:
+            if cleanup:
+                try:
+                    os.unlink(src_path)
+                except FileNotFoundError:
+                    pass
+
+    task = asyncio.create_task(run())
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+    return task
+
+
+async def copy_gallery_variants(source_id: int, gallery_ids) -> int:
+    """Give `gallery_ids` the variant rows of `source_id` (same stored file). Returns variants per row."""
+    variants = await fetch_all(
+        "SELECT width, height, format, path FROM gallery_variant WHERE gallery_id = %s", (source_id,)
+    )
+    if not variants or not gallery_ids:
+        return len(variants)
+
+    now = datetime.datetime.utcnow()
+    await execute_many("""
+        INSERT INTO gallery_variant (gallery_id, width, height, format, path, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, [(gid, v["width"], v["height"], v["format"], v["path"], now) for gid in gallery_ids for v in variants])
+    return len(variants)
+
+
+def build_srcset(variants: list, base_url: str) -> dict:
+    """[{"width", "format", "path"}] → {"webp": "<url> 320w, <url> 640w", ...}"""
+    by_format = {}
+    for v in sorted(variants, key=lambda v: v["width"]):
+        by_format.setdefault(v["format"], []).append(f"{base_url}/{v['path']} {v['width']}w")
+    return {fmt: ", ".join(entries) for fmt, entries in by_format.items()}
+
+
+async def srcsets_for_gallery_ids(gallery_ids, conn=None) -> dict:
+    """{gallery_id: {"webp": srcset, "avif": srcset}} for the ids that have variants."""
+    ids = sorted({i for i in gallery_ids if i})
+    if not ids:
+        return {}
+
+    placeholders = ",".join(["%s"] * len(ids))
+    rows = await fetch_all(f"""
+        SELECT gallery_id, width, format, path
+        FROM gallery_variant
+        WHERE gallery_id IN ({placeholders})
+    """, ids, conn=conn)
+
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row["gallery_id"], []).append(row)
+
+    base_url = os.getenv("CPANEL_BASE_URL", "").rstrip("/")
+    return {gid: build_srcset(variants, base_url) for gid, variants in grouped.items()}
+
+
+async def attach_srcsets(rows: list, id_key: str = "image_id", out_key: str = "srcset", conn=None) -> list:
+    """Add row[out_key] (srcset map or None) to each row, looked up by row[id_key]."""
+    srcsets = await srcsets_for_gallery_ids([row.get(id_key) for row in rows], conn=conn)
+    for row in rows:
+        row[out_key] = srcsets.get(row.get(id_key))
+    return rows
@@ -0,0 +1,93 @@
+# utils/image_variants.py
+#
+# Width variants of uploaded images in modern formats (WebP / AVIF), rendered
+# with Pillow in a ProcessPoolExecutor so resizing never blocks the event loop.
+# Keep the imports here light: every spawned pool process imports this module.
+
+import asyncio
+import importlib.util
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Pillow is optional: without it uploads simply get no variants
+IMAGE_VARIANTS_ENABLED = (
+    os.getenv("IMAGE_VARIANTS_ENABLED", "1") != "0"
+    and importlib.util.find_spec("PIL") is not None
+)
+IMAGE_VARIANT_WIDTHS = tuple(sorted(
+    int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "320,640,1024,1600").split(",") if w.strip()
+))
+IMAGE_VARIANT_FORMATS = tuple(
+    f.strip().lower() for f in os.getenv("IMAGE_VARIANT_FORMATS", "webp,avif").split(",") if f.strip()
+)
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", 80))
+# Per app worker; 4 gunicorn workers × 1 = 4 image processes
+IMAGE_VARIANT_PROCESSES = int(os.getenv("IMAGE_VARIANT_PROCESSES", 1))
+
+_pool = None
+
+
+def render_variants(src_path: str, out_dir: str, stem: str, widths=IMAGE_VARIANT_WIDTHS,
+                    formats=IMAGE_VARIANT_FORMATS, quality: int = IMAGE_VARIANT_QUALITY) -> list:
+    """
+    Runs in a pool process. Writes <stem>-<width>w.<format> files to out_dir and
+    returns [{"width", "height", "format", "file"}]. Not an image → [].
+    Only widths below the original are produced (or the original width alone).
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(src_path) as opened:
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+    except (UnidentifiedImageError, OSError):
+        return []
+
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    targets = [w for w in widths if w < image.width] or [image.width]
+    variants = []
+    for width in targets:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+
+        for fmt in formats:
+            path = os.path.join(out_dir, f"{stem}-{width}w.{fmt}")
+            try:
+                resized.save(path, format=fmt.upper(), quality=quality)
+            except (KeyError, OSError, ValueError):
+                # This Pillow build has no encoder for `fmt` (AVIF needs Pillow >= 11.2 / libavif)
+                if os.path.exists(path):
+                    os.unlink(path)
+                continue
+            variants.append({"width": width, "height": height, "format": fmt, "file": path})
+
+    return variants
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: never fork a process that is running an event loop and DB pool threads
+        _pool = ProcessPoolExecutor(
+            max_workers=IMAGE_VARIANT_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def generate_variants(src_path: str, out_dir: str, stem: str) -> list:
+    """render_variants() in the process pool."""
+    if not IMAGE_VARIANTS_ENABLED:
+        return []
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), render_variants, src_path, out_dir, stem)
+
+
+def shutdown_image_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,206 @@
+# utils/invalidation_bus.py
+#
+# Broadcasts small messages (cache invalidations) between the gunicorn workers
+# of ONE host. Every worker binds a Unix datagram socket "<pid>.sock" inside
+# INVALIDATION_BUS_DIR; publish() sends one datagram to every other socket
+# found there. Nothing is persisted: a worker that starts later simply begins
+# with an empty cache.
+#
+# A peer whose socket queue is full gets the datagram again a few times with
+# backoff. Every message carries a per-sender sequence number; a receiver that
+# sees one skipped (dropped after all retries, or reordered by a retry) calls
+# the on_missed() handlers, which drop everything the lost message might have
+# invalidated.
+
+import asyncio
+import json
+import os
+import socket
+import tempfile
+
+INVALIDATION_BUS_ENABLED = os.getenv("INVALIDATION_BUS_ENABLED", "1") != "0"
+INVALIDATION_BUS_DIR = os.getenv(
+    "INVALIDATION_BUS_DIR", os.path.join(tempfile.gettempdir(), "fujiaire-invalidation-bus")
+)
+
+_MAX_DATAGRAM = 64 * 1024
+_SEND_RETRIES = 5
+_RETRY_DELAY = 0.05  # seconds, doubled per attempt
+
+_sock = None
+_sock_path = None
+_loop = None
+_handlers = {}  # channel -> [handler(payload)]
+_missed_handlers = []
+_sender = None        # "<pid>-<random>", set at start: pids get reused after a restart
+_seq = 0               # sequence number of this worker's last message
+_last_seen = {}        # sender -> last sequence number received
+_stats = {"retried": 0, "dropped": 0, "gaps": 0}
+
+
+def subscribe(channel: str, handler):
+    """Call handler(payload) whenever ANOTHER worker publishes on `channel`."""
+    handlers = _handlers.setdefault(channel, [])
+    if handler not in handlers:
+        handlers.append(handler)
+
+
+def unsubscribe(channel: str, handler):
+    handlers = _handlers.get(channel, [])
+    if handler in handlers:
+        handlers.remove(handler)
+
+
+def on_missed(handler):
+    """Call handler() when a message from another worker may have been lost."""
+    if handler not in _missed_handlers:
+        _missed_handlers.append(handler)
+
+
+def _check_sequence(message: dict):
+    sender, seq = message.get("sender"), message.get("seq")
+    if sender is None or seq is None:
+        return
+    last = _last_seen.get(sender)
+    if seq <= (last or 0):
+        return  # a retried message arriving late; dispatching it again is harmless
+    _last_seen[sender] = seq
+    # An unknown sender past its first message may have sent some before: assume a gap
+    if seq != (last or 0) + 1:
+        _stats["gaps"] += 1
+        for handler in list(_missed_handlers):
+            try:
+                handler()
+            except Exception as e:
+                print("❌ Invalidation bus gap handler failed:", e)
+
+
+def _dispatch(message: dict):
+    for handler in list(_handlers.get(message.get("channel"), [])):
+        try:
+            handler(message.get("payload"))
+        except Exception as e:
+            print("❌ Invalidation bus handler failed:", e)
+
+
+def _on_readable():
+    while True:
+        try:
+            data = _sock.recv(_MAX_DATAGRAM)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            print("❌ Invalidation bus receive error:", e)
+            return
+
+        try:
+            message = json.loads(data)
+        except ValueError:
+            continue
+        _check_sequence(message)
+        _dispatch(message)
+
+
+def _send(data: bytes, path: str, attempt: int = 0) -> bool:
+    try:
+        _sock.sendto(data, path)
+        return True
+    except (ConnectionRefusedError, FileNotFoundError):
+        # Worker is gone (crash / restart): clean up its socket file
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    except BlockingIOError:
+        if attempt < _SEND_RETRIES and _loop is not None:
+            _stats["retried"] += 1
+            _loop.call_later(_RETRY_DELAY * 2 ** attempt, _retry, data, path, attempt + 1)
+        else:
+            # The receiver notices the skipped sequence number on our next message
+            _stats["dropped"] += 1
+            print(f"❌ Invalidation bus: {os.path.basename(path)} is not draining its queue, message dropped")
+    except OSError as e:
+        print(f"❌ Invalidation bus send to {os.path.basename(path)} failed:", e)
+    return False
+
+
+def _retry(data: bytes, path: str, attempt: int):
+    if _sock is not None:
+        _send(data, path, attempt)
+
+
+def publish(channel: str, payload) -> int:
+    """Send payload to every other worker on this host; returns how many received it."""
+    if _sock is None:
+        return 0
+
+    global _seq
+    _seq += 1
+    data = json.dumps({"channel": channel, "payload": payload, "sender": _sender, "seq": _seq}).encode()
+    if len(data) > _MAX_DATAGRAM:
+        print(f"❌ Invalidation bus message too large ({len(data)} bytes) on {channel}")
+        return 0
+
+    delivered = 0
+    try:
+        names = os.listdir(INVALIDATION_BUS_DIR)
+    except OSError:
+        return 0
+
+    for name in names:
+        if not name.endswith(".sock"):
+            continue
+        path = os.path.join(INVALIDATION_BUS_DIR, name)
+        if path == _sock_path:
+            continue
+        if _send(data, path):
+            delivered += 1
+
+    return delivered
+
+
+def bus_stats() -> dict:
+    return {**_stats, "peers_seen": len(_last_seen), "sent": _seq}
+
+
+async def start_invalidation_bus():
+    """Bind this worker's socket and start receiving (call from the startup event)."""
+    global _sock, _sock_path, _loop, _sender
+    if _sock is not None or not INVALIDATION_BUS_ENABLED:
+        return
+    if not hasattr(socket, "AF_UNIX"):
+        print("⚠️ Invalidation bus disabled: Unix sockets are not available on this platform")
+        return
+
+    try:
+        os.makedirs(INVALIDATION_BUS_DIR, mode=0o700, exist_ok=True)
+        path = os.path.join(INVALIDATION_BUS_DIR, f"{os.getpid()}.sock")
+        if os.path.exists(path):
+            os.unlink(path)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        sock.bind(path)
+    except OSError as e:
+        print("❌ Invalidation bus disabled, could not bind socket:", e)
+        return
+
+    _loop = asyncio.get_running_loop()
+    _loop.add_reader(sock.fileno(), _on_readable)
+    _sock, _sock_path = sock, path
+    _sender = f"{os.getpid()}-{os.urandom(4).hex()}"
+    print(f"✅ Invalidation bus listening on {path}")
+
+
+async def stop_invalidation_bus():
+    global _sock, _sock_path, _loop
+    if _sock is None:
+        return
+
+    _loop.remove_reader(_sock.fileno())
+    _sock.close()
+    try:
+        os.unlink(_sock_path)
+    except OSError:
+        pass
+    _sock = _sock_path = _loop = None
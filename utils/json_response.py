@@ -0,0 +1,57 @@
+# utils/json_response.py
+#
+# App-wide JSON rendering with orjson: native datetime/date/UUID handling and
+# a C encoder instead of the stdlib json module. Falls back to the stdlib
+# JSONResponse when orjson is not installed.
+#
+# As default_response_class it only replaces the final dumps: FastAPI still runs
+# jsonable_encoder over whatever a route returns. Routes with large bodies return
+# fast_json(data) instead, which FastAPI sends as is, skipping that pass.
+
+import datetime
+import decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _default(obj):
+    # Types orjson does not know, converted the way jsonable_encoder does
+    if isinstance(obj, decimal.Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return jsonable_encoder(obj)
+
+
+def dumps(data) -> bytes:
+    """Encode raw controller data (dicts, lists, datetimes, Decimals...) straight to JSON bytes."""
+    if orjson is None:
+        return JSONResponse(content=jsonable_encoder(data)).body
+    return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class of the app (see main.py); same JSON as JSONResponse, rendered by orjson."""
+
+    def render(self, content) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def fast_json(data, status_code: int = 200) -> Response:
+    """Return from a route to skip jsonable_encoder; responses built by the controller pass through."""
+    if isinstance(data, Response):
+        return data
+    return FastJSONResponse(content=data, status_code=status_code)
@@ -3,7 +3,15 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt  # you can also use PyJWT if preferred
 from fastapi.security import OAuth2PasswordBearer
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+import hashlib
+import os
+import threading
+import time
+from utils import invalidation_bus
+from utils.lru_cache import LRUCache
+from utils.permissions import PermissionSet
+from utils.token_revocation import token_rejection
 
 # JWT config
 SECRET_KEY = "your_jwt_secret"
@@ -23,9 +31,8 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 # ✅ This is the missing function
 def decode_access_token(token: str):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload  # You can access payload["user_id"], payload["role"], etc.
-    except JWTError:
+        return verified_claims(token)  # You can access payload["user_id"], payload["role"], etc.
+    except (JWTError, jwt.PyJWTError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
@@ -41,15 +48,99 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 import jwt
 from fastapi import HTTPException, status
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+# ===============================
+# Verified-token cache
+# ===============================
+# The same token comes back on every admin request for its whole hour; keep the
+# verified claims (keyed by a digest, never the token itself) until `exp`.
+TOKEN_CACHE_ENABLED = os.getenv("TOKEN_CACHE_ENABLED", "1") != "0"
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 2048))
+TOKEN_CACHE_MAX_TTL = float(os.getenv("TOKEN_CACHE_MAX_TTL", 3600))
+
+_token_cache = LRUCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_MAX_TTL)
+# decode_access_token() also runs from sync dependencies, i.e. in the threadpool
+_token_cache_lock = threading.Lock()
+
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def verified_claims(token: str) -> dict:
+    """Claims of a valid token (raises PyJWT errors otherwise), from the cache when possible."""
+    key = _token_digest(token)
+    if TOKEN_CACHE_ENABLED:
+        with _token_cache_lock:
+            cached = _token_cache.get(key)
+        if cached is not None:
+            return dict(cached)  # callers may add keys; the cached dict stays as verified
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    payload["permissions"] = PermissionSet.from_claims(payload)
+
+    if TOKEN_CACHE_ENABLED:
+        ttl = TOKEN_CACHE_MAX_TTL
+        if "exp" in payload:
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl > 0:
+            with _token_cache_lock:
+                _token_cache.set(key, payload, ttl=ttl)
+    return dict(payload)
+
+
+def _drop_cached_tokens(criteria: dict) -> int:
+    digest, user_id = criteria.get("digest"), criteria.get("user_id")
+    with _token_cache_lock:
+        if digest is None and user_id is None:
+            dropped = len(_token_cache)
+            _token_cache.clear()
+            return dropped
+        if digest is not None:
+            return 1 if _token_cache.pop(bytes.fromhex(digest)) is not None else 0
+        return _token_cache.delete_where(lambda _, claims: claims.get("user_id") == user_id)
+
+
+def invalidate_token_cache(token: str = None, user_id: int = None) -> int:
+    """
+    Forget cached claims, in every worker: one token, every token of one user,
+    or everything when called without arguments. The next request re-verifies.
+    """
+    criteria = {"digest": _token_digest(token).hex() if token else None, "user_id": user_id}
+    invalidation_bus.publish("token_cache", criteria)
+    return _drop_cached_tokens(criteria)
+
+
+def token_cache_stats() -> dict:
+    with _token_cache_lock:
+        return _token_cache.stats()
+
+
+invalidation_bus.subscribe("token_cache", _drop_cached_tokens)
+invalidation_bus.on_missed(lambda: _drop_cached_tokens({}))
+
+
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
+    # async: a cache hit is a dict lookup, not worth a trip through the threadpool
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user  # already resolved by another dependency of this request
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = verified_claims(token)
         username = payload.get("sub")
         if username is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
             )
+        # Stale permission version or logged-out token: an in-memory check, no query
+        reason = await token_rejection(payload)
+        if reason is not None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=reason,
+            )
+        # "permissions" is a PermissionSet: `name in user["permissions"]` is one AND
+        request.state.user = payload
         return payload  # or a dict of user info
     except jwt.ExpiredSignatureError:
         raise HTTPException(
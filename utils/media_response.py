@@ -0,0 +1,162 @@
+# utils/media_response.py
+#
+# Responses for files of the local storage driver (utils/storage.py), fastest
+# way first:
+#
+#   1. MEDIA_ACCEL_REDIRECT set: an empty response carrying X-Accel-Redirect;
+#      nginx sends the file itself with sendfile (Range included).
+#   2. The ASGI server offers the http.response.pathsend extension: it sends
+#      the whole file with sendfile, nothing is copied through Python.
+#   3. Otherwise the file is read in MEDIA_CHUNK_SIZE pieces off the event loop.
+#
+# Files are never rewritten under the same name, so every response is marked
+# immutable and revalidation is a cheap size/mtime ETag compare.
+
+import asyncio
+import email.utils
+import os
+
+from starlette.responses import Response
+
+from utils.storage import IMMUTABLE_CACHE_CONTROL, content_type_for
+
+# nginx `internal` location aliased to MEDIA_ROOT, e.g. /_media; unset = serve from the app
+MEDIA_ACCEL_REDIRECT = os.getenv("MEDIA_ACCEL_REDIRECT", "").rstrip("/")
+MEDIA_CHUNK_SIZE = int(os.getenv("MEDIA_CHUNK_SIZE", 256 * 1024))
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str, size: int):
+    """
+    "bytes=a-b" / "bytes=a-" / "bytes=-n" → (start, end), both inclusive.
+    None = answer with the whole file (no header, syntax we ignore, several
+    ranges). Raises RangeNotSatisfiable when the range starts past the end.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        return None  # multipart/byteranges is not worth it for images; 200 is a valid answer
+
+    first, sep, last = spec.partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0 or size == 0:
+                raise RangeNotSatisfiable()
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def file_etag(stat_result) -> str:
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def accel_redirect_response(name: str, stat_result) -> Response:
+    """Let nginx send MEDIA_ROOT/name; it adds Content-Length, Range and sendfile itself."""
+    from urllib.parse import quote
+
+    return Response(headers={
+        "X-Accel-Redirect": f"{MEDIA_ACCEL_REDIRECT}/{quote(name)}",
+        "Content-Type": content_type_for(name),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "ETag": file_etag(stat_result),
+    })
+
+
+class MediaFileResponse(Response):
+    """200 / 206 / 304 / 416 for one local file, with immutable cache headers."""
+
+    def __init__(self, path: str, stat_result, request_headers, method: str = "GET"):
+        size = stat_result.st_size
+        etag = file_etag(stat_result)
+        headers = {
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            "ETag": etag,
+            "Last-Modified": email.utils.formatdate(stat_result.st_mtime, usegmt=True),
+            "Accept-Ranges": "bytes",
+        }
+
+        self.path = path
+        self.offset = 0
+        self.length = size
+        self.send_file = method != "HEAD"
+        status_code = 200
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            status_code = 304
+            self.length = 0
+            self.send_file = False
+        else:
+            # If-Range with a different validator: the client's partial copy is stale, send it all
+            if_range = request_headers.get("if-range")
+            try:
+                byte_range = None if if_range and if_range != etag else parse_range(request_headers.get("range"), size)
+            except RangeNotSatisfiable:
+                status_code = 416
+                headers["Content-Range"] = f"bytes */{size}"
+                self.length = 0
+                self.send_file = False
+            else:
+                if byte_range:
+                    start, end = byte_range
+                    status_code = 206
+                    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                    self.offset = start
+                    self.length = end - start + 1
+
+            headers["Content-Type"] = content_type_for(path)
+            headers["Content-Length"] = str(self.length)
+
+        super().__init__(status_code=status_code, headers=headers)
+
+    async def __call__(self, scope, receive, send):
+        if not self.send_file or not self.length:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        whole_file = self.offset == 0 and self.status_code == 200
+        if whole_file and "http.response.pathsend" in scope.get("extensions", {}):
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.pathsend", "path": self.path})
+            return
+
+        file = await asyncio.to_thread(open, self.path, "rb")
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if self.offset:
+                file.seek(self.offset)
+
+            remaining = self.length
+            while remaining > 0:
+                chunk = await asyncio.to_thread(file.read, min(MEDIA_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break  # truncated behind our back; Content-Length already went out
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            file.close()
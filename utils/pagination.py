@@ -0,0 +1,63 @@
+# utils/pagination.py
+#
+# Keyset (cursor) pagination on an integer id column.
+# The cursor is an opaque url-safe token; clients just echo back `next_cursor`.
+
+import base64
+import json
+import os
+
+from fastapi import HTTPException
+
+PAGE_LIMIT_DEFAULT = int(os.getenv("PAGE_LIMIT_DEFAULT", 50))
+PAGE_LIMIT_MAX = int(os.getenv("PAGE_LIMIT_MAX", 200))
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+        if not isinstance(last_id, int):
+            raise ValueError(last_id)
+        return last_id
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def is_paged(cursor: str = None, limit: int = None) -> bool:
+    """No cursor and no limit → caller keeps its old, unpaged response."""
+    return cursor is not None or limit is not None
+
+
+def page_args(cursor: str = None, limit: int = None):
+    """(after_id or None, clamped limit)"""
+    after_id = decode_cursor(cursor) if cursor else None
+    limit = PAGE_LIMIT_DEFAULT if limit is None else min(max(int(limit), 1), PAGE_LIMIT_MAX)
+    return after_id, limit
+
+
+def keyset_filter(column: str, after_id: int = None, descending: bool = False):
+    """SQL condition + params selecting the rows after the cursor, e.g. ("p.id > %s", (42,))."""
+    if after_id is None:
+        return "1 = 1", ()
+    return f"{column} {'<' if descending else '>'} %s", (after_id,)
+
+
+def build_page(rows: list, limit: int, id_key: str = "id", total: int = None) -> dict:
+    """rows must have been fetched with LIMIT limit + 1 so we know whether more exist."""
+    items = rows[:limit]
+    has_more = len(rows) > limit
+
+    page = {
+        "items": items,
+        "next_cursor": encode_cursor(items[-1][id_key]) if has_more and items else None,
+        "limit": limit,
+    }
+    if total is not None:
+        page["total"] = total
+    return page
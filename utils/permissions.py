@@ -0,0 +1,244 @@
+# utils/permissions.py
+#
+# Permission registry and compact grant sets. Every `permission` row owns the
+# bit at position permission.id (ids are never reused, so positions are
+# stable across workers and restarts). A user's grants travel in the JWT as
+# one base64url bitmask claim ("perms") instead of a list of names, and
+# `name in PermissionSet` is a dict lookup plus one bitwise AND.
+#
+# Role grants are the same for every user of a role, so they are kept in an
+# in-process role -> permission ids map, rebuilt after role_permission or
+# permission changes (and at least every ROLE_PERMISSION_MAP_TTL seconds,
+# since role_permission is also edited outside the app).
+
+import asyncio
+import base64
+import os
+import time
+
+import pymysql
+
+from utils import invalidation_bus
+from utils.query_executor import fetch_all
+
+_flags = {}  # permission name -> 1 << id
+_names = {}  # id -> permission name
+_version = 0      # bumped on every reload, so precomputed flags know when to refresh
+_reloads = set()  # reload tasks in flight (kept referenced until done)
+# Rows added outside the app (seed SQL, migrations) reach a worker when a check
+# misses a name; such reloads run at most once per interval
+PERMISSION_REGISTRY_MISS_RELOAD = float(os.getenv("PERMISSION_REGISTRY_MISS_RELOAD", 30))
+_miss_reload_at = None
+
+
+def _apply(rows):
+    global _flags, _names, _version
+    # Swapped in whole, so readers never see a half-built registry
+    _flags = {row["name"]: 1 << row["id"] for row in rows}
+    _names = {row["id"]: row["name"] for row in rows}
+    _version += 1
+
+
+def registry_version() -> int:
+    return _version
+
+
+def permission_flag(name: str) -> int:
+    """1 << permission.id, or 0 for a name that is not registered."""
+    return _flags.get(name, 0)
+
+
+async def load_permission_registry() -> int:
+    """(Re)read every permission row. Returns how many are registered."""
+    _apply(await fetch_all("SELECT id, name FROM permission"))
+    return len(_flags)
+
+
+async def ensure_registered(names) -> bool:
+    """
+    Reload when `names` contains a permission this worker has not seen yet, at
+    most once per PERMISSION_REGISTRY_MISS_RELOAD seconds. True once all are registered.
+    """
+    global _miss_reload_at
+    if all(name in _flags for name in names):
+        return True
+    now = time.monotonic()
+    if _miss_reload_at is not None and now - _miss_reload_at < PERMISSION_REGISTRY_MISS_RELOAD:
+        return False
+    _miss_reload_at = now
+    try:
+        await load_permission_registry()
+    except Exception as e:
+        print(f"⚠️ Permission registry reload failed: {e}")
+        return False
+    return all(name in _flags for name in names)
+
+
+async def ensure_ids_registered(ids) -> None:
+    """Reload once when `ids` contains a permission id this worker has not seen yet."""
+    if any(i not in _names for i in ids):
+        await load_permission_registry()
+
+
+def permission_names(ids) -> list:
+    """Sorted names of the registered permissions among `ids`."""
+    return sorted(_names[i] for i in set(ids) if i in _names)
+
+
+def permission_registry_changed():
+    """Call after writing the permission table: reloads here and in the other workers."""
+    invalidation_bus.publish("permission_registry", None)
+    _schedule_reload()
+    _drop_role_map()
+
+
+def _schedule_reload(payload=None):
+    async def reload():
+        try:
+            await load_permission_registry()
+        except Exception as e:
+            print(f"⚠️ Permission registry reload failed: {e}")
+
+    task = asyncio.get_running_loop().create_task(reload())
+    _reloads.add(task)
+    task.add_done_callback(_reloads.discard)
+
+
+invalidation_bus.subscribe("permission_registry", _schedule_reload)
+
+
+# ===============================
+# Role -> permissions map
+# ===============================
+ROLE_PERMISSION_MAP_TTL = float(os.getenv("ROLE_PERMISSION_MAP_TTL", 300))
+
+_role_map = None        # role_id -> frozenset(permission ids)
+_role_map_loaded_at = 0.0
+_role_map_generation = 0  # bumped on every drop, so a rebuild racing a change is not kept
+_role_map_lock = asyncio.Lock()
+
+
+def _drop_role_map(payload=None):
+    global _role_map, _role_map_generation
+    _role_map = None
+    _role_map_generation += 1
+
+
+def _role_map_stale() -> bool:
+    return _role_map is None or time.monotonic() - _role_map_loaded_at > ROLE_PERMISSION_MAP_TTL
+
+
+async def _load_role_map() -> dict:
+    try:
+        rows = await fetch_all("SELECT role_id, permission_id FROM role_permission")
+    except pymysql.err.ProgrammingError as e:
+        # No role_permission table (errno 1146): roles grant nothing
+        if getattr(e, "args", [None])[0] == 1146:
+            return {}
+        raise
+    grants = {}
+    for row in rows:
+        grants.setdefault(row["role_id"], set()).add(row["permission_id"])
+    return {role: frozenset(ids) for role, ids in grants.items()}
+
+
+async def role_permission_ids(role_id) -> frozenset:
+    """Permission ids granted to `role_id`; one query per rebuild, then in memory."""
+    global _role_map, _role_map_loaded_at
+    if _role_map_stale():
+        async with _role_map_lock:
+            # Another request may have rebuilt it while this one waited
+            if _role_map_stale():
+                generation = _role_map_generation
+                role_map = await _load_role_map()
+                if generation == _role_map_generation:
+                    _role_map, _role_map_loaded_at = role_map, time.monotonic()
+                else:
+                    return role_map.get(role_id, frozenset())
+    return _role_map.get(role_id, frozenset())
+
+
+def role_permissions_changed():
+    """Call after writing role_permission: the map is rebuilt on next use, in every worker."""
+    invalidation_bus.publish("role_permissions", None)
+    _drop_role_map()
+
+
+invalidation_bus.subscribe("role_permissions", _drop_role_map)
+invalidation_bus.subscribe("permission_registry", _drop_role_map)
+invalidation_bus.on_missed(_schedule_reload)
+invalidation_bus.on_missed(_drop_role_map)
+
+
+# ===============================
+# Bitmask claim
+# ===============================
+def permission_mask(names) -> int:
+    mask = 0
+    for name in names:
+        mask |= _flags.get(name, 0)
+    return mask
+
+
+def encode_mask(mask: int) -> str:
+    raw = mask.to_bytes((mask.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_mask(claim: str) -> int:
+    if not claim:
+        return 0
+    raw = base64.urlsafe_b64decode(claim + "=" * (-len(claim) % 4))
+    return int.from_bytes(raw, "big")
+
+
+def encode_permissions(names) -> str:
+    """Permission names → "perms" claim. Names missing from the registry are dropped."""
+    return encode_mask(permission_mask(names))
+
+
+def encode_permission_ids(ids) -> str:
+    """Permission ids → "perms" claim. Ids missing from the registry are dropped."""
+    mask = 0
+    for i in ids:
+        if i in _names:
+            mask |= 1 << i
+    return encode_mask(mask)
+
+
+class PermissionSet:
+    """Read-only set of permission names backed by a bitmask."""
+
+    __slots__ = ("mask",)
+
+    def __init__(self, mask: int = 0):
+        self.mask = mask
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> "PermissionSet":
+        # Tokens issued before the bitmask claim still carry the list of names
+        if "perms" in payload:
+            return cls(decode_mask(payload["perms"]))
+        return cls(permission_mask(payload.get("permissions") or []))
+
+    def __contains__(self, name) -> bool:
+        flag = _flags.get(name)
+        return flag is not None and self.mask & flag != 0
+
+    def __iter__(self):
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            name = _names.get(low.bit_length() - 1)
+            if name is not None:
+                yield name
+            mask ^= low
+
+    def __len__(self) -> int:
+        return bin(self.mask).count("1")
+
+    def __bool__(self) -> bool:
+        return self.mask != 0
+
+    def __repr__(self) -> str:
+        return f"PermissionSet({sorted(self)!r})"
@@ -0,0 +1,119 @@
+# utils/query_executor.py
+
+import asyncio
+import os
+import time
+from collections import namedtuple
+
+import aiomysql
+from fastapi import HTTPException
+
+from db import db_connection
+
+# Per-query timeout (seconds); can be overridden per call with timeout=...
+DB_QUERY_TIMEOUT = float(os.getenv("DB_QUERY_TIMEOUT", 15))
+
+# Result of execute()/execute_many()
+ExecResult = namedtuple("ExecResult", ["lastrowid", "rowcount"])
+
+# Hooks receive one dict per query: {"mode", "query", "elapsed_ms", "rowcount"}
+_query_hooks = []
+
+
+def add_query_hook(hook):
+    """Register a callable invoked after every query (timing / row counts)."""
+    if hook not in _query_hooks:
+        _query_hooks.append(hook)
+
+
+def remove_query_hook(hook):
+    if hook in _query_hooks:
+        _query_hooks.remove(hook)
+
+
+def _notify(mode: str, query: str, elapsed: float, rowcount: int):
+    if not _query_hooks:
+        return
+    event = {
+        "mode": mode,
+        "query": query,
+        "elapsed_ms": elapsed * 1000,
+        "rowcount": rowcount,
+    }
+    for hook in list(_query_hooks):
+        try:
+            hook(event)
+        except Exception as e:
+            print("❌ Query hook failed:", e)
+
+
+async def _run_on(conn, mode: str, query: str, params):
+    async with conn.cursor(aiomysql.DictCursor) as cursor:
+        if mode == "execute_many":
+            if not params:
+                return ExecResult(None, 0), 0
+            await cursor.executemany(query, params)
+            return ExecResult(cursor.lastrowid, cursor.rowcount), cursor.rowcount
+
+        await cursor.execute(query, params or ())
+
+        if mode == "fetch_one":
+            row = await cursor.fetchone()
+            return row, int(row is not None)
+        if mode == "fetch_all":
+            rows = await cursor.fetchall()
+            return rows, len(rows)
+        if mode == "fetch_scalar":
+            row = await cursor.fetchone()
+            return (next(iter(row.values())) if row else None), int(row is not None)
+        return ExecResult(cursor.lastrowid, cursor.rowcount), cursor.rowcount
+
+
+async def _run(mode: str, query: str, params=None, conn=None, timeout=None):
+    # No connection given → lease one from the pool just for this query
+    if conn is None:
+        async with db_connection() as leased:
+            return await _run(mode, query, params, leased, timeout)
+
+    start = time.perf_counter()
+    try:
+        result, rowcount = await asyncio.wait_for(
+            _run_on(conn, mode, query, params),
+            timeout=timeout or DB_QUERY_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        # The server may still be busy with the statement: never hand this connection out again
+        conn.close()
+        print(f"❌ Query timed out after {timeout or DB_QUERY_TIMEOUT}s: {query.strip()[:120]}")
+        raise HTTPException(status_code=504, detail="Database query timed out")
+
+    _notify(mode, query, time.perf_counter() - start, rowcount)
+    return result
+
+
+# ===============================
+# Public API
+# ===============================
+async def fetch_one(query: str, params=None, conn=None, timeout=None):
+    """First row as a dict, or None."""
+    return await _run("fetch_one", query, params, conn, timeout)
+
+
+async def fetch_all(query: str, params=None, conn=None, timeout=None):
+    """All rows as a list of dicts."""
+    return await _run("fetch_all", query, params, conn, timeout)
+
+
+async def fetch_scalar(query: str, params=None, conn=None, timeout=None):
+    """First column of the first row, or None."""
+    return await _run("fetch_scalar", query, params, conn, timeout)
+
+
+async def execute(query: str, params=None, conn=None, timeout=None) -> ExecResult:
+    """INSERT / UPDATE / DELETE; returns ExecResult(lastrowid, rowcount)."""
+    return await _run("execute", query, params, conn, timeout)
+
+
+async def execute_many(query: str, seq_of_params, conn=None, timeout=None) -> ExecResult:
+    """Same statement for many parameter tuples (multi-row INSERT for simple VALUES)."""
+    return await _run("execute_many", query, list(seq_of_params), conn, timeout)
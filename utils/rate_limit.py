@@ -0,0 +1,119 @@
+# utils/rate_limit.py
+#
+# In-memory token buckets. A bucket holds up to `burst` tokens and refills at
+# `per_minute` tokens a minute; every attempt takes one. At most `max_keys`
+# buckets are kept, in least-recently-used order. Only buckets that have
+# refilled completely are ever dropped (forgetting them changes nothing), so a
+# flood of distinct keys cannot reset the bucket of the key it targets. When
+# the table is full and none of the oldest buckets is full again, a new key is
+# let through without a bucket: refusing it would let that same flood lock out
+# every new key. Every gunicorn worker has its own buckets.
+
+import math
+import os
+import time
+from collections import OrderedDict
+
+LOGIN_THROTTLE_ENABLED = os.getenv("LOGIN_THROTTLE_ENABLED", "1") != "0"
+LOGIN_IP_BURST = int(os.getenv("LOGIN_IP_BURST", 20))
+LOGIN_IP_PER_MINUTE = float(os.getenv("LOGIN_IP_PER_MINUTE", 10))
+LOGIN_EMAIL_BURST = int(os.getenv("LOGIN_EMAIL_BURST", 5))
+LOGIN_EMAIL_PER_MINUTE = float(os.getenv("LOGIN_EMAIL_PER_MINUTE", 2))
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", 50000))
+
+# Oldest buckets inspected for a full one when the table is at max_keys
+_EVICTION_SCAN = 64
+
+
+class TokenBucketLimiter:
+    """Token bucket per key. take() answers 0 when allowed, else seconds until the next token."""
+
+    def __init__(self, burst: int, per_minute: float, max_keys: int):
+        self.burst = max(int(burst), 1)
+        self.rate = per_minute / 60.0  # tokens per second
+        self.max_keys = max(int(max_keys), 1)
+        self._buckets = OrderedDict()  # key -> [tokens, updated_at], oldest first
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+        self.saturated = 0  # new keys let through untracked because every tracked bucket was still draining
+
+    def _tokens(self, bucket, now) -> float:
+        return min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+
+    def _make_room(self, now) -> bool:
+        full = []
+        for i, (key, bucket) in enumerate(self._buckets.items()):
+            if i >= _EVICTION_SCAN:
+                break
+            if self._tokens(bucket, now) >= self.burst:
+                full.append(key)
+        for key in full:
+            del self._buckets[key]
+        self.evictions += len(full)
+        return len(self._buckets) < self.max_keys
+
+    def take(self, key) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys and not self._make_room(now):
+                # Dropping a drained bucket would hand its key a fresh burst, and
+                # refusing would lock out every new key: allow this one untracked
+                self.allowed += 1
+                self.saturated += 1
+                return 0.0
+            bucket = self._buckets[key] = [float(self.burst), now]
+        else:
+            bucket[0] = self._tokens(bucket, now)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        if bucket[0] < 1:
+            self.limited += 1
+            return (1 - bucket[0]) / self.rate
+
+        bucket[0] -= 1
+        self.allowed += 1
+        return 0.0
+
+    def stats(self) -> dict:
+        return {
+            "burst": self.burst,
+            "per_minute": round(self.rate * 60, 3),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "keys": len(self._buckets),
+            "max_keys": self.max_keys,
+            "evictions": self.evictions,
+            "saturated": self.saturated,
+        }
+
+
+# ===============================
+# Login throttle
+# ===============================
+login_ip_limiter = TokenBucketLimiter(LOGIN_IP_BURST, LOGIN_IP_PER_MINUTE, LOGIN_THROTTLE_MAX_KEYS)
+login_email_limiter = TokenBucketLimiter(LOGIN_EMAIL_BURST, LOGIN_EMAIL_PER_MINUTE, LOGIN_THROTTLE_MAX_KEYS)
+
+
+def login_retry_after(ip: str, email: str) -> int:
+    """
+    0 when this login attempt may go ahead, else the Retry-After seconds.
+    Runs before any query or bcrypt work; an attempt over the IP limit does not
+    use up the email's tokens.
+    """
+    if not LOGIN_THROTTLE_ENABLED:
+        return 0
+    wait = login_ip_limiter.take(ip or "unknown")
+    if not wait:
+        wait = login_email_limiter.take((email or "").strip().lower())
+    return math.ceil(wait)
+
+
+def login_throttle_stats() -> dict:
+    return {
+        "enabled": LOGIN_THROTTLE_ENABLED,
+        "ip": login_ip_limiter.stats(),
+        "email": login_email_limiter.stats(),
+    }
@@ -0,0 +1,195 @@
+# utils/response_cache.py
+
+import functools
+import hashlib
+import inspect
+import os
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from utils import compression, invalidation_bus, json_response
+from utils.lru_cache import LRUCache
+
+# Public GET responses are cached as already-rendered JSON bytes, per route + path params
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") != "0"
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 300))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 512))
+# Browsers / the reverse proxy may keep a copy but must revalidate it (ETag).
+# The ETag is a hash of the body, so every worker gives the same body the same tag.
+# There is no Last-Modified: a fill time differs per worker, and the tables'
+# updated_at misses hard deletes (contact_us, product_images, category_images).
+PUBLIC_CACHE_CONTROL = os.getenv("PUBLIC_CACHE_CONTROL", "public, no-cache")
+
+_cache = LRUCache(maxsize=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL)
+
+# table -> generation, bumped by invalidate(); a fill that raced a write is not stored
+_generations = {}
+_epoch = 0  # bumped when an invalidation from another worker may have been lost
+
+
+class CachedBody:
+    __slots__ = ("body", "tables", "etag", "variants")
+
+    def __init__(self, body: bytes, tables: frozenset):
+        self.body = body
+        self.tables = tables
+        # Validators are computed once per fill, so a conditional hit never touches the body
+        self.etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+        # encoding -> compressed body, filled on first request for that encoding
+        self.variants = {}
+
+    def encoded(self, encoding: str = None) -> bytes:
+        if encoding is None:
+            return self.body
+        body = self.variants.get(encoding)
+        if body is None:
+            body = self.variants[encoding] = compression.compress(self.body, encoding)
+        return body
+
+    def headers(self, encoding: str = None) -> dict:
+        headers = {
+            # Each encoding is its own representation, so it gets its own strong ETag
+            "ETag": self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"',
+            "Cache-Control": PUBLIC_CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return headers
+
+
+def _snapshot(tables):
+    return (_epoch, *(_generations.get(t, 0) for t in tables))
+
+
+def _render(data) -> bytes:
+    # Same JSON FastAPI would send for this return value, without the jsonable_encoder pass
+    return json_response.dumps(data)
+
+
+def _invalidate_local(tables) -> int:
+    tables = set(tables)
+    for table in tables:
+        _generations[table] = _generations.get(table, 0) + 1
+    return _cache.delete_where(lambda key, entry: not tables.isdisjoint(entry.tables))
+
+
+def _freeze(value):
+    # JSON turns the tuple keys into lists; make them hashable again
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _on_remote_invalidate(payload):
+    if payload.get("tables"):
+        _invalidate_local(payload["tables"])
+    for key in payload.get("keys", []):
+        _cache.pop(_freeze(key))
+
+
+def _on_missed_invalidation():
+    # Which tables the lost message named is unknown: drop everything
+    global _epoch
+    _epoch += 1
+    _cache.clear()
+
+
+invalidation_bus.subscribe("response_cache", _on_remote_invalidate)
+invalidation_bus.on_missed(_on_missed_invalidation)
+
+
+def invalidate(*tables) -> int:
+    """Drop every cached response built from any of `tables`, in all workers. Call after a write."""
+    invalidation_bus.publish("response_cache", {"tables": list(tables)})
+    return _invalidate_local(tables)
+
+
+def invalidate_key(key):
+    """Drop one cached response (same key as built by @cached_public), in all workers."""
+    invalidation_bus.publish("response_cache", {"keys": [key]})
+    _cache.pop(key)
+
+
+def clear():
+    _cache.clear()
+
+
+def cache_stats() -> dict:
+    return _cache.stats()
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """RFC 7232 If-None-Match, weak comparison for GET."""
+    if request is None:
+        return False
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return etag in tags
+
+
+async def get_or_build(key, tables, builder, request: Request = None, store: bool = True) -> Response:
+    """
+    Serve `key` from the cache, or await builder() and cache its rendered JSON
+    (not with store=False). Answers 304 when the client's ETag still matches, and
+    sends the gzip / brotli variant the client accepts (compressed once per entry).
+
+    A miss has to run builder() even for a conditional request: the ETag is the
+    hash of the body. A 304 then still skips compression and the transfer, and
+    the stored entry answers the next conditional request without a query.
+    """
+    entry = _cache.get(key) if store else None
+
+    if entry is None:
+        before = _snapshot(tables)
+        data = await builder()
+        if isinstance(data, Response):
+            return data  # route built its own response, nothing to cache
+
+        entry = CachedBody(_render(data), frozenset(tables))
+        if store and _snapshot(tables) == before:
+            _cache.set(key, entry)
+
+    encoding = None
+    if request is not None and len(entry.body) >= compression.COMPRESSION_MIN_SIZE:
+        encoding = compression.negotiate(request.headers.get("accept-encoding", ""))
+    headers = entry.headers(encoding)
+
+    if is_not_modified(request, headers["ETag"]):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=entry.encoded(encoding), media_type="application/json", headers=headers)
+
+
+def cached_public(*tables):
+    """
+    Route decorator for public GETs: cache the JSON body per path-parameter set,
+    tagged with the tables it was read from (see invalidate()).
+
+        @router.get("/all/public")
+        @cached_public("banner", "gallery")
+        async def get_all_public(): ...
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, _cache_request: Request, **kwargs):
+            key = (func.__module__, func.__name__, tuple(sorted(kwargs.items())))
+            # Disabled cache: nothing is stored, but ETag / 304 / compression still apply
+            return await get_or_build(key, tables, lambda: func(*args, **kwargs), _cache_request,
+                                      store=RESPONSE_CACHE_ENABLED)
+
+        # Let FastAPI inject the Request (for If-None-Match) without touching the route signature
+        signature = inspect.signature(func)
+        wrapper.__signature__ = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter("_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        ])
+        return wrapper
+    return decorator
@@ -0,0 +1,300 @@
+# utils/storage.py
+#
+# Where uploaded media lives. MEDIA_STORAGE picks one driver per process:
+#
+#   ftp   (default) cPanel FTP through the session pool in cpanel_ftp_uploader.py
+#   local files under MEDIA_ROOT, served by routers/routerMedia.py
+#   s3    any S3-compatible bucket (AWS, MinIO, R2, ...) through aiobotocore
+#
+# Every driver takes `anything with async read(n)` (UploadFile, spool readers)
+# and copies it in UPLOAD_CHUNK_SIZE pieces, so memory per upload stays bounded
+# whatever the backend. Public URLs are still built from CPANEL_BASE_URL.
+
+import asyncio
+import mimetypes
+import os
+import tempfile
+
+MEDIA_STORAGE = os.getenv("MEDIA_STORAGE", "ftp").strip().lower()
+MEDIA_ROOT = os.path.abspath(os.getenv("MEDIA_ROOT", "uploads"))
+# Where routers/routerMedia.py serves MEDIA_ROOT (local driver only); point CPANEL_BASE_URL here
+MEDIA_URL_PREFIX = "/" + os.getenv("MEDIA_URL_PREFIX", "/media").strip("/")
+
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")          # unset = AWS; e.g. http://127.0.0.1:9000 for MinIO
+S3_BUCKET = os.getenv("S3_BUCKET")
+S3_REGION = os.getenv("S3_REGION", "us-east-1")
+S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY")
+S3_SECRET_KEY = os.getenv("S3_SECRET_KEY")
+S3_PREFIX = os.getenv("S3_PREFIX", "uploads").strip("/")
+# Parts of a multipart upload; S3 wants at least 5 MiB for every part but the last
+S3_PART_SIZE = max(int(os.getenv("S3_PART_SIZE", 8 * 1024 * 1024)), 5 * 1024 * 1024)
+
+# Uploads are copied in chunks of this size, so memory per upload stays bounded
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 256 * 1024))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 64 * 1024 * 1024))
+
+# Objects are written once under a unique name, so clients may cache them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class UploadTooLarge(Exception):
+    """The upload went past max_bytes; nothing was kept in storage."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File exceeds the {max_bytes} byte upload limit")
+        self.max_bytes = max_bytes
+
+
+def content_type_for(name: str) -> str:
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+class Storage:
+    """Driver interface. `name` is the stored file name (gallery.path)."""
+
+    kind = "base"
+    # Transfers worth running at once against this backend (batch uploads)
+    concurrency = 4
+
+    async def save(self, file, name: str, max_bytes: int = UPLOAD_MAX_BYTES) -> int:
+        """Copy `file` to `name`. Returns the bytes written; 0 = empty file, nothing stored."""
+        raise NotImplementedError
+
+    async def delete(self, name: str):
+        raise NotImplementedError
+
+    async def exists(self, name: str) -> bool:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+# ===============================
+# FTP (cPanel)
+# ===============================
+class FTPStorage(Storage):
+    kind = "ftp"
+
+    def __init__(self):
+        # Imported here so local / s3 deployments never need the CPANEL_FTP_* variables
+        import cpanel_ftp_uploader
+        self._ftp = cpanel_ftp_uploader
+        self.concurrency = cpanel_ftp_uploader.FTP_POOL_SIZE
+
+    async def save(self, file, name: str, max_bytes: int = UPLOAD_MAX_BYTES) -> int:
+        return await self._ftp.stream_to_ftp(file, name, max_bytes)
+
+    async def delete(self, name: str):
+        await self._ftp.delete_from_ftp(name)
+
+    async def exists(self, name: str) -> bool:
+        return await self._ftp.exists_on_ftp(name)
+
+    async def close(self):
+        await self._ftp.close_ftp_pool()
+
+
+# ===============================
+# Local disk
+# ===============================
+class LocalStorage(Storage):
+    kind = "local"
+    concurrency = 8
+
+    def __init__(self, root: str = MEDIA_ROOT):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, name: str) -> str:
+        """Absolute path of `name`, or ValueError when it would leave the media root."""
+        path = os.path.realpath(os.path.join(self.root, name))
+        if os.path.commonpath([path, os.path.realpath(self.root)]) != os.path.realpath(self.root):
+            raise ValueError(f"Invalid media path: {name}")
+        return path
+
+    async def save(self, file, name: str, max_bytes: int = UPLOAD_MAX_BYTES) -> int:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return 0
+
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
+
+        # Written next to the target and renamed at the end: readers never see half a file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+        written = 0
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while chunk:
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise UploadTooLarge(max_bytes)
+                    await asyncio.to_thread(out.write, chunk)
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return written
+
+    async def delete(self, name: str):
+        try:
+            await asyncio.to_thread(os.unlink, self.path(name))
+        except FileNotFoundError:
+            pass
+
+    async def exists(self, name: str) -> bool:
+        return await asyncio.to_thread(os.path.isfile, self.path(name))
+
+
+# ===============================
+# S3-compatible
+# ===============================
+class S3Storage(Storage):
+    kind = "s3"
+    concurrency = 8
+
+    def __init__(self, bucket: str = S3_BUCKET, endpoint_url: str = S3_ENDPOINT_URL, region: str = S3_REGION,
+                 access_key: str = S3_ACCESS_KEY, secret_key: str = S3_SECRET_KEY, prefix: str = S3_PREFIX):
+        try:
+            from aiobotocore.session import get_session
+        except ImportError:
+            raise RuntimeError("MEDIA_STORAGE=s3 needs the optional aiobotocore package (pip install aiobotocore)")
+        if not bucket:
+            raise EnvironmentError("Missing required environment variable: S3_BUCKET")
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client_args = {
+            "endpoint_url": endpoint_url,
+            "region_name": region,
+            "aws_access_key_id": access_key,
+            "aws_secret_access_key": secret_key,
+        }
+        self._session = get_session()
+        self._client_context = None
+        self._client = None
+        self._lock = asyncio.Lock()
+
+    def key(self, name: str) -> str:
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+    async def _get_client(self):
+        # One client (and HTTP connection pool) per worker, opened on first use
+        async with self._lock:
+            if self._client is None:
+                self._client_context = self._session.create_client("s3", **self._client_args)
+                self._client = await self._client_context.__aenter__()
+        return self._client
+
+    async def save(self, file, name: str, max_bytes: int = UPLOAD_MAX_BYTES) -> int:
+        client = await self._get_client()
+        key = self.key(name)
+        object_args = {"ContentType": content_type_for(name), "CacheControl": IMMUTABLE_CACHE_CONTROL}
+
+        buffer = bytearray()
+        written = 0
+        upload_id = None
+        parts = []
+
+        try:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if chunk:
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise UploadTooLarge(max_bytes)
+                    buffer += chunk
+
+                # Small files go up in one PUT; larger ones as parts of at most S3_PART_SIZE in memory
+                if len(buffer) >= S3_PART_SIZE or (not chunk and upload_id and buffer):
+                    if upload_id is None:
+                        created = await client.create_multipart_upload(Bucket=self.bucket, Key=key, **object_args)
+                        upload_id = created["UploadId"]
+                    number = len(parts) + 1
+                    part = await client.upload_part(
+                        Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=bytes(buffer)
+                    )
+                    parts.append({"ETag": part["ETag"], "PartNumber": number})
+                    buffer.clear()
+
+                if not chunk:
+                    break
+
+            if not written:
+                return 0
+
+            if upload_id is None:
+                await client.put_object(Bucket=self.bucket, Key=key, Body=bytes(buffer), **object_args)
+            else:
+                await client.complete_multipart_upload(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+                )
+
+        except BaseException:
+            if upload_id is not None:
+                try:
+                    await client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+                except Exception as e:
+                    print(f"⚠️ Could not abort multipart upload of {key}: {e}")
+            raise
+
+        return written
+
+    async def delete(self, name: str):
+        client = await self._get_client()
+        await client.delete_object(Bucket=self.bucket, Key=self.key(name))
+
+    async def exists(self, name: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        client = await self._get_client()
+        try:
+            await client.head_object(Bucket=self.bucket, Key=self.key(name))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    async def close(self):
+        if self._client_context is not None:
+            await self._client_context.__aexit__(None, None, None)
+            self._client_context = None
+            self._client = None
+
+
+# ===============================
+# Process-wide driver
+# ===============================
+DRIVERS = {
+    "ftp": FTPStorage,
+    "local": LocalStorage,
+    "s3": S3Storage,
+}
+
+_storage = None
+
+
+def get_storage() -> Storage:
+    """The driver selected by MEDIA_STORAGE, created on first use."""
+    global _storage
+    if _storage is None:
+        if MEDIA_STORAGE not in DRIVERS:
+            raise EnvironmentError(f"Unknown MEDIA_STORAGE '{MEDIA_STORAGE}' (expected one of: {', '.join(DRIVERS)})")
+        _storage = DRIVERS[MEDIA_STORAGE]()
+        print(f"🗄️ Media storage: {_storage.kind}")
+    return _storage
+
+
+async def close_storage():
+    global _storage
+    if _storage is not None:
+        await _storage.close()
+        _storage = None
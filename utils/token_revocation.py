@@ -0,0 +1,307 @@
+# utils/token_revocation.py
+#
+# Stale and revoked tokens, rejected without a query per request.
+#
+# Permission version: every change to a user's grants (assign_permissions_to_user,
+# a role change, deactivation) bumps user_permission_version.version for that
+# user. Login writes the current version into the token ("pv"); a token whose
+# pv is below the version in this worker's map is stale. The map is a dict of
+# user_id -> version, loaded at startup and refreshed incrementally (rows whose
+# updated_at moved) every TOKEN_REVOCATION_REFRESH seconds, and pushed to the
+# other workers on this host over the invalidation bus as soon as it changes.
+#
+# Revocation: logout stores the token id ("jti") in revoked_token and adds it to
+# a Bloom filter. A miss in the filter means "not revoked" (the common case, a
+# few hash probes); a hit is confirmed against the table once and remembered.
+# See migrations/005_token_revocation.sql.
+
+import asyncio
+import datetime
+import hashlib
+import math
+import os
+import time
+
+import pymysql
+
+from utils import invalidation_bus
+from utils.lru_cache import LRUCache
+from utils.query_executor import fetch_one, fetch_all, execute
+
+TOKEN_REVOCATION_ENABLED = os.getenv("TOKEN_REVOCATION_ENABLED", "1") != "0"
+TOKEN_REVOCATION_REFRESH = float(os.getenv("TOKEN_REVOCATION_REFRESH", 5))
+REVOKED_TOKEN_CAPACITY = int(os.getenv("REVOKED_TOKEN_CAPACITY", 100000))
+REVOKED_TOKEN_FP_RATE = float(os.getenv("REVOKED_TOKEN_FP_RATE", 0.001))
+# Rows committed slightly out of timestamp order are still seen by the next refresh
+_REFRESH_OVERLAP = datetime.timedelta(seconds=2)
+# Expired rows are pruned and the filter rebuilt this often (tokens live an hour)
+_REBUILD_EVERY = 3600
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings: no false negatives, ~fp_rate false positives."""
+
+    def __init__(self, capacity: int, fp_rate: float):
+        capacity = max(int(capacity), 1)
+        self.size = max(int(-capacity * math.log(fp_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _hashes(self, key: str):
+        # Double hashing: k probe positions from one 128-bit digest
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=16).digest(), "little")
+        return digest & 0xFFFFFFFFFFFFFFFF, (digest >> 64) | 1
+
+    def add(self, key: str):
+        h1, h2 = self._hashes(key)
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % self.size
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        h1, h2 = self._hashes(key)
+        bits, size = self._bits, self.size
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % size
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False  # almost every live token stops at the first probe
+        return True
+
+    def stats(self) -> dict:
+        filled = bin(int.from_bytes(self._bits, "big")).count("1") / self.size
+        return {
+            "bits": self.size,
+            "hashes": self.hashes,
+            "items": self.count,
+            "fill": round(filled, 4),
+            "estimated_fp_rate": round(filled ** self.hashes, 6),
+        }
+
+
+_versions = {}                   # user_id -> permission version
+_versions_since = None           # max updated_at seen in user_permission_version
+_revoked = BloomFilter(REVOKED_TOKEN_CAPACITY, REVOKED_TOKEN_FP_RATE)
+_revoked_since = None            # max revoked_at seen in revoked_token
+_rebuilt_at = 0.0
+_confirmed = LRUCache(maxsize=4096, ttl=3600)  # jti -> revoked? for filter hits checked in the table
+_missing_tables = set()
+_task = None
+_counters = {"checks": 0, "stale": 0, "revoked": 0, "filter_hits": 0, "false_positives": 0, "refreshes": 0}
+
+
+def _missing_table(e, table: str) -> bool:
+    # errno 1146: migration 005 not applied yet; the check stays off for that table
+    if getattr(e, "args", [None])[0] != 1146:
+        return False
+    if table not in _missing_tables:
+        _missing_tables.add(table)
+        print(f"⚠️ Table {table} missing, run migrations/005_token_revocation.sql")
+    return True
+
+
+# ===============================
+# Permission versions
+# ===============================
+def permission_version(user_id) -> int:
+    return _versions.get(user_id, 0)
+
+
+def _set_version(payload: dict):
+    user_id, version = payload["user_id"], payload["version"]
+    if version > _versions.get(user_id, 0):
+        _versions[user_id] = version
+
+
+async def bump_permission_version(user_id: int, conn=None):
+    """
+    Bump the user's permission version; run it in the transaction that changes
+    their grants, then pass the result to permission_version_changed().
+    """
+    try:
+        await execute(
+            "INSERT INTO user_permission_version (user_id, version) VALUES (%s, 1) "
+            "ON DUPLICATE KEY UPDATE version = version + 1",
+            (user_id,), conn=conn
+        )
+        return await fetch_one(
+            "SELECT user_id, version FROM user_permission_version WHERE user_id = %s",
+            (user_id,), conn=conn
+        )
+    except pymysql.err.ProgrammingError as e:
+        if _missing_table(e, "user_permission_version"):
+            return None
+        raise
+
+
+def permission_version_changed(row):
+    """After commit: tokens issued before the bump are rejected here and in the other workers."""
+    if row is None:
+        return
+    payload = {"user_id": row["user_id"], "version": row["version"]}
+    _set_version(payload)
+    invalidation_bus.publish("permission_version", payload)
+
+
+async def _refresh_versions() -> int:
+    global _versions_since
+    sql = "SELECT user_id, version, updated_at FROM user_permission_version"
+    params = ()
+    if _versions_since is not None:
+        sql += " WHERE updated_at >= %s"
+        params = (_versions_since - _REFRESH_OVERLAP,)
+    try:
+        rows = await fetch_all(sql, params)
+    except pymysql.err.ProgrammingError as e:
+        if _missing_table(e, "user_permission_version"):
+            return 0
+        raise
+    for row in rows:
+        _set_version(row)
+        if _versions_since is None or row["updated_at"] > _versions_since:
+            _versions_since = row["updated_at"]
+    return len(rows)
+
+
+# ===============================
+# Revoked token ids
+# ===============================
+def _add_revoked(payload: dict):
+    _revoked.add(payload["jti"])
+    _confirmed.set(payload["jti"], True)
+
+
+async def revoke_token(claims: dict) -> bool:
+    """Revoke one token (logout). False for tokens issued without a jti."""
+    jti = claims.get("jti")
+    if not jti:
+        return False
+    expires_at = datetime.datetime.utcfromtimestamp(claims.get("exp", time.time() + _REBUILD_EVERY))
+    try:
+        await execute(
+            "INSERT IGNORE INTO revoked_token (jti, user_id, expires_at) VALUES (%s, %s, %s)",
+            (jti, claims.get("user_id"), expires_at)
+        )
+    except pymysql.err.ProgrammingError as e:
+        if not _missing_table(e, "revoked_token"):
+            raise
+    payload = {"jti": jti}
+    _add_revoked(payload)
+    invalidation_bus.publish("token_revoked", payload)
+    return True
+
+
+async def _is_revoked(jti: str) -> bool:
+    if jti not in _revoked:
+        return False
+    _counters["filter_hits"] += 1
+    revoked = _confirmed.get(jti)
+    if revoked is None:
+        try:
+            row = await fetch_one("SELECT 1 AS revoked FROM revoked_token WHERE jti = %s", (jti,))
+        except pymysql.err.ProgrammingError as e:
+            if not _missing_table(e, "revoked_token"):
+                raise
+            return True  # nothing to confirm against: the filter is all there is
+        revoked = row is not None
+        if not revoked:
+            _counters["false_positives"] += 1
+        _confirmed.set(jti, revoked)
+    return revoked
+
+
+async def _refresh_revoked() -> int:
+    global _revoked, _revoked_since, _rebuilt_at
+    rebuild = time.monotonic() - _rebuilt_at > _REBUILD_EVERY
+    sql = "SELECT jti, revoked_at FROM revoked_token WHERE expires_at > UTC_TIMESTAMP()"
+    params = ()
+    if not rebuild and _revoked_since is not None:
+        sql += " AND revoked_at >= %s"
+        params = (_revoked_since - _REFRESH_OVERLAP,)
+    try:
+        if rebuild:
+            await execute("DELETE FROM revoked_token WHERE expires_at <= UTC_TIMESTAMP()")
+        rows = await fetch_all(sql, params)
+    except pymysql.err.ProgrammingError as e:
+        if _missing_table(e, "revoked_token"):
+            return 0
+        raise
+
+    # A rebuild starts from an empty filter, so expired ids stop taking up bits
+    target = BloomFilter(REVOKED_TOKEN_CAPACITY, REVOKED_TOKEN_FP_RATE) if rebuild else _revoked
+    for row in rows:
+        if row["jti"] not in target:
+            target.add(row["jti"])
+        if _revoked_since is None or row["revoked_at"] > _revoked_since:
+            _revoked_since = row["revoked_at"]
+    if rebuild:
+        _revoked, _rebuilt_at = target, time.monotonic()
+        _confirmed.clear()
+    return len(rows)
+
+
+# ===============================
+# Request check / refresher
+# ===============================
+async def token_rejection(claims: dict):
+    """None when the token may be used, else the reason it was revoked."""
+    if not TOKEN_REVOCATION_ENABLED:
+        return None
+    _counters["checks"] += 1
+    user_id = claims.get("user_id")
+    if user_id is not None and claims.get("pv", 0) < _versions.get(user_id, 0):
+        _counters["stale"] += 1
+        return "Permissions changed, please log in again"
+    jti = claims.get("jti")
+    if jti and await _is_revoked(jti):
+        _counters["revoked"] += 1
+        return "Token revoked"
+    return None
+
+
+async def refresh_token_revocation():
+    await _refresh_versions()
+    await _refresh_revoked()
+    _counters["refreshes"] += 1
+
+
+async def _refresher():
+    while True:
+        await asyncio.sleep(TOKEN_REVOCATION_REFRESH)
+        try:
+            await refresh_token_revocation()
+        except Exception as e:
+            print(f"⚠️ Token revocation refresh failed: {e}")
+
+
+async def start_token_revocation():
+    """Load versions and revoked ids, then keep them fresh (call from the startup event)."""
+    global _task
+    if _task is not None or not TOKEN_REVOCATION_ENABLED:
+        return
+    await refresh_token_revocation()
+    _task = asyncio.create_task(_refresher())
+    print(f"🚫 Token revocation: {len(_versions)} permission versions, {_revoked.count} revoked tokens")
+
+
+async def stop_token_revocation():
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    await asyncio.gather(_task, return_exceptions=True)
+    _task = None
+
+
+def token_revocation_stats() -> dict:
+    return {
+        **_counters,
+        "users_with_version": len(_versions),
+        "revoked_filter": _revoked.stats(),
+        "missing_tables": sorted(_missing_tables),
+    }
+
+
+invalidation_bus.subscribe("permission_version", _set_version)
+invalidation_bus.subscribe("token_revoked", _add_revoked)
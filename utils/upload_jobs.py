@@ -0,0 +1,254 @@
+# utils/upload_jobs.py
+#
+# Background gallery uploads. The request spools the file to local disk and
+# inserts a pending gallery row (202 + job id = gallery id); workers in every
+# gunicorn worker push the spooled file to media storage with retries and exponential
+# backoff, then flip the row to active. Job state lives in the gallery row
+# (see migrations/001_gallery_upload_jobs.sql), so any worker can answer
+# GET /api/gallery/jobs/{id}.
+
+import asyncio
+import datetime
+import hashlib
+import os
+import random
+import tempfile
+
+from utils.storage import get_storage, UploadTooLarge, UPLOAD_CHUNK_SIZE, UPLOAD_MAX_BYTES
+from utils.query_executor import fetch_one, fetch_all, execute
+from utils.response_cache import invalidate
+from utils.gallery_variants import schedule_gallery_variants
+from utils.image_variants import IMAGE_VARIANTS_ENABLED
+
+# gallery.status values (0 / 1 were already used for deleted / active)
+GALLERY_DELETED = 0
+GALLERY_ACTIVE = 1
+GALLERY_PENDING = 2
+GALLERY_FAILED = 3
+
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "fujiaire-upload-spool"))
+UPLOAD_JOB_WORKERS = int(os.getenv("UPLOAD_JOB_WORKERS", 2))
+UPLOAD_JOB_MAX_ATTEMPTS = int(os.getenv("UPLOAD_JOB_MAX_ATTEMPTS", 5))
+UPLOAD_JOB_BACKOFF = float(os.getenv("UPLOAD_JOB_BACKOFF", 2))          # first retry delay, doubled each time
+UPLOAD_JOB_BACKOFF_MAX = float(os.getenv("UPLOAD_JOB_BACKOFF_MAX", 60))
+UPLOAD_JOB_HEARTBEAT = float(os.getenv("UPLOAD_JOB_HEARTBEAT", 5))      # progress write / lease renewal
+# A pending row nobody has touched for this long (crashed or restarted worker) is picked up again
+UPLOAD_JOB_STALE_AFTER = float(os.getenv("UPLOAD_JOB_STALE_AFTER", 180))
+
+_queue = None
+_tasks = []
+
+
+def _now():
+    return datetime.datetime.utcnow()
+
+
+def remove_spool(path: str):
+    if not path:
+        return
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+# ===============================
+# Spooling (request side)
+# ===============================
+def _copy_to_spool(src, dst_path: str, max_bytes: int):
+    size = 0
+    digest = hashlib.sha256()
+    with open(dst_path, "wb") as dst:
+        while True:
+            chunk = src.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            digest.update(chunk)
+            dst.write(chunk)
+    return size, digest.hexdigest()
+
+
+async def spool_upload(file, max_bytes: int = UPLOAD_MAX_BYTES):
+    """
+    Copy an UploadFile to UPLOAD_SPOOL_DIR in chunks (off the event loop),
+    hashing it on the way. Returns (path, size, sha256 hex).
+    """
+    os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=UPLOAD_SPOOL_DIR, suffix=".upload")
+    os.close(fd)
+    try:
+        await file.seek(0)
+        size, digest = await asyncio.to_thread(_copy_to_spool, file.file, path, max_bytes)
+    except BaseException:
+        remove_spool(path)
+        raise
+    return path, size, digest
+
+
+def enqueue_upload(gallery_id: int):
+    """Hand a pending gallery row to this worker's upload workers."""
+    if _queue is None:
+        return  # workers not started; the stale sweep will pick the row up
+    _queue.put_nowait(gallery_id)
+
+
+# ===============================
+# Workers
+# ===============================
+class _SpoolReader:
+    # async read(n) over the spool file, counting bytes for progress
+    def __init__(self, path: str):
+        self.file = open(path, "rb")
+        self.sent = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        chunk = await asyncio.to_thread(self.file.read, size)
+        self.sent += len(chunk)
+        return chunk
+
+    def close(self):
+        self.file.close()
+
+
+async def _heartbeat(gallery_id: int, reader: _SpoolReader):
+    while True:
+        await asyncio.sleep(UPLOAD_JOB_HEARTBEAT)
+        try:
+            await execute(
+                "UPDATE gallery SET upload_sent = %s, updated_at = %s WHERE id = %s",
+                (reader.sent, _now(), gallery_id)
+            )
+        except Exception as e:
+            print(f"⚠️ Upload job {gallery_id} heartbeat failed: {e}")
+
+
+async def _upload_once(row: dict):
+    reader = _SpoolReader(row["spool_path"])
+    heartbeat = asyncio.create_task(_heartbeat(row["id"], reader))
+    try:
+        await get_storage().save(reader, row["path"])
+    finally:
+        heartbeat.cancel()
+        reader.close()
+
+
+async def _run_job(gallery_id: int):
+    row = await fetch_one(
+        "SELECT id, path, spool_path, upload_attempts FROM gallery WHERE id = %s AND status = %s",
+        (gallery_id, GALLERY_PENDING)
+    )
+    if not row:
+        return  # finished by another worker, or deleted meanwhile
+
+    attempts = row["upload_attempts"] or 0
+    while True:
+        attempts += 1
+        await execute(
+            "UPDATE gallery SET upload_attempts = %s, upload_sent = 0, updated_at = %s WHERE id = %s",
+            (attempts, _now(), gallery_id)
+        )
+
+        try:
+            await _upload_once(row)
+        except Exception as e:
+            error = str(e)[:255] or e.__class__.__name__
+            permanent = isinstance(e, (UploadTooLarge, FileNotFoundError))
+
+            if permanent or attempts >= UPLOAD_JOB_MAX_ATTEMPTS:
+                await execute(
+                    "UPDATE gallery SET status = %s, upload_error = %s, spool_path = NULL, updated_at = %s "
+                    "WHERE id = %s AND status = %s",
+                    (GALLERY_FAILED, error, _now(), gallery_id, GALLERY_PENDING)
+                )
+                remove_spool(row["spool_path"])
+                print(f"❌ Upload job {gallery_id} failed after {attempts} attempt(s): {error}")
+                return
+
+            await execute(
+                "UPDATE gallery SET upload_error = %s, updated_at = %s WHERE id = %s",
+                (error, _now(), gallery_id)
+            )
+            # Exponential backoff with jitter, so retries from several workers spread out
+            delay = min(UPLOAD_JOB_BACKOFF * 2 ** (attempts - 1), UPLOAD_JOB_BACKOFF_MAX)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            continue
+
+        result = await execute(
+            "UPDATE gallery SET status = %s, spool_path = NULL, upload_sent = upload_size, "
+            "upload_error = NULL, updated_at = %s WHERE id = %s AND status = %s",
+            (GALLERY_ACTIVE, _now(), gallery_id, GALLERY_PENDING)
+        )
+        if result.rowcount:
+            invalidate("gallery")
+        if result.rowcount and IMAGE_VARIANTS_ENABLED:
+            # The spool file is the variant source; removed once they are done
+            schedule_gallery_variants(gallery_id, row["spool_path"], row["path"])
+        else:
+            remove_spool(row["spool_path"])
+        return
+
+
+async def _worker():
+    while True:
+        gallery_id = await _queue.get()
+        try:
+            await _run_job(gallery_id)
+        except Exception as e:
+            print(f"❌ Upload job {gallery_id} crashed: {e}")
+        finally:
+            _queue.task_done()
+
+
+async def recover_stale_jobs() -> int:
+    """Claim pending rows whose worker stopped renewing them, and queue them here."""
+    cutoff = _now() - datetime.timedelta(seconds=UPLOAD_JOB_STALE_AFTER)
+    rows = await fetch_all(
+        "SELECT id FROM gallery WHERE status = %s AND updated_at < %s",
+        (GALLERY_PENDING, cutoff)
+    )
+
+    claimed = 0
+    for row in rows:
+        # Only one worker's UPDATE can match while the row is still stale
+        result = await execute(
+            "UPDATE gallery SET updated_at = %s WHERE id = %s AND status = %s AND updated_at < %s",
+            (_now(), row["id"], GALLERY_PENDING, cutoff)
+        )
+        if result.rowcount:
+            enqueue_upload(row["id"])
+            claimed += 1
+    return claimed
+
+
+async def _sweeper():
+    while True:
+        try:
+            claimed = await recover_stale_jobs()
+            if claimed:
+                print(f"♻️ Re-queued {claimed} stale upload job(s)")
+        except Exception as e:
+            print(f"⚠️ Upload job sweep failed: {e}")
+        await asyncio.sleep(UPLOAD_JOB_STALE_AFTER / 2)
+
+
+async def start_upload_workers():
+    global _queue
+    if _queue is not None:
+        return
+    _queue = asyncio.Queue()
+    _tasks.extend(asyncio.create_task(_worker()) for _ in range(UPLOAD_JOB_WORKERS))
+    _tasks.append(asyncio.create_task(_sweeper()))
+    print(f"📤 Upload job workers started ({UPLOAD_JOB_WORKERS})")
+
+
+async def stop_upload_workers():
+    """Unfinished jobs stay pending in the database and are recovered after UPLOAD_JOB_STALE_AFTER."""
+    global _queue
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+    _queue = None